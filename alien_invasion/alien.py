@@ -1,64 +1,122 @@
-import pygame
-from pygame.sprite import Sprite
+class AlienGroup:
+    """
+    An ordered set of aliens, a lightweight stand-in for `pygame.sprite.Group`.
+
+    Aliens don't keep track of the groups they are in, so adding and removing them
+    doesn't allocate anything on the alien itself.
+
+    Attributes:
+        members (dict): The aliens of the group, in the order they were added.
+    """
+    __slots__ = ('members',)
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty group.
+        """
+        self.members = {}
+
+    def __len__(self):
+        """
+        Returns the number of aliens in the group.
+        """
+        return len(self.members)
+
+    def __bool__(self):
+        """
+        Returns True if the group has any alien.
+        """
+        return bool(self.members)
+
+    def __iter__(self):
+        """
+        Iterates over the aliens in the order they were added.
+        """
+        return iter(self.members)
+
+    def __contains__(self, alien):
+        """
+        Returns True if the alien is in the group.
+        """
+        return alien in self.members
+
+    def sprites(self):
+        """
+        Returns a list of the aliens, like `pygame.sprite.Group.sprites`.
+        """
+        return list(self.members)
+
+    def add(self, *aliens):
+        """
+        Adds one or more aliens to the group, like `pygame.sprite.Group.add`.
+        """
+        self.members.update(dict.fromkeys(aliens))
+
+    def remove(self, alien):
+        """
+        Removes an alien from the group, if it is in it.
+        """
+        self.members.pop(alien, None)
 
-class Alien(Sprite):
+    def empty(self):
+        """
+        Removes every alien from the group.
+        """
+        self.members.clear()
+
+class Alien:
     """
-    Represents a single alien in the fleet. Inherits from the Pygame Sprite class.
+    Represents a single alien of a formation.
+
+    Aliens are compact: they use `__slots__` and only store their formation and their
+    position relative to the formation's origin, which never changes. The image is shared
+    by every alien of the formation and the game context is reached through the formation,
+    so an alien holds no reference to the game, settings or screen. Its position on the
+    screen is derived from the formation when it is needed.
 
     Attributes:
-        fleet (Fleet): The fleet that this alien is a part of.
-        game (Game): The game instance where the alien exists.
-        settings (Settings): The settings for the game, including alien size and speed.
-        screen (Surface): The screen where the alien will be drawn.
-        boundaries (Rect): The boundaries of the screen to check the alien's position.
-        image (Surface): The image of the alien.
-        rect (Rect): The rectangular area of the alien image.
-        x (float): The x-coordinate of the alien, used for movement calculations.
+        formation (Formation): The formation that this alien is a part of.
+        local (Rect): The rectangular area of the alien, relative to the formation's origin.
     """
+    __slots__ = ('formation', 'local')
 
-    def __init__(self, fleet, x, y):
+    def __init__(self, formation, local):
         """
         Initializes an Alien object.
 
         Args:
-            fleet (Fleet): The fleet that this alien belongs to.
-            x (int): The x-coordinate of the alien.
-            y (int): The y-coordinate of the alien.
+            formation (Formation): The formation that this alien belongs to.
+            local (pygame.Rect): The area of the alien, relative to the formation's origin.
         """
-        super().__init__()
-        self.fleet = fleet
-        self.game = fleet.game
-        self.settings = fleet.game.settings
-        self.screen = fleet.game.screen
-        self.boundaries = fleet.game.screen.get_rect()
-        self.image = pygame.image.load(self.settings.alien_file)
-        self.image = pygame.transform.scale(self.image, (self.settings.alien_w, self.settings.alien_h))
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
-
-        self.x = float(self.rect.x)
+        self.formation = formation
+        self.local = local
 
-    def update(self):
+    @property
+    def image(self):
         """
-        Updates the position of the alien based on the fleet's direction and speed.
+        The image of the alien, shared with the other aliens of its formation.
+        """
+        return self.formation.image
 
-        Moves the alien horizontally on the screen by adjusting its x-coordinate.
-        The movement is based on the fleet's current direction and the fleet speed.
+    @property
+    def rect(self):
+        """
+        The rectangular area of the alien on the screen.
         """
-        tmp_speed = self.settings.fleet_speed
-        self.x += tmp_speed * self.fleet.direction
-        self.rect.x = self.x
+        return self.local.move(self.formation.offset)
 
-    def check_edges(self):
+    def alive(self):
         """
-        Checks if the alien has reached the edge of the screen.
+        Returns True if the alien is still part of its formation.
+        """
+        return self in self.formation.aliens
 
-        Returns:
-            bool: True if the alien has reached the left or right edge of the screen, False otherwise.
+    def kill(self):
+        """
+        Removes the alien from its formation and from the fleet.
         """
-        return (self.rect.left <= self.boundaries.left 
-                or self.rect.right >= self.boundaries.right)
+        self.formation.aliens.remove(self)
+        self.formation.fleet.fleet.remove(self)
 
     def draw(self):
         """
@@ -66,4 +124,4 @@ class Alien(Sprite):
 
         Uses the Pygame `blit` method to render the alien image at its current position.
         """
-        self.screen.blit(self.image, self.rect)
+        self.formation.fleet.game.screen.blit(self.image, self.rect)
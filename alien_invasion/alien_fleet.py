@@ -1,16 +1,29 @@
-import math
 import pygame
-from alien import Alien
+import patterns
+from alien import AlienGroup
+from formation import Formation
 
 class AlienFleet:
     """
     A class to manage the fleet of aliens in the game.
 
+    The aliens are organized in formations. Each formation holds a single origin that moves,
+    drops and bounces off the screen edges independently, while its aliens keep fixed offsets
+    from it. Updating the fleet therefore costs one vector update per formation, and world
+    positions are only derived for drawing and collisions.
+
+    Every formation keeps track of its leftmost, topmost, rightmost and bottommost aliens in
+    local coordinates, so the edge, bottom and ship checks read its bounding box in O(1). The
+    extremes are only searched again when one of them is destroyed.
+
+    Each wave is laid out from the `fleet_pattern` setting, compiled once by `patterns` and
+    memoized, so respawning a wave copies the cached positions.
+
     Attributes:
     game (AlienInvasion): The game instance to access game settings and resources.
     settings (Settings): The game settings to control fleet and alien behavior.
-    fleet (pygame.sprite.Group): A group of all aliens in the fleet.
-    direction (int): The current direction of movement for the entire alien fleet.
+    fleet (AlienGroup): A group of all aliens in the fleet.
+    formations (list): The formations of the fleet, in the order they were added.
     """
     def __init__(self, game) -> None:
         """
@@ -21,95 +34,126 @@ class AlienFleet:
         """
         self.game = game
         self.settings = game.settings
-        self.fleet = pygame.sprite.Group()
-        self.direction = 1
+        self.fleet = AlienGroup()
+        self.formations = []
         self.create_fleet()
 
-    def create_fleet(self):
+    @property
+    def direction(self):
         """
-        Creates the initial fleet of aliens in a snowflake pattern.
-
-        The snowflake pattern consists of multiple arms, each containing a set number
-        of aliens, with aliens spaced out along the arms. Additionally, aliens are placed 
-        in the center of the screen.
+        The direction of the first formation, 1 for right and -1 for left.
         """
-        alien_w = self.settings.alien_w
-        alien_h = self.settings.alien_h
-        screen_w = self.settings.screen_w
-        screen_h = self.settings.screen_h
+        return self.formations[0].direction if self.formations else 1
 
-        # Calculate the radius for the snowflake pattern
-        radius = min(screen_w, screen_h) // 4  # Adjust the radius size to fit your screen
-        num_arms = 6  # Number of arms for the snowflake
-        num_aliens_per_arm = 5  # Number of aliens per arm
+    def clear(self):
+        """
+        Removes every formation and alien from the fleet.
+        """
+        self.fleet.empty()
+        self.formations = []
 
-        alien_spacing = alien_w * 1.5  # Add some space between aliens to minimize overlap
+    def add_formation(self, x, y, positions, direction=1):
+        """
+        Adds a formation with its origin at (x, y) and an alien at each local position.
 
-        # Create aliens along the arms
-        for arm in range(num_arms):
-            arm_angle = (360 / num_arms) * arm  # 60-degree separation between arms
+        Args:
+        x (float): The x-coordinate of the origin.
+        y (int): The y-coordinate of the origin.
+        positions (iterable): The (x, y) position of each alien, relative to the origin.
+        direction (int): The direction the formation starts moving in.
 
-            # Create aliens for this arm
-            for i in range(num_aliens_per_arm):
-                # Distribute aliens along the arm (from center to outer radius)
-                alien_distance = (i + 1) * alien_spacing  # Use alien_spacing to space them apart
-                x_offset = int(math.cos(math.radians(arm_angle)) * alien_distance)
-                y_offset = int(math.sin(math.radians(arm_angle)) * alien_distance)
+        Returns:
+        Formation: The new formation.
+        """
+        formation = Formation(self, x, y, direction)
+        formation.add_aliens(positions)
+        self.formations.append(formation)
+        return formation
 
-                # Adjust the alien's position
-                current_x = screen_w // 2 + x_offset - alien_w // 2
-                current_y = screen_h // 2 + y_offset - alien_h // 2
+    def add_alien(self, x, y):
+        """
+        Adds an alien at a position on the screen to the last formation, creating a formation
+        at the origin of the screen if the fleet has none.
 
-                # Create alien at the calculated position
-                self._create_alien(current_x, current_y)
+        Args:
+        x (int): The x-coordinate of the alien on the screen.
+        y (int): The y-coordinate of the alien on the screen.
 
-        # Optionally, you can also add aliens to the center of the snowflake.
-        self._create_alien(screen_w // 2, screen_h // 2)  # Center of the snowflake
+        Returns:
+        Alien: The new alien.
+        """
+        if not self.formations:
+            self.add_formation(0, 0, ())
+        formation = self.formations[-1]
+        dx, dy = formation.offset
+        return formation.add_alien(x - dx, y - dy)
 
-    def _create_alien(self, current_x, current_y):
+    def create_fleet(self):
         """
-        Creates a new alien at a specific position and adds it to the fleet.
+        Creates a new wave of aliens in the pattern of the `fleet_pattern` setting.
 
-        Args:
-        current_x (int): The x-coordinate for the new alien.
-        current_y (int): The y-coordinate for the new alien.
+        The default snowflake pattern consists of multiple arms, each containing a set number
+        of aliens, with aliens spaced out along the arms, and an alien in the center. It is a
+        single formation with its origin at the center of the screen.
+
+        The wave moves in the direction the previous fleet moved in.
         """
-        new_alien = Alien(self, current_x, current_y)
-        self.fleet.add(new_alien)
+        direction = self.direction
+        self.clear()
+        patterns.create_pattern(self, self.settings.fleet_pattern, direction)
 
     def update_fleet(self):
         """
-        Updates the position and state of all aliens in the fleet.
-        This method also checks for any edge collisions.
+        Updates the position of every formation in the fleet.
+        Each formation checks the screen edges and moves on its own.
         """
-        self._check_fleet_edges()
-        self.fleet.update()
+        speed = self.settings.per_step(self.settings.fleet_speed)
+        drop = self.settings.fleet_drop_amount
+        screen_w = self.settings.screen_w
+        for formation in self._living_formations():
+            formation.update(speed, drop, screen_w)
 
-    def _check_fleet_edges(self):
-        """
-        Checks if any alien in the fleet has reached the edge of the screen.
-        If so, the fleet's direction is changed.
+    def _living_formations(self):
         """
-        for alien in self.fleet:
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        Returns the formations that still have aliens, dropping the destroyed ones.
 
-    def draw_fleet(self):
+        Returns:
+        list: The formations with aliens left.
         """
-        Draws all the aliens in the fleet to the screen.
+        if not all(self.formations):
+            self.formations = [formation for formation in self.formations if formation]
+        return self.formations
+
+    def draw_fleet(self, alpha=1.0):
         """
-        for alien in self.fleet:
-            alien.draw()
+        Draws all the aliens in the fleet to the screen, between their previous and current position.
 
-    def _change_fleet_direction(self):
+        Args:
+        alpha (float): The interpolation factor between the previous (0) and current (1) position.
         """
-        Changes the direction of movement for the entire fleet and drops the fleet down.
-        This is called when an alien reaches the edge of the screen.
+        blits = []
+        for formation in self.formations:
+            offset = formation.interpolation_offset(alpha)
+            image = formation.image
+            blits.extend((image, alien.local.move(offset)) for alien in formation.aliens)
+        self.game.screen.blits(blits, False)
+
+    def bounds(self):
         """
-        for alien in self.fleet:
-            alien.rect.y += self.settings.fleet_drop_amount
-        self.direction *= -1
+        Returns the bounding box of the fleet.
+
+        Returns:
+        pygame.Rect: The rect covering every alien, or None if the fleet is empty.
+        """
+        bounds = None
+        for formation in self.formations:
+            edges = formation.edges()
+            if edges is None:
+                continue
+            left, top, right, bottom = edges
+            rect = pygame.Rect(left, top, right - left, bottom - top)
+            bounds = rect if bounds is None else bounds.union(rect)
+        return bounds
 
     def check_fleet_bottom(self):
         """
@@ -118,7 +162,70 @@ class AlienFleet:
         Returns:
         bool: True if any alien has reached the bottom, False otherwise.
         """
-        for alien in self.fleet:
-            if alien.rect.bottom >= self.settings.screen_h:
+        screen_h = self.settings.screen_h
+        for formation in self.formations:
+            edges = formation.edges()
+            if edges and edges[3] >= screen_h:
                 return True
         return False
+
+    def _candidates(self, rect):
+        """
+        Returns the formations whose bounding box overlaps a rect.
+
+        Args:
+        rect (pygame.Rect): The rect on the screen.
+
+        Returns:
+        list: The formations that may have aliens colliding with the rect.
+        """
+        candidates = []
+        for formation in self.formations:
+            edges = formation.edges()
+            if edges is None:
+                continue
+            left, top, right, bottom = edges
+            if rect.left < right and left < rect.right and rect.top < bottom and top < rect.bottom:
+                candidates.append(formation)
+        return candidates
+
+    def check_ship_collision(self, ship):
+        """
+        Checks if any alien in the fleet collides with the player's ship.
+
+        Args:
+        ship (Ship): The player's ship.
+
+        Returns:
+        Alien: The first alien colliding with the ship, or None if there is no collision.
+        """
+        for formation in self._candidates(ship.rect):
+            hits = formation.collide(ship.rect)
+            if hits:
+                return hits[0]
+        return None
+
+    def collide_bullets(self, bullets):
+        """
+        Removes every bullet and alien that collide with each other.
+
+        Args:
+        bullets (BulletPool): The bullets fired by the player's ship.
+
+        Returns:
+        dict: A dictionary mapping each bullet that hit to the list of aliens it destroyed,
+              in the same form as `pygame.sprite.groupcollide`.
+        """
+        collisions = {}
+        for bullet in bullets.sprites():
+            destroyed = []
+            for formation in self._candidates(bullet.rect):
+                hits = formation.collide(bullet.rect)
+                for alien in hits:
+                    formation.remove(alien)
+                destroyed.extend(hits)
+            if not destroyed:
+                continue
+            collisions[bullet] = destroyed
+            bullet.kill()
+        return collisions
@@ -1,15 +1,29 @@
+import atexit
+import os
 import sys
+import time
+import random
+import hashlib
+import threading
 import pygame
 #import vlc
 #import time
-from time import sleep
 from settings import Settings
 from ship import Ship
 from alien_fleet import AlienFleet
 from game_stats import GameStats
-from bullet import Bullet
+from bullet_pool import BulletPool
 from button import Button
 from hud import HUD
+from asset_cache import AssetCache
+from renderer import DirtyRenderer
+from profiler import FrameProfiler
+from preloader import AssetPreloader, LoadingScreen
+from audio import SoundManager
+from replay import InputRecorder, ReplayWriter
+from sim_thread import SimulationThread
+from savestate import SaveWriter, encode_save, load_save
+from game_state import GameStateMachine, PLAYING, RESPAWN_DELAY, LEVEL_TRANSITION, GAME_OVER
 
 class AlienInvasion:
     """
@@ -25,22 +39,43 @@ class AlienInvasion:
         screen (pygame.Surface): The screen surface where the game is drawn.
         screen_rect (pygame.Rect): The rectangle representing the screen dimensions.
         settings (Settings): The configuration settings for the game.
+        assets (AssetCache): The cache that loads and shares every image surface.
         game_stats (GameStats): The game's statistics, such as score and remaining ships.
         HUD (HUD): The heads-up display for showing the player's score, level, and other stats.
         ship (Ship): The player's spaceship.
-        bullets (pygame.sprite.Group): A group containing all the player's bullets.
-        aliens (AlienFleet): The group containing all the alien enemies.
+        bullets (BulletPool): The preallocated pool of the player's bullets.
+        aliens (AlienFleet): The group containing all the alien enemies, using the sprite or array backend.
         play_button (Button): The button to start the game when it's over.
         running (bool): A flag indicating whether the game is running.
         game_active (bool): A flag indicating whether the game is currently active.
         game_over (bool): A flag indicating whether the game is over.
+        state (GameStateMachine): The state of the game, which keeps `game_active` and `game_over` in sync.
         clock (pygame.time.Clock): The clock used to control the game's frame rate.
         bg (pygame.Surface): The background image displayed during the game.
-        laser_sound (pygame.mixer.Sound): The sound played when the spaceship fires a bullet.
-        impact_sound (pygame.mixer.Sound): The sound played when a bullet hits an alien.
+        laser_sound (pygame.mixer.Sound): The sound played when the spaceship fires a bullet, None in headless mode.
+        impact_sound (pygame.mixer.Sound): The sound played when a bullet hits an alien, None in headless mode.
+        audio (SoundManager): The manager playing the sound effects on reserved channels.
+        headless (bool): A flag indicating whether the game runs without display, audio and frame limiting.
+        persist (bool): Whether the high score and the game in progress are saved to disk.
+        frame (int): The number of simulation frames run since the game started.
+        renderer (DirtyRenderer): The dirty-rect renderer, or None when the full screen is redrawn every frame.
+        profiler (FrameProfiler): The profiler measuring each phase of the frame.
+        preloader (AssetPreloader): The preloader that decoded the images and sounds, or None in headless mode.
+        startup_times (dict): The seconds from launch to the first loading screen frame ('first_frame'),
+            to the end of loading ('loaded') and to the first game frame ('interactive').
+        seed (int): The seed of the game's random generator.
+        rng (random.Random): The random generator every random gameplay decision is drawn from.
+        recorder (InputRecorder): The recorder of the handled input events, or None when not recording.
+        replay_writer (ReplayWriter): The writer of the binary replay, or None when not recording one.
+        save_writer (SaveWriter): The background writer of the save file, or None when the game does not
+            persist or saving is disabled.
+        sim_lock (threading.RLock): The lock held while the game state is updated or read outside
+            the simulation thread.
+        sim_thread (SimulationThread): The thread running the simulation when `threaded_sim` is set,
+            or None.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, headless=False, seed=None, persist=True) -> None:
         """
     Initializes the game by setting up the core components required for the Alien Invasion game.
     
@@ -49,13 +84,35 @@ class AlienInvasion:
     main screen, sets the game icon, and sets the title for the window. The method further prepares
     the game to run by configuring the background image, setting up sound effects and background 
     music, and initializing the clock for frame rate control. The 'Play' button is also created, and
-    the initial game state is set to active.
+    the game starts in the menu.
+
+    In headless mode the SDL dummy video and audio drivers are used, so the game runs on a
+    machine without a display. The mixer, sounds, music, window icon and background image
+    are skipped, and the high score is not written to disk.
+
+    Otherwise the images and sounds are decoded on a thread pool while a loading screen
+    shows the progress, and the startup times are reported on the first game frame.
+
+    Every random decision of the game is drawn from its own generator, seeded with `seed`, the
+    `seed` setting or a random seed, in that order. Together with the recorded input events
+    this makes a game reproducible frame by frame.
+
+    If a game in progress was saved when the previous session quit, it is restored from the
+    save file and resumes at once, instead of starting in the menu. With `persist` off, as in
+    headless mode, no saved game is resumed and neither the high score nor the game in progress
+    is written to disk, so benchmarks and tools leave the player's files alone.
+
+    Args:
+        headless (bool): Whether to run the game without display, audio and frame limiting.
+        seed (int): The seed of the game's random generator, None to use the `seed` setting.
+        persist (bool): Whether the high score and the game in progress are saved to disk.
     
     Attributes:
         screen (pygame.Surface): The main screen for displaying the game.
+        assets (AssetCache): The cache that loads and shares every image surface.
         HUD (HUD): The heads-up display for showing scores, level, and other game information.
         ship (Ship): The player's spaceship.
-        bullets (pygame.sprite.Group): Group of bullets fired by the player's ship.
+        bullets (BulletPool): Pool of bullets fired by the player's ship.
         aliens (AlienFleet): The group of aliens in the game.
         icon (pygame.Surface): Icon image for the game window.
         clock (pygame.time.Clock): Clock object to control the frame rate.
@@ -67,53 +124,191 @@ class AlienInvasion:
         game_active (bool): Flag indicating if the game is currently active.
         game_over (bool): Flag indicating if the game has ended.
     """
+        self.startup_times = {'first_frame': None, 'loaded': None, 'interactive': None}
+        self._launch_time = time.perf_counter()
+        self.headless = headless
+        self.persist = persist and not headless
+        if headless:
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
         pygame.init()
         self.settings = Settings()
+        self.profiler = FrameProfiler(self)
+        self.sim_lock = threading.RLock()
+        self.sim_thread = None
         self.game_stats = GameStats(self)
 
+        if seed is None:
+            seed = self.settings.seed
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.recorder = None
+        if self.settings.record_file:
+            self.recorder = InputRecorder(seed, self.game_stats.hi_score, skip_pauses=headless)
+            # Also written when the game crashes, to reproduce the bug
+            atexit.register(self._save_recording)
+
         # Create the screen with the configured size
-        self.screen = pygame.display.set_mode(
+        display = pygame.display.set_mode(
             (self.settings.screen_w, self.settings.screen_h)
         )
+
+        # In dirty-rect mode the game draws on a recording surface instead of the display
+        self.renderer = None
+        self.screen = display
+        if self.settings.render_mode == 'dirty' and not headless:
+            self.renderer = DirtyRenderer(self, display)
+            self.screen = self.renderer.canvas
+        # Created after the display, so the images are converted to its pixel format
+        self.assets = AssetCache(self.settings.asset_cache_size, self.settings.asset_pixel_format)
+
+        self.preloader = None
+        if not headless:
+            self._preload(display)
     
         self.HUD = HUD(self)
         self.ship = Ship(self)
-        self.bullets = pygame.sprite.Group()
-        self.aliens = AlienFleet(self)
+        self.bullets = BulletPool(self)
+        if self.settings.fleet_backend == 'array':
+            # NumPy is only needed by the array backend
+            from array_fleet import ArrayAlienFleet
+            self.aliens = ArrayAlienFleet(self)
+        else:
+            self.aliens = AlienFleet(self)
+
+        self.running = True
+        self.state = GameStateMachine(self)
+        self.frame = 0
+        self.replay_writer = None
+        if self.settings.replay_file:
+            self.replay_writer = ReplayWriter(self, self.settings.replay_file,
+                self.settings.replay_keyframe_interval)
+        self.clock = pygame.time.Clock()
+
+        if headless:
+            self.bg = None
+            self.laser_sound = None
+            self.impact_sound = None
+            self.audio = SoundManager(self.settings.sound_channels, enabled=False)
+        else:
+            self._setup_window()
+            self._setup_sound()
+            self.assets.release_sources()
+        
+        self.play_button = Button(self, 'Play')
+
+        self.save_writer = None
+        if self.settings.save_file and self.persist:
+            self.save_writer = SaveWriter(self.settings.save_file)
+            self._resume()
+
+    def _preload(self, display):
+        """
+    Decodes the images and sounds on a thread pool while showing the loading screen.
+
+    The mixer is initialized first, as sounds can only be created once it exists. The decoded
+    images are handed to the asset cache and the sounds are kept by the preloader.
+
+    Parameters:
+        display (pygame.Surface): The display surface the loading screen is drawn on.
+
+    Attributes:
+        preloader (AssetPreloader): The preloader holding the decoded images and sounds.
+        startup_times (dict): The times of the first loading screen frame and of the end of loading.
+    """
+        settings = self.settings
+        images = [settings.bg_file, settings.icon, settings.ship_file, settings.alien_file,
+            settings.bullet_file, settings.life_image]
+        sounds = [settings.laser_sound, settings.impact_sound]
+
+        pygame.mixer.init()
+        self.preloader = AssetPreloader(settings.preload_workers)
+        self.preloader.start(images, sounds)
+
+        loading_screen = LoadingScreen(display, settings)
+        clock = pygame.time.Clock()
+        while True:
+            # Keep the window responsive while loading
+            pygame.event.pump()
+            loading_screen.draw(*self.preloader.progress())
+            if self.startup_times['first_frame'] is None:
+                self._mark_startup('first_frame')
+            if self.preloader.done():
+                break
+            clock.tick(settings.FPS)
+
+        for path in images:
+            self.assets.add_source(path, self.preloader.image(path))
+        self._mark_startup('loaded')
+
+    def _mark_startup(self, event):
+        """
+    Records the time from launch to a startup event.
+
+    Parameters:
+        event (str): The name of the event in `startup_times`.
+    """
+        self.startup_times[event] = time.perf_counter() - self._launch_time
+
+    def _report_startup(self):
+        """
+    Prints the time to the first frame and the time to interactive.
+    """
+        times = self.startup_times
+        print(f"Startup: first frame {times['first_frame'] * 1000:.0f} ms, "
+            f"loaded {times['loaded'] * 1000:.0f} ms, "
+            f"interactive {times['interactive'] * 1000:.0f} ms")
+
+    def _setup_window(self):
+        """
+    Sets up the window icon, caption and background image.
 
+    Attributes:
+        icon (pygame.Surface): Icon image for the game window.
+        bg (pygame.Surface): Background image for the game window.
+    """
         # Spaceship icon
-        self.icon = pygame.image.load(self.settings.icon)
+        self.icon = self.assets.get_image(self.settings.icon)
         pygame.display.set_icon(self.icon)
 
         # Set up the caption for the game
         pygame.display.set_caption(self.settings.title)
-        
-        self.running = True
-        self.game_active = True
-        self.game_over = False
-        self.clock = pygame.time.Clock()
-        
+
         # Load background image and scale it to the screen size
-        self.bg = pygame.image.load(self.settings.bg_file)
-        self.bg = pygame.transform.scale(self.bg, 
+        self.bg = self.assets.get_image(self.settings.bg_file,
             (self.settings.screen_w, self.settings.screen_h)
         )
 
-        # Sound setup
-        pygame.mixer.init()
-        self.laser_sound = pygame.mixer.Sound(self.settings.laser_sound)
+    def _setup_sound(self):
+        """
+    Gets the preloaded sound effects, registers them with the sound manager and starts the
+    background music.
+
+    Both effects share the 'sfx' pool, where the impact sound has a higher priority than the
+    laser, so it takes a laser's channel when every channel is busy. It fades out after it starts.
+
+    Attributes:
+        laser_sound (pygame.mixer.Sound): Sound effect for firing lasers.
+        impact_sound (pygame.mixer.Sound): Sound effect for bullet-alien collisions.
+        audio (SoundManager): The manager playing the sound effects on reserved channels.
+    """
+        self.laser_sound = self.preloader.sound(self.settings.laser_sound)
         self.laser_sound.set_volume(0.2)
 
-        self.impact_sound = pygame.mixer.Sound(self.settings.impact_sound)
+        self.impact_sound = self.preloader.sound(self.settings.impact_sound)
         self.impact_sound.set_volume(0.8)
 
+        self.audio = SoundManager(self.settings.sound_channels)
+        self.audio.register('laser', self.laser_sound, 'sfx', priority=1)
+        self.audio.register('impact', self.impact_sound, 'sfx', priority=2, fadeout=1500)
+
         # Load background music
         pygame.mixer.music.load(self.settings.background_sound)
         pygame.mixer.music.set_volume(0.8)
         pygame.mixer.music.play(-1)
-        
-        self.play_button = Button(self, 'Play')
-        self.game_active = False
 
     def run_game(self):
         """
@@ -125,32 +320,181 @@ class AlienInvasion:
     updated game screen. It also controls the frame rate based on the FPS setting. 
     The loop runs until the game is no longer active or the game window is closed.
 
+    The simulation runs with a fixed timestep of `sim_hz` updates per second, independent
+    of the render frame rate. The time of each rendered frame is added to an accumulator,
+    and as many simulation steps as fit in it are run, up to `max_sim_steps` per frame so
+    a slow frame can't make the game spiral. The remaining fraction of a step is used to
+    interpolate the drawn positions between the last two simulation states.
+
     Game flow:
         1. Handles user input via events (mouse, keyboard, etc.).
-        2. Updates game elements like the player's ship, bullets, and aliens if the game is active.
-        3. Updates the display with the latest game graphics.
+        2. Updates game elements like the player's ship, bullets, and aliens if the game is active,
+           once for every simulation step that is due, then plays the requested sounds.
+        3. Updates the display with the latest game graphics, interpolated between steps.
         4. Regulates the frame rate using the clock.
 
+    In headless mode the display update and the frame limiting are skipped, and every loop
+    runs one simulation step.
+
+    With `threaded_sim` set, the simulation steps run on their own thread instead, see
+    `_run_threaded`.
+
     Attributes:
         running (bool): Flag indicating if the game is still running.
         game_active (bool): Flag indicating whether the game is active (not paused or over).
         clock (pygame.time.Clock): Clock object used to control the frame rate.
         settings (Settings): Game settings, including FPS and other configuration options.
     """
+        if self.settings.threaded_sim and not self.headless:
+            self._run_threaded()
+            return
+
+        sim_step = 1 / self.settings.sim_hz
+        accumulator = 0.0
+
+        profiler = self.profiler
+
         # Game loop
         while self.running:
-            # Inputs - events (mouse, keyboard, controllers)
-            self._check_events()
+            with profiler.phase('frame'):
+                # Inputs - events (mouse, keyboard, controllers)
+                with profiler.phase('events'):
+                    self._check_events()
+
+                if self.headless:
+                    self._update_game()
+                    profiler.end_frame()
+                    continue
+
+                # Update the game state (create enemies, destroy enemies, collision)
+                steps = 0
+                while accumulator >= sim_step and steps < self.settings.max_sim_steps:
+                    self._update_game()
+                    accumulator -= sim_step
+                    steps += 1
+                if accumulator >= sim_step:
+                    # Drop the time that could not be caught up
+                    accumulator = 0.0
+
+                # Play the sounds requested by the simulation steps, once each
+                self.audio.flush()
+
+                # Display graphics
+                self._update_screen(accumulator / sim_step)
+            profiler.end_frame()
+            if self.startup_times['interactive'] is None:
+                self._mark_startup('interactive')
+                self._report_startup()
+            accumulator += self.clock.tick(self.settings.FPS) / 1000
+
+    def _run_threaded(self):
+        """
+    Runs the game loop with the simulation on a `SimulationThread` and the rendering on the main thread.
+
+    The main thread polls the events and posts them to the simulation thread, plays the sounds the
+    steps requested, then draws the latest snapshot published by the simulation thread, interpolated
+    by the time elapsed since it. It never takes `sim_lock`, so a slow frame no longer delays the
+    simulation steps, and a slow step no longer delays a frame.
+    """
+        profiler = self.profiler
+        self.sim_thread = SimulationThread(self)
+        self.sim_thread.start()
+        try:
+            while self.running:
+                with profiler.phase('frame'):
+                    with profiler.phase('events'):
+                        self._check_events()
+                        self.sim_thread.play_sounds()
+
+                    snapshot, alpha = self.sim_thread.latest()
+                    self._update_screen(alpha, snapshot)
+                profiler.end_frame()
+                if self.startup_times['interactive'] is None:
+                    self._mark_startup('interactive')
+                    self._report_startup()
+                self.clock.tick(self.settings.FPS)
+        finally:
+            self.sim_thread.stop()
+
+    def step(self, actions=(), n_frames=1):
+        """
+    Advances the game by a number of frames without polling events or rendering.
 
-            # Update the game state (create enemies, destroy enemies, collision)
-            if self.game_active:
-                self.ship.update()
-                self._update_bullets()            
-                self._update_aliens()
+    This is the frame stepping API used to drive the game from code, for example to simulate
+    thousands of frames per second in headless mode for balancing, testing and benchmarking.
 
-            # Display graphics
-            self._update_screen()
-            self.clock.tick(self.settings.FPS) 
+    The actions are applied as if the matching keys were used:
+        - 'left' and 'right' hold the ship's movement for all the stepped frames.
+        - 'fire' fires a single bullet on the first stepped frame.
+
+    Parameters:
+        actions (iterable): The names of the actions to apply.
+        n_frames (int): The number of frames to simulate.
+
+    Returns:
+        bool: True if the game is still active after the stepped frames, False otherwise.
+    """
+        self.ship.moving_left = 'left' in actions
+        self.ship.moving_right = 'right' in actions
+        if 'fire' in actions and self.state.playing:
+            self._fire_bullet()
+
+        for _ in range(n_frames):
+            if not self.game_active:
+                break
+            self._update_game()
+        return self.game_active
+
+    def _update_game(self):
+        """
+    Updates the ship, the bullets and the alien fleet for one frame while the game is playing.
+    During the respawn delay and the level transition the world stays still and the frame
+    counts down the pause instead.
+
+    When recording, the hash of the game state after the frame is recorded too, and the binary
+    replay writer gets to write a keyframe.
+
+    Attributes:
+        frame (int): The number of simulation frames run since the game started.
+    """
+        if self.game_active:
+            if self.state.playing:
+                profiler = self.profiler
+                with profiler.phase('ship'):
+                    self.ship.update()
+                with profiler.phase('bullets'):
+                    self._update_bullets()
+                with profiler.phase('aliens'):
+                    self._update_aliens()
+            else:
+                self.state.tick()
+            self.frame += 1
+            if self.recorder:
+                self.recorder.record_hash(self.frame, self.state_hash())
+            if self.replay_writer:
+                self.replay_writer.record_frame()
+
+    def state_hash(self):
+        """
+    Hashes the simulation state, to check that a replay matches the recorded game frame by frame.
+
+    The hash covers the frame number, the ship, the bullets, the formations and their aliens, and
+    the score, ships left and level. The high score is left out, as it depends on earlier games.
+
+    Returns:
+        str: The hexadecimal hash of the state.
+    """
+        bullets = self.bullets
+        count = bullets.count
+        state = hashlib.blake2b(digest_size=8)
+        state.update(repr((self.frame, self.state.state, self.state.timer, self.ship.x, self.settings.fleet_speed,
+            self.game_stats.score, self.game_stats.ships_left, self.game_stats.level)).encode())
+        state.update(bullets.x[:count].tobytes())
+        state.update(bullets.y[:count].tobytes())
+        for formation in self.aliens.formations:
+            state.update(repr((formation.x, formation.y, formation.direction)).encode())
+            state.update(repr([tuple(alien.local.topleft) for alien in formation.aliens]).encode())
+        return state.hexdigest()
 
     def _update_aliens(self):
         """
@@ -163,47 +507,102 @@ class AlienInvasion:
         3. Checks if the alien fleet has reached the bottom of the screen, triggering a game status check.
 
     If a collision occurs or the fleet reaches the bottom, the game's status is updated to reflect 
-    a potential game over condition.
+    a potential game over condition. The bottom is only checked if the ship collision didn't already
+    stop the game from playing, so a single hit never costs two ships.
 
     Attributes:
         ship (Ship): The player's ship that may collide with aliens.
         aliens (AlienFleet): The group of alien sprites and their associated behavior.
     """
         self.aliens.update_fleet()
-        if pygame.sprite.spritecollideany(self.ship, self.aliens.fleet):
+        if self.aliens.check_ship_collision(self.ship):
             self._check_game_status()
 
-        if self.aliens.check_fleet_bottom():
+        if self.state.playing and self.aliens.check_fleet_bottom():
             self._check_game_status()
 
     def _check_game_status(self):
         """
     Checks the current game status and updates it based on the number of remaining ships.
 
+    The ship is counted in `ships_lost` in both cases.
+
     If the player has more than one ship left:
         1. Reduces the number of remaining ships by one.
         2. Triggers the ship hit logic, updating the ship's state.
-        3. Resets the level for the player to continue.
+        3. Clears the bullets and enters the respawn delay. The fleet is created again when
+           the delay ends, while the game keeps rendering and handling input.
 
     If the player has no ships left:
-        1. Ends the game by setting the game state to inactive and marking it as a game over.
-        2. Plays a game over video or animation.
+        1. Ends the game by entering the game over state.
+
+    In both cases the pending high score is written, as the game pauses there anyway.
 
     Attributes:
         game_stats (GameStats): The game's statistics, including the number of ships left.
         ship (Ship): The player's ship, which will be updated upon collision.
-        game_active (bool): Indicates whether the game is currently active.
-        game_over (bool): Marks the game as over.
+        state (GameStateMachine): The state of the game.
     """
+        self.game_stats.ships_lost += 1
         if self.game_stats.ships_left > 1:
             self.game_stats.ships_left -= 1
             self.ship.ship_hit()
-            self._reset_level()
-            sleep(0.5)
+            self.bullets.empty()
+            self.state.enter(RESPAWN_DELAY, self.state.frames_for(self.settings.respawn_delay),
+                self._respawn)
         else:
-            self.game_active = False
-            self.game_over = True
-            self._play_game_over_video() 
+            self.state.enter(GAME_OVER)
+            # The game is lost, there's nothing left to resume
+            self._save_game()
+        self.game_stats.flush_scores()
+
+    def _respawn(self):
+        """
+    Ends the respawn delay: creates the fleet again and resumes playing.
+    """
+        self.aliens.create_fleet()
+        self.state.enter(PLAYING)
+
+    def _next_level(self):
+        """
+    Ends the level transition: advances the level, scales the difficulty with `difficulty_scale`,
+    creates the next wave, shows the level and resumes playing.
+    """
+        self.game_stats.update_level()
+        self.settings.increase_difficulty()
+        self.aliens.create_fleet()
+        self.HUD._update_level()
+        self.state.enter(PLAYING)
+        self._save_game()
+
+    def _save_game(self):
+        """
+    Saves the game in progress, so the next launch resumes it, or deletes the save once the game
+    is no longer in progress.
+
+    The state is encoded on the calling thread, which takes a fraction of a millisecond, and
+    written to disk by the background save writer.
+    """
+        if not self.save_writer:
+            return
+        if self.game_active:
+            self.save_writer.save(encode_save(self))
+        else:
+            self.save_writer.discard()
+
+    def _resume(self):
+        """
+    Restores the game saved by the previous session, if there is one, and hides the mouse cursor
+    as the game resumes. An unreadable save is reported and deleted.
+    """
+        try:
+            resumed = load_save(self, self.settings.save_file)
+        except ValueError as error:
+            print(f'Could not resume the saved game: {error}')
+            self.save_writer.discard()
+            return
+        if resumed and self.game_active:
+            pygame.mouse.set_visible(False)
 
     def _reset_level(self):
         """
@@ -214,15 +613,13 @@ class AlienInvasion:
 
     It performs the following actions:
         1. Clears the list of bullets to remove any leftover projectiles.
-        2. Empties the alien fleet to remove all currently existing aliens.
-        3. Recreates the alien fleet at its starting position.
+        2. Recreates the alien fleet at its starting position, replacing all currently existing aliens.
 
     Attributes:
-        bullets (pygame.sprite.Group): A group that holds all the bullet sprites in the game.
+        bullets (BulletPool): The pool that holds all the bullets in the game.
         aliens (AlienFleet): The alien fleet, responsible for managing and updating the aliens in the game.
     """
         self.bullets.empty()
-        self.aliens.fleet.empty()
         self.aliens.create_fleet()
 
     def restart_game(self):
@@ -245,8 +642,7 @@ class AlienInvasion:
         game_stats (GameStats): The object that manages and tracks the player's statistics during the game.
         HUD (HUD): The object that updates and displays the heads-up display (HUD) with current game information.
         ship (Ship): The player's spaceship, which is repositioned to the center of the screen.
-        game_active (bool): A flag that indicates whether the game is currently active or paused.
-        game_over (bool): A flag that indicates whether the game has ended.
+        state (GameStateMachine): The state of the game, which enters the playing state.
     """
         # Set up dynamic settings
         self.settings.init_dynamic_settings()
@@ -260,12 +656,10 @@ class AlienInvasion:
         # Reset level
         self._reset_level()
         self.HUD._update_level()
-        self.game_stats.update_level()
 
         # Ship get centered
         self.ship.center_ship()
-        self.game_active = True
-        self.game_over = False
+        self.state.enter(PLAYING)
         pygame.mouse.set_visible(False)
 
     def _update_bullets(self):
@@ -277,18 +671,16 @@ class AlienInvasion:
     for collisions between bullets and aliens.
 
     Actions performed:
-        1. Updates the position of each bullet in the `bullets` sprite group.
-        2. Removes bullets that have moved off the top of the screen.
+        1. Updates the position of each bullet in the `bullets` pool.
+        2. Removes bullets that have moved off the top of the screen, compacting the pool in place.
         3. Checks for any collisions between bullets and aliens, triggering the necessary response.
 
     Attributes:
-        bullets (pygame.sprite.Group): A group containing all active bullets currently on the screen.
+        bullets (BulletPool): The pool containing all active bullets currently on the screen.
         screen (pygame.Surface): The screen surface used to check if bullets have gone off-screen.
     """
         self.bullets.update()
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= self.screen.get_rect().top:
-                self.bullets.remove(bullet)
+        self.bullets.cull(self.screen.get_rect().top)
 
         self._check_bullet_alien_collision()
            
@@ -298,34 +690,37 @@ class AlienInvasion:
     and updates game state accordingly.
 
     This method detects when a bullet collides with an alien, removes both the bullet and the alien, 
-    plays the impact sound effect, updates the game statistics and score, and checks if the alien fleet 
-    has been completely destroyed. If all aliens are eliminated, the level is reset.
+    requests the impact sound effect, updates the game statistics and score, and checks if the alien fleet 
+    has been completely destroyed. If all aliens are eliminated, the level transition starts.
 
     Actions performed:
-        1. Detects collisions between bullets and aliens using `pygame.sprite.groupcollide`.
-        2. If collisions are detected, plays an impact sound effect (if not too many channels are active),
-           fades out the sound, and updates the game statistics and score.
-        3. If no aliens are left, the level is reset and the HUD is updated.
+        1. Detects collisions between bullets and aliens using the fleet's `collide_bullets`.
+        2. If collisions are detected, requests the impact sound effect from the sound manager, which
+           plays it at most once per frame, and updates the game statistics and score.
+        3. If no aliens are left, the bullets are cleared, the pending high score is written and the
+           level transition starts. The next wave is created and the HUD updated when it ends, so
+           the old level is torn down and the new one built on different frames.
 
     Attributes:
-        bullets (pygame.sprite.Group): The group of all active bullets currently on the screen.
+        bullets (BulletPool): The pool of all active bullets currently on the screen.
         aliens (AlienFleet): The fleet of aliens to check for collisions.
-        impact_sound (pygame.mixer.Sound): The sound effect played upon collision between bullets and aliens.
+        audio (SoundManager): The sound manager playing the impact sound upon collision between bullets and aliens.
         game_stats (GameStats): Object that tracks the game's statistics and updates based on collisions.
         HUD (HUD): The heads-up display that updates the score and level information.
     """
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens.fleet, True, True)
-        if collisions and self.impact_sound.get_num_channels() <= 4:
-            self.impact_sound.play()
-            self.impact_sound.fadeout(1500)
-            self.game_stats.update(collisions)     
+        collisions = self.aliens.collide_bullets(self.bullets)
+        if collisions:
+            self.audio.play('impact')
+            self.game_stats.update(collisions)
             self.HUD.update_scores()
 
         if not self.aliens.fleet:
-            self._reset_level()
-            self.HUD._update_level()
+            self.bullets.empty()
+            self.game_stats.flush_scores()
+            self.state.enter(LEVEL_TRANSITION,
+                self.state.frames_for(self.settings.level_transition_delay), self._next_level)
 
-    def _update_screen(self):
+    def _update_screen(self, alpha=1.0, snapshot=None):
         """
     Updates and redraws the game screen with the latest visual elements.
 
@@ -333,6 +728,19 @@ class AlienInvasion:
     to cover the entire screen, then iterates over and draws all active bullets, the spaceship, the alien fleet, 
     and the heads-up display (HUD). After all elements are drawn, the updated screen is displayed to the player.
 
+    Moving elements are drawn between their previous and current simulation positions, according to
+    how far the render time is into the next simulation step.
+
+    With a snapshot from the simulation thread, the bullets, ship, fleet and HUD are drawn from it
+    instead of from the live game, which that thread keeps updating.
+
+    In dirty-rect mode the draw calls are recorded and the renderer only redraws and presents the
+    regions that changed since the last frame, skipping the frame entirely if nothing changed.
+
+    Parameters:
+        alpha (float): The interpolation factor between the previous (0) and current (1) simulation state.
+        snapshot (GameSnapshot): The state to draw, or None to draw the live game.
+
     Actions performed:
         1. Draws the background image to the screen.
         2. Draws all active bullets currently in the game.
@@ -343,39 +751,66 @@ class AlienInvasion:
     Attributes:
         screen (pygame.Surface): The surface representing the game window where all elements are drawn.
         bg (pygame.Surface): The background image to be drawn on the screen.
-        bullets (pygame.sprite.Group): The group containing all active bullets in the game.
+        bullets (BulletPool): The pool containing all active bullets in the game.
         ship (Ship): The player's spaceship object.
         aliens (AlienFleet): The fleet of alien sprites.
         HUD (HUD): The heads-up display object that manages score and game status.
     """
-        self.screen.blit(self.bg, (0, 0))
-        for bullet in self.bullets.sprites():
-            bullet.draw()
-        self.ship.draw()
-        self.aliens.draw_fleet()
-        self.HUD.draw()
-
-        if not self.game_active and self.game_over:
+        profiler = self.profiler
+        with profiler.phase('draw'):
+            if self.renderer:
+                self.renderer.begin_frame()
+            else:
+                self.screen.blit(self.bg, (0, 0))
+            if snapshot:
+                snapshot.draw(self, alpha)
+            else:
+                self.bullets.draw(alpha)
+                self.ship.draw(alpha)
+                self.aliens.draw_fleet(alpha)
+        with profiler.phase('hud'):
+            self.HUD.draw(snapshot.hud if snapshot else None)
+            profiler.draw()
+
+        game_over, game_active = (snapshot.game_over, snapshot.game_active) if snapshot \
+            else (self.game_over, self.game_active)
+        if game_over:
             self._draw_game_over()  
             pygame.mouse.set_visible(True)
 
-        elif not self.game_active:
+        elif not game_active:
             self.play_button.draw()
             pygame.mouse.set_visible(True)
 
-        pygame.display.flip()
+        with profiler.phase('present'):
+            if self.renderer:
+                self.renderer.present()
+            else:
+                pygame.display.flip()
+
+    def _draw_game_over(self):
+        """
+    Draws the game over screen, which offers the 'Play' button to start a new game.
+    """
+        self.play_button.draw()
 
     def _check_events(self):
         """
     Handles and processes all input events from the user, such as keyboard, mouse, or quit events.
 
     This method listens for all events in the event queue and responds accordingly:
-        - If the user closes the game window (QUIT event), the game ends by setting `running` to False 
-          and quitting the pygame session.
+        - If the user closes the game window (QUIT event), the game ends by setting `running` to False,
+          saving the game in progress, writing the pending scores and the input recording and
+          quitting the pygame session.
         - If a key is pressed (KEYDOWN event), it calls the appropriate method to handle the key press.
         - If a key is released (KEYUP event), it calls the appropriate method to handle the key release.
         - If the user clicks the mouse (MOUSEBUTTONDOWN event), it checks if a button was clicked 
           and calls the respective button click handler.
+        - If the window needs repainting (WINDOWEXPOSED event), the dirty-rect renderer redraws
+          the whole screen on the next frame.
+
+    With the simulation on its own thread, the events are posted to it and handled before its
+    next step, except the events that quit, which stop the thread and are handled at once.
 
     Actions performed:
         1. Processes the quit event to terminate the game.
@@ -387,35 +822,110 @@ class AlienInvasion:
         pygame (module): The Pygame library used for event handling and game functionality.
     """
         for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.running = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_events(event)
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_events(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                self._check_button_clicked()
-
-    def _check_button_clicked(self):
+            if self.sim_thread:
+                if not self._quits(event):
+                    # The simulation thread handles it before its next step
+                    self.sim_thread.post(event)
+                    continue
+                # The quit is recorded and handled after the events posted before it
+                self._stop_sim_thread()
+            self._handle_event(event)
+
+    def _quits(self, event):
+        """
+    Checks whether an event ends the game, when the window is closed or the 'Q' key is pressed.
+
+    Parameters:
+        event (pygame.event.Event): The event to check.
+
+    Returns:
+        bool: True if handling the event quits the game.
+    """
+        return event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_q)
+
+    def _handle_event(self, event):
+        """
+    Handles a single input event, recording it with the current frame when recording.
+
+    Parameters:
+        event (pygame.event.Event): The event to handle.
+    """
+        if self.recorder:
+            self.recorder.record_event(self.frame, event)
+        if self.replay_writer:
+            self.replay_writer.record_event(event)
+        if event.type == pygame.QUIT:
+            self._quit()
+        elif event.type == pygame.KEYDOWN:
+            self._check_keydown_events(event)
+        elif event.type == pygame.KEYUP:
+            self._check_keyup_events(event)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self._check_button_clicked(event.pos)
+        elif event.type == pygame.WINDOWEXPOSED and self.renderer:
+            self.renderer.invalidate()
+
+    def _quit(self):
+        """
+    Ends the game: saves the game in progress, writes the pending scores, profiler dumps and input recording,
+    then quits pygame and exits.
+
+    Attributes:
+        running (bool): Set to False as the game stops running.
+    """
+        self.running = False
+        self._stop_sim_thread()
+        self._save_game()
+        if self.save_writer:
+            self.save_writer.close()
+        self.game_stats.close()
+        self.profiler.close()
+        if self.recorder:
+            self._save_recording()
+        if self.replay_writer:
+            self.replay_writer.close()
+        pygame.quit()
+        sys.exit()
+
+    def _stop_sim_thread(self):
+        """
+    Stops the simulation thread, if there is one, once its current step is finished, and handles the
+    events posted to it that it did not handle yet.
+    """
+        if self.sim_thread and threading.current_thread() is not self.sim_thread:
+            self.sim_thread.stop()
+            self.sim_thread.handle_events()
+
+    def _save_recording(self):
+        """
+    Writes the input recording to the `record_file`. It runs on quit, and at interpreter exit
+    if the game ended any other way, such as an unhandled exception.
+    """
+        atexit.unregister(self._save_recording)
+        self.recorder.save(self.settings.record_file)
+
+    def _check_button_clicked(self, mouse_pos):
         """
     Checks if the play button is clicked by the user and triggers the game restart if clicked.
 
-    This method checks the current mouse position and determines whether the user has clicked 
+    This method checks the position of the click and determines whether the user has clicked 
     on the play button. If the play button is clicked, it calls the `restart_game` method to
     reset the game state and start a new game session.
 
+    The position is taken from the click event rather than the current mouse position, so a
+    replayed click lands where it was recorded.
+
+    Parameters:
+        mouse_pos (tuple): The (x, y) position of the click.
+
     Actions performed:
-        1. Retrieves the mouse position.
-        2. Checks if the play button is clicked using the `check_clicked` method.
-        3. If the play button is clicked, it restarts the game by calling `restart_game`.
+        1. Checks if the play button is clicked using the `check_clicked` method.
+        2. If the play button is clicked, it restarts the game by calling `restart_game`.
 
     Attributes:
         play_button (Button): The button used to start or restart the game.
         pygame (module): The Pygame library used for mouse input and event handling.
     """
-        mouse_pos = pygame.mouse.get_pos()
         if self.play_button.check_clicked(mouse_pos):
             self.restart_game()
 
@@ -456,10 +966,11 @@ class AlienInvasion:
            of the ship to `True`, causing it to move right.
         2. If the left arrow key (pygame.K_LEFT) is pressed, sets the `moving_left` attribute
            of the ship to `True`, causing it to move left.
-        3. If the 'Q' key (pygame.K_q) is pressed, sets `running` to `False`, saves the game 
-           scores, quits the game, and exits the program.
+        3. If the 'Q' key (pygame.K_q) is pressed, sets `running` to `False`, saves the game in progress,
+           writes the pending game scores and the input recording, quits the game, and exits the program.
         4. If the spacebar (pygame.K_SPACE) is pressed, calls the `_fire_bullet()` method to fire
            a bullet from the ship.
+        5. If the F3 key (pygame.K_F3) is pressed, shows or hides the profiler overlay.
 
     Parameters:
         event (pygame.event): The event object containing information about the key press event.
@@ -473,41 +984,39 @@ class AlienInvasion:
         elif event.key == pygame.K_LEFT:
             self.ship.moving_left = True
         elif event.key == pygame.K_q:
-            self.running = False
-            self.game_stats.save_scores()
-            pygame.quit()
-            sys.exit()
+            self._quit()
         elif event.key == pygame.K_SPACE:
             self._fire_bullet()
+        elif event.key == pygame.K_F3:
+            self.profiler.toggle_overlay()
     
     def _fire_bullet(self):
         """
     Fires a bullet from the player's ship if the maximum bullet limit has not been reached.
 
-    This method checks if the number of bullets currently on screen is less than or equal
-    to the configured maximum bullet amount. If the condition is met, a new bullet is created
-    and added to the bullet group, and the laser sound effect is played.
+    This method checks that the game is playing and that the number of bullets currently on screen
+    is less than or equal to the configured maximum bullet amount. If the condition is met, a free bullet is taken
+    from the bullet pool, and the laser sound effect is played.
 
-    The bullet is created as an instance of the `Bullet` class and is added to the `bullets` group,
-    allowing it to be updated and drawn during the game loop.
+    The bullet is reused from the `bullets` pool instead of being allocated, and it is updated
+    and drawn with the rest of the pool during the game loop.
 
     Actions performed:
         1. If the current number of bullets is less than or equal to the maximum allowed by the settings,
-           a new bullet is instantiated and added to the `bullets` sprite group.
-        2. The laser sound effect is played upon firing the bullet.
+           a bullet is fired from the `bullets` pool at the ship's position.
+        2. The laser sound effect is requested from the sound manager upon firing the bullet.
 
     Attributes:
-        bullets (pygame.sprite.Group): A group that holds all the active bullets in the game.
-        laser_sound (pygame.mixer.Sound): The sound effect that is played when a bullet is fired.
+        bullets (BulletPool): The pool that holds all the active bullets in the game.
+        audio (SoundManager): The sound manager playing the laser sound when a bullet is fired.
         settings (Settings): The configuration object that holds game settings such as the maximum bullet amount.
 
     Returns:
         None
     """
-        if len(self.bullets) <= self.settings.bullet_amount:
-            new_bullet = Bullet(self)
-            self.bullets.add(new_bullet)            
-            self.laser_sound.play()
+        if self.state.playing and len(self.bullets) <= self.settings.bullet_amount:
+            if self.bullets.fire(self.ship.rect.midtop):
+                self.audio.play('laser')
 
     #def _draw_game_over(self):
         """
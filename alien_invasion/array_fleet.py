@@ -0,0 +1,176 @@
+import numpy as np
+from alien_fleet import AlienFleet
+
+class ArrayAlienFleet(AlienFleet):
+    """
+    A fleet backend that keeps the local positions of the aliens in contiguous NumPy arrays.
+
+    The formations move exactly like in `AlienFleet`. The ship and bullet collisions are
+    computed as vectorized operations over the arrays of every formation at once, instead
+    of querying the spatial index of each formation. The fleet behaves exactly like
+    `AlienFleet`.
+
+    Attributes:
+    aliens (list): The alien sprites, indexed like the arrays.
+    local_x (numpy.ndarray): The local x-coordinate of each alien.
+    local_y (numpy.ndarray): The local y-coordinate of each alien.
+    formation_index (numpy.ndarray): The index in `formations` of each alien's formation.
+    alive (numpy.ndarray): Whether each alien is still part of the fleet.
+    alien_w (int): The width of an alien.
+    alien_h (int): The height of an alien.
+    """
+    def __init__(self, game) -> None:
+        """
+        Initializes the array fleet.
+
+        Args:
+        game (AlienInvasion): The main game object that provides access to settings and resources.
+        """
+        self._arrays_dirty = True
+        super().__init__(game)
+
+    def add_formation(self, x, y, positions, direction=1):
+        """
+        Adds a formation like `AlienFleet.add_formation`, and rebuilds the arrays.
+
+        Returns:
+        Formation: The new formation.
+        """
+        formation = super().add_formation(x, y, positions, direction)
+        self._build_arrays()
+        return formation
+
+    def add_alien(self, x, y):
+        """
+        Adds an alien like `AlienFleet.add_alien`, and marks the arrays for rebuilding.
+
+        Returns:
+        Alien: The new alien.
+        """
+        alien = super().add_alien(x, y)
+        self._arrays_dirty = True
+        return alien
+
+    def clear(self):
+        """
+        Removes every formation and alien from the fleet.
+        """
+        super().clear()
+        self._arrays_dirty = True
+
+    def _living_formations(self):
+        """
+        Returns the formations that still have aliens, marking the arrays for rebuilding if
+        a formation was dropped.
+
+        Returns:
+        list: The formations with aliens left.
+        """
+        count = len(self.formations)
+        formations = super()._living_formations()
+        if len(formations) != count:
+            self._arrays_dirty = True
+        return formations
+
+    def _build_arrays(self):
+        """
+        Copies the local positions of the aliens of every formation into the arrays.
+        """
+        self.aliens = [alien for formation in self.formations for alien in formation.aliens]
+        count = len(self.aliens)
+        self.local_x = np.fromiter((alien.local.x for alien in self.aliens), dtype=np.int64, count=count)
+        self.local_y = np.fromiter((alien.local.y for alien in self.aliens), dtype=np.int64, count=count)
+        self.formation_index = np.fromiter((index for index, formation in enumerate(self.formations)
+            for _ in formation.aliens), dtype=np.int64, count=count)
+        self.alive = np.ones(count, dtype=bool)
+        self.alien_w = self.settings.alien_w
+        self.alien_h = self.settings.alien_h
+        self._alive_count = count
+        self._arrays_dirty = False
+
+    def _sync_arrays(self):
+        """
+        Rebuilds the arrays if formations changed, and marks the aliens removed from the
+        sprite group outside of the fleet as dead.
+        """
+        if self._arrays_dirty:
+            self._build_arrays()
+        elif len(self.fleet) != self._alive_count:
+            self.alive = np.fromiter((alien.alive() for alien in self.aliens), dtype=bool,
+                count=len(self.aliens))
+            self._alive_count = len(self.fleet)
+
+    def _world_positions(self):
+        """
+        Derives the screen positions of the aliens from the origins of their formations.
+
+        Returns:
+        tuple: The x and y arrays of the aliens' positions on the screen.
+        """
+        offsets = np.array([formation.offset for formation in self.formations],
+            dtype=np.int64).reshape(-1, 2)
+        if len(offsets) == 1:
+            return self.local_x + offsets[0, 0], self.local_y + offsets[0, 1]
+        return (self.local_x + offsets[self.formation_index, 0],
+            self.local_y + offsets[self.formation_index, 1])
+
+    def _overlaps(self, rect, x, y):
+        """
+        Returns a mask of the living aliens that overlap a rect, using the rules of `Rect.colliderect`.
+
+        Args:
+        rect (pygame.Rect): The rect to test against the fleet.
+        x (numpy.ndarray): The x-coordinate of each alien on the screen.
+        y (numpy.ndarray): The y-coordinate of each alien on the screen.
+
+        Returns:
+        numpy.ndarray: True for every living alien overlapping the rect.
+        """
+        return (self.alive
+            & (x < rect.right) & (rect.left < x + self.alien_w)
+            & (y < rect.bottom) & (rect.top < y + self.alien_h))
+
+    def check_ship_collision(self, ship):
+        """
+        Checks if any alien in the fleet collides with the player's ship.
+
+        Args:
+        ship (Ship): The player's ship.
+
+        Returns:
+        Alien: The first alien colliding with the ship, or None if there is no collision.
+        """
+        bounds = self.bounds()
+        if bounds is None or not ship.rect.colliderect(bounds):
+            return None
+        self._sync_arrays()
+        hits = np.flatnonzero(self._overlaps(ship.rect, *self._world_positions()))
+        return self.aliens[hits[0]] if hits.size else None
+
+    def collide_bullets(self, bullets):
+        """
+        Removes every bullet and alien that collide with each other.
+
+        Args:
+        bullets (BulletPool): The bullets fired by the player's ship.
+
+        Returns:
+        dict: A dictionary mapping each bullet that hit to the list of aliens it destroyed,
+              in the same form as `pygame.sprite.groupcollide`.
+        """
+        self._sync_arrays()
+        x, y = self._world_positions()
+        collisions = {}
+        for bullet in bullets.sprites():
+            hits = np.flatnonzero(self._overlaps(bullet.rect, x, y))
+            if not hits.size:
+                continue
+            self.alive[hits] = False
+            destroyed = [self.aliens[i] for i in hits]
+            # The spatial indexes of the formations aren't used by this backend
+            for alien in destroyed:
+                alien.kill()
+            collisions[bullet] = destroyed
+            bullet.kill()
+        self._alive_count = len(self.fleet)
+        return collisions
@@ -0,0 +1,240 @@
+from collections import OrderedDict
+import pygame
+
+# Colors tried, in order, as the colorkey of images with fully transparent and fully opaque pixels only
+COLORKEYS = ((255, 0, 255), (0, 255, 0), (0, 0, 255), (1, 2, 3))
+
+class AssetCache:
+    """
+    A class to load, scale and share image surfaces between all game entities.
+
+    Every image is loaded from disk and scaled only once. The resulting Surface is stored
+    under a key made of the file path, the target size and the pixel format, and every later
+    request for the same key returns the shared Surface. Entities must treat the returned
+    Surface as read-only.
+
+    Once the display exists, every surface is converted to the display pixel format after
+    scaling, so blits don't have to convert each pixel. With the 'auto' pixel format the
+    conversion is picked from the image itself: fully opaque images get `convert()`, images
+    whose pixels are all fully transparent or fully opaque get a colorkey, and other alpha
+    images get `convert_alpha()`. Before the display exists surfaces are kept in the loaded
+    ('source') format.
+
+    Attributes:
+        capacity (int): The maximum number of surfaces kept in the cache before eviction.
+        surfaces (OrderedDict): The cached surfaces, ordered from least to most recently used.
+        hits (int): The number of requests answered from the cache.
+        misses (int): The number of requests that had to load the image from disk.
+        evictions (int): The number of surfaces removed from the cache to respect the capacity.
+        loads (int): The number of times an image file was decoded from disk.
+        conversions (int): The number of surfaces converted to the display pixel format.
+        pixel_format (str): The pixel format used when `get_image` is not given one.
+        sources (dict): Images decoded ahead of time, keyed by file path, used instead of loading them from disk.
+    """
+
+    def __init__(self, capacity=64, pixel_format='auto') -> None:
+        """
+        Initializes an empty asset cache.
+
+        Args:
+            capacity (int): The maximum number of surfaces kept in the cache.
+            pixel_format (str): The default pixel format: 'auto', 'opaque', 'alpha', 'colorkey' or 'source'.
+        """
+        self.capacity = capacity
+        self.pixel_format = pixel_format
+        self.sources = {}
+        self.surfaces = OrderedDict()
+        self.reset_counters()
+
+    def reset_counters(self):
+        """
+        Resets the hit, miss, eviction and load counters to zero.
+        """
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loads = 0
+        self.conversions = 0
+
+    def get_image(self, path, size=None, pixel_format=None):
+        """
+        Returns the image stored at `path`, scaled to `size` and in the requested pixel format.
+
+        Args:
+            path (str): The file path of the image.
+            size (tuple): The (width, height) to scale the image to, or None to keep its size.
+            pixel_format (str): The pixel format of the surface, or None to use the cache's default.
+
+        Returns:
+            pygame.Surface: The shared surface for the given key.
+        """
+        pixel_format = pixel_format or self.pixel_format
+        if pygame.display.get_surface() is None:
+            # Surfaces can only be converted once the display exists
+            pixel_format = 'source'
+        key = (path, tuple(size) if size else None, pixel_format)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._load(path, size, pixel_format)
+        self.surfaces[key] = surface
+        self._evict()
+        return surface
+
+    def _load(self, path, size, pixel_format):
+        """
+        Loads an image from disk, scales it to the requested size and converts it to the pixel format.
+
+        Args:
+            path (str): The file path of the image.
+            size (tuple): The (width, height) to scale the image to, or None to keep its size.
+            pixel_format (str): The pixel format of the surface, or None to keep the loaded format.
+
+        Returns:
+            pygame.Surface: The loaded, scaled and converted surface.
+        """
+        surface = self._load_source(path)
+        if size and surface.get_size() != tuple(size):
+            surface = pygame.transform.scale(surface, size)
+        return self.normalize(surface, pixel_format)
+
+    def _load_source(self, path):
+        """
+        Returns the unscaled image at `path` in its loaded format, reusing a cached copy when one exists.
+
+        Args:
+            path (str): The file path of the image.
+
+        Returns:
+            pygame.Surface: The unscaled surface.
+        """
+        surface = self.sources.get(path) or self.surfaces.get((path, None, 'source'))
+        if surface is not None:
+            return surface
+        self.loads += 1
+        return pygame.image.load(path)
+
+    def normalize(self, surface, pixel_format='auto'):
+        """
+        Converts a surface to the display pixel format.
+
+        Args:
+            surface (pygame.Surface): The surface to convert.
+            pixel_format (str): 'auto' to detect the format, 'opaque', 'alpha', 'colorkey' or 'source'.
+
+        Returns:
+            pygame.Surface: The converted surface, or `surface` itself for the 'source' format.
+        """
+        if pixel_format == 'source':
+            return surface
+        if pixel_format == 'auto':
+            pixel_format = self.detect_format(surface)
+        self.conversions += 1
+        if pixel_format == 'alpha':
+            return surface.convert_alpha()
+        if pixel_format == 'colorkey':
+            converted = self._convert_colorkey(surface)
+            if converted is not None:
+                return converted
+            return surface.convert_alpha()
+        converted = surface.convert()
+        if converted.get_colorkey() is not None:
+            converted.set_colorkey(converted.get_colorkey(), pygame.RLEACCEL)
+        return converted
+
+    @staticmethod
+    def detect_format(surface):
+        """
+        Returns the pixel format that blits a surface the fastest without changing how it looks.
+
+        Args:
+            surface (pygame.Surface): The surface to inspect.
+
+        Returns:
+            str: 'opaque' if every pixel is opaque or the surface uses a colorkey, 'colorkey' if
+                 every pixel is fully transparent or fully opaque, 'alpha' otherwise.
+        """
+        if not surface.get_flags() & pygame.SRCALPHA:
+            return 'opaque'
+        pixels = surface.get_width() * surface.get_height()
+        opaque = pygame.mask.from_surface(surface, 254).count()
+        if opaque == pixels:
+            return 'opaque'
+        if pygame.mask.from_surface(surface, 0).count() == opaque:
+            return 'colorkey'
+        return 'alpha'
+
+    def _convert_colorkey(self, surface):
+        """
+        Converts a surface with only fully transparent and fully opaque pixels to a colorkeyed surface.
+
+        Args:
+            surface (pygame.Surface): The surface to convert.
+
+        Returns:
+            pygame.Surface: The colorkeyed surface, or None if every candidate color is used by the image.
+        """
+        opaque = pygame.mask.from_surface(surface, 254)
+        for color in COLORKEYS:
+            # Only the colors of the opaque pixels matter
+            used = pygame.mask.from_threshold(surface, color + (255,), (1, 1, 1, 255))
+            if used.overlap_area(opaque, (0, 0)):
+                continue
+            converted = surface.convert()
+            transparent = opaque.copy()
+            transparent.invert()
+            transparent.to_surface(converted, setcolor=color, unsetcolor=None)
+            converted.set_colorkey(color, pygame.RLEACCEL)
+            return converted
+        return None
+
+    def add_source(self, path, surface):
+        """
+        Provides an image decoded ahead of time, so it isn't loaded from disk again.
+
+        Args:
+            path (str): The file path of the image.
+            surface (pygame.Surface): The decoded, unscaled image.
+        """
+        self.sources[path] = surface
+
+    def release_sources(self):
+        """
+        Drops the images decoded ahead of time once every entity got its scaled copy.
+        """
+        self.sources.clear()
+
+    def _evict(self):
+        """
+        Removes the least recently used surfaces until the cache respects its capacity.
+        """
+        while len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """
+        Removes every surface from the cache.
+        """
+        self.evictions += len(self.surfaces)
+        self.surfaces.clear()
+
+    def stats(self):
+        """
+        Returns the cache counters.
+
+        Returns:
+            dict: The number of cached surfaces, hits, misses, evictions, disk loads and conversions.
+        """
+        return {
+            'size': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'loads': self.loads,
+            'conversions': self.conversions,
+        }
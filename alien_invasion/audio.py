@@ -0,0 +1,170 @@
+import pygame
+
+class SoundManager:
+    """
+    A class to play the sound effects on reserved channel pools with priorities.
+
+    Each sound category gets its own pool of reserved mixer channels, so a burst of one
+    category can't take the channels of another, nor those of the music. The sounds of a
+    category share its pool and compete for its channels by priority. The game only
+    requests sounds while it updates; the requests are coalesced and played once per frame
+    by `flush()`, so a sound requested many times in one frame is played once. When every
+    channel of a pool is busy, the channel playing the lowest priority sound, and of those
+    the oldest one, is stolen if its priority isn't higher than the new sound's. Otherwise
+    the new sound is dropped. The audio cost of a frame is therefore bounded by the number
+    of registered sounds, however many collisions happen.
+
+    When disabled (no audio device) every request is ignored.
+
+    Attributes:
+        enabled (bool): Whether sounds are played.
+        sounds (dict): The (sound, category, priority, fadeout) of each registered sound, keyed by name.
+        pools (dict): The reserved channels of each category.
+        requests (dict): The names of the sounds requested this frame, with the number of requests.
+        played (int): The number of sounds played.
+        stolen (int): The number of sounds cut short to play another one.
+        dropped (int): The number of sounds not played because their pool was busy with higher priorities.
+        coalesced (int): The number of requests merged into a sound already requested in the same frame.
+    """
+
+    def __init__(self, pools, enabled=True) -> None:
+        """
+        Initializes the manager and reserves the channels of every category.
+
+        Args:
+            pools (dict): The number of channels reserved for each category.
+            enabled (bool): Whether sounds are played. The mixer must be initialized when enabled.
+        """
+        self.enabled = enabled
+        self.sounds = {}
+        self.pools = {}
+        self.requests = {}
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self._playing = {}
+        self._plays = 0
+        if not enabled:
+            return
+
+        reserved = sum(pools.values())
+        # Keep the default channels available for anything else on top of the reserved ones
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), reserved + 8))
+        pygame.mixer.set_reserved(reserved)
+        index = 0
+        for category, size in pools.items():
+            self.pools[category] = [pygame.mixer.Channel(index + i) for i in range(size)]
+            index += size
+
+    def register(self, name, sound, category, priority=0, fadeout=0):
+        """
+        Registers a sound effect.
+
+        Args:
+            name (str): The name the sound is requested with.
+            sound (pygame.mixer.Sound): The sound, or None when the manager is disabled.
+            category (str): The category whose channels play the sound.
+            priority (int): The priority of the sound; higher priorities steal channels from lower ones.
+            fadeout (int): The number of milliseconds the sound fades out over once started, 0 to play it fully.
+        """
+        self.sounds[name] = (sound, category, priority, fadeout)
+
+    def play(self, name):
+        """
+        Requests a sound to be played at the end of the frame.
+
+        Args:
+            name (str): The name of the registered sound.
+        """
+        if not self.enabled:
+            return
+        count = self.requests.get(name, 0)
+        if count:
+            self.coalesced += 1
+        self.requests[name] = count + 1
+
+    def take_requests(self):
+        """
+        Returns the sounds requested so far and forgets them, to play them from another thread.
+
+        Returns:
+            dict: The names of the requested sounds, with the number of requests.
+        """
+        requests, self.requests = self.requests, {}
+        return requests
+
+    def flush(self, requests=None):
+        """
+        Plays the sounds requested during the frame, once each, from the highest priority to the lowest.
+
+        Args:
+            requests (dict): The requests to play, taken with `take_requests()`, or None to play
+                             the requests made on this manager.
+        """
+        if requests is None:
+            requests = self.take_requests()
+        if not requests:
+            return
+        names = sorted(requests, key=lambda name: self.sounds[name][2], reverse=True)
+        for name in names:
+            self._play_now(name)
+
+    def _play_now(self, name):
+        """
+        Plays a sound on a free channel of its pool, stealing one if needed.
+
+        Args:
+            name (str): The name of the registered sound.
+        """
+        sound, category, priority, fadeout = self.sounds[name]
+        channel = self._free_channel(category, priority)
+        if channel is None:
+            self.dropped += 1
+            return
+        channel.play(sound)
+        if fadeout:
+            channel.fadeout(fadeout)
+        self._plays += 1
+        self._playing[channel] = (priority, self._plays)
+        self.played += 1
+
+    def _free_channel(self, category, priority):
+        """
+        Returns a channel of the category's pool to play a sound of the given priority on.
+
+        Args:
+            category (str): The category of the sound.
+            priority (int): The priority of the sound.
+
+        Returns:
+            pygame.mixer.Channel: An idle channel, a stolen channel, or None if every channel
+                                  plays a sound of higher priority.
+        """
+        victim = None
+        victim_key = None
+        for channel in self.pools[category]:
+            if not channel.get_busy():
+                return channel
+            key = self._playing.get(channel, (0, 0))
+            if victim_key is None or key < victim_key:
+                victim, victim_key = channel, key
+        if victim is None or victim_key[0] > priority:
+            return None
+        victim.stop()
+        self.stolen += 1
+        return victim
+
+    def stats(self):
+        """
+        Returns the sound counters.
+
+        Returns:
+            dict: The number of sounds played, stolen, dropped and coalesced.
+        """
+        return {
+            'played': self.played,
+            'stolen': self.stolen,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
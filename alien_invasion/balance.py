@@ -0,0 +1,305 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# The settings swept by the balancing runner, and whether `restart_game` resets them
+SWEEPABLE = {
+    'difficulty_scale': False,
+    'fleet_speed': True,
+    'bullet_amount': True,
+    'fleet_drop_amount': False,
+}
+
+_game = None
+
+def _init_worker():
+    """
+    Creates the headless game reused by every run of a worker process.
+    """
+    global _game
+    # The game loads its assets relative to its own directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    from alien_invasion import AlienInvasion
+    _game = AlienInvasion(headless=True)
+
+def _apply(game, config, dynamic):
+    """
+    Sets the swept settings of a configuration on a game.
+
+    Args:
+        game (AlienInvasion): The game to configure.
+        config (dict): The value of each swept setting.
+        dynamic (bool): True to set the settings `restart_game` resets, False for the others.
+    """
+    for name, value in config.items():
+        if SWEEPABLE[name] == dynamic:
+            setattr(game.settings, name, value)
+
+def _target_x(game):
+    """
+    Returns the x-coordinate of the center of the lowest alien, the one the scripted player aims at.
+    """
+    target = None
+    lowest = None
+    for formation in game.aliens.formations:
+        dx, dy = formation.offset
+        for alien in formation.aliens:
+            bottom = alien.local.bottom + dy
+            if lowest is None or bottom > lowest:
+                lowest = bottom
+                target = alien.local.centerx + dx
+    return target
+
+def play(game, config, seed, max_frames, max_level, noise):
+    """
+    Plays one game with the scripted player and records how far it gets.
+
+    The scripted player moves under the lowest alien and fires when it is below it. With a
+    probability of `noise` per frame it takes a random action instead, so runs with different
+    seeds differ.
+
+    Args:
+        game (AlienInvasion): The headless game to play on.
+        config (dict): The value of each swept setting.
+        seed (int): The seed of the game and of the player.
+        max_frames (int): The number of frames after which the game is stopped.
+        max_level (int): The level after which the game is stopped.
+        noise (float): The probability of a random action per frame.
+
+    Returns:
+        dict: The configuration, seed, final score and level, and for each level reached the
+              frames spent, ships lost, whether it was cleared, and whether the game was stopped
+              by `max_frames` during it.
+    """
+    rng = random.Random(seed)
+    game.seed = seed
+    game.rng.seed(seed)
+    # A new fleet keeps the direction of the previous one, so start from an empty fleet
+    game.aliens.clear()
+    _apply(game, config, dynamic=False)
+    game.restart_game()
+    _apply(game, config, dynamic=True)
+    game.frame = 0
+
+    stats = game.game_stats
+    level, start_frame, start_lost = stats.level, 0, stats.ships_lost
+    levels = []
+    tolerance = game.settings.alien_w // 2
+    while game.game_active and game.frame < max_frames:
+        if rng.random() < noise:
+            actions = (rng.choice(('left', 'right', '')), rng.choice(('fire', '')))
+        else:
+            target = _target_x(game)
+            actions = []
+            if target is not None:
+                offset = target - game.ship.rect.centerx
+                if offset < -tolerance:
+                    actions.append('left')
+                elif offset > tolerance:
+                    actions.append('right')
+                else:
+                    actions.append('fire')
+        game.step(actions)
+        if stats.level != level:
+            levels.append({'level': level, 'cleared': True, 'truncated': False,
+                'frames': game.frame - start_frame, 'ships_lost': stats.ships_lost - start_lost})
+            level, start_frame, start_lost = stats.level, game.frame, stats.ships_lost
+            if level > max_level:
+                break
+    else:
+        levels.append({'level': level, 'cleared': False, 'truncated': not game.game_over,
+            'frames': game.frame - start_frame, 'ships_lost': stats.ships_lost - start_lost})
+    return {
+        'config': config,
+        'seed': seed,
+        'score': stats.score,
+        'level': level,
+        'frames': game.frame,
+        'game_over': game.game_over,
+        'levels': levels,
+    }
+
+def _run(task):
+    """
+    Plays the game of a task in a worker process.
+    """
+    return play(_game, *task)
+
+def config_key(config):
+    """
+    Returns a stable string identifying a configuration, used to group the results.
+    """
+    return json.dumps(config, sort_keys=True)
+
+class Aggregate:
+    """
+    A class to aggregate the results of the games incrementally, per configuration and level.
+
+    Each result is folded into running counts and sums as soon as it arrives, so the
+    statistics are available at any time without keeping the results in memory.
+
+    Attributes:
+        games (dict): The number of games, the score sum and the final level sum of each configuration.
+        levels (dict): For each configuration, the games that reached and cleared each level, and
+            their frames and ships lost.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes empty statistics.
+        """
+        self.games = {}
+        self.levels = {}
+
+    def add(self, result):
+        """
+        Folds the result of one game into the statistics.
+
+        Args:
+            result (dict): The result of `play`.
+        """
+        key = config_key(result['config'])
+        games = self.games.setdefault(key, {'games': 0, 'score': 0, 'level': 0})
+        games['games'] += 1
+        games['score'] += result['score']
+        games['level'] += result['level']
+        levels = self.levels.setdefault(key, {})
+        for record in result['levels']:
+            level = levels.setdefault(str(record['level']),
+                {'reached': 0, 'cleared': 0, 'truncated': 0, 'frames': 0, 'ships_lost': 0})
+            level['reached'] += 1
+            level['cleared'] += record['cleared']
+            level['truncated'] += record['truncated']
+            level['frames'] += record['frames']
+            level['ships_lost'] += record['ships_lost']
+
+    def summary(self):
+        """
+        Returns the statistics of every configuration.
+
+        Returns:
+            dict: For each configuration, the number of games, the mean score and final level,
+                  and for each level the share of games reaching it, its survival rate (the share
+                  of games that cleared it among those that reached it and weren't stopped by
+                  `max_frames` during it), and the mean frames and ships lost.
+        """
+        summary = {}
+        for key, games in self.games.items():
+            count = games['games']
+            levels = {}
+            for number, level in sorted(self.levels[key].items(), key=lambda item: int(item[0])):
+                reached = level['reached']
+                finished = reached - level['truncated']
+                levels[number] = {
+                    'reached': reached / count,
+                    'survival': level['cleared'] / finished if finished else None,
+                    'mean_frames': level['frames'] / reached,
+                    'mean_ships_lost': level['ships_lost'] / reached,
+                }
+            summary[key] = {
+                'games': count,
+                'mean_score': games['score'] / count,
+                'mean_level': games['level'] / count,
+                'levels': levels,
+            }
+        return summary
+
+    def write(self, path):
+        """
+        Writes the summary to a JSON file, replacing it atomically.
+
+        Args:
+            path (str): The path of the file.
+        """
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.summary(), file, indent=2)
+        os.replace(temporary, path)
+
+def sweep(grid):
+    """
+    Returns every combination of the swept values.
+
+    Args:
+        grid (dict): The list of values of each swept setting.
+
+    Returns:
+        list: One configuration dict per combination.
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def main(argv=None):
+    """
+    Runs the balancing sweep from the command line.
+
+    Every game result is appended to the results file as a JSON line as soon as it finishes,
+    and the summary file is rewritten every `--summary-every` games and at the end. With
+    `--resume`, the games already in the results file are aggregated and not played again.
+
+    Returns:
+        int: 0 once every game has run.
+    """
+    parser = argparse.ArgumentParser(description='Monte-Carlo difficulty balancing for Alien Invasion.')
+    parser.add_argument('--difficulty-scale', type=float, nargs='+', default=[1.4])
+    parser.add_argument('--fleet-speed', type=float, nargs='+', default=[1.0])
+    parser.add_argument('--bullet-amount', type=int, nargs='+', default=[5])
+    parser.add_argument('--fleet-drop-amount', type=int, nargs='+', default=[10])
+    parser.add_argument('--games', type=int, default=100, help='games per configuration')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game of each configuration')
+    parser.add_argument('--max-frames', type=int, default=36000, help='frames after which a game is stopped')
+    parser.add_argument('--max-level', type=int, default=20, help='level after which a game is stopped')
+    parser.add_argument('--noise', type=float, default=0.2, help='probability of a random action per frame')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--results', default='balance_results.jsonl')
+    parser.add_argument('--summary', default='balance_summary.json')
+    parser.add_argument('--summary-every', type=int, default=100)
+    parser.add_argument('--resume', action='store_true', help='skip the games already in the results file')
+    args = parser.parse_args(argv)
+
+    results_path = os.path.abspath(args.results)
+    summary_path = os.path.abspath(args.summary)
+    configs = sweep({
+        'difficulty_scale': args.difficulty_scale,
+        'fleet_speed': args.fleet_speed,
+        'bullet_amount': args.bullet_amount,
+        'fleet_drop_amount': args.fleet_drop_amount,
+    })
+
+    aggregate = Aggregate()
+    done = set()
+    if args.resume and os.path.exists(results_path):
+        with open(results_path) as file:
+            for line in file:
+                result = json.loads(line)
+                aggregate.add(result)
+                done.add((config_key(result['config']), result['seed']))
+    tasks = [(config, args.seed + i, args.max_frames, args.max_level, args.noise)
+        for config in configs for i in range(args.games)
+        if (config_key(config), args.seed + i) not in done]
+
+    start = time.perf_counter()
+    with open(results_path, 'a' if args.resume else 'w') as results, \
+            multiprocessing.Pool(args.workers, _init_worker) as pool:
+        for count, result in enumerate(pool.imap_unordered(_run, tasks, chunksize=4), 1):
+            results.write(json.dumps(result) + '\n')
+            aggregate.add(result)
+            if count % args.summary_every == 0:
+                results.flush()
+                aggregate.write(summary_path)
+                print(f'{count}/{len(tasks)} games, {count / (time.perf_counter() - start):.1f} games/s')
+        # The game's SDL setup catches SIGTERM, so let the workers exit instead of terminating them
+        pool.close()
+        pool.join()
+    aggregate.write(summary_path)
+    elapsed = time.perf_counter() - start
+    print(f'{len(tasks)} games in {elapsed:.1f} s, summary written to {summary_path}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,370 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+import pygame
+from alien_invasion import AlienInvasion
+from bullet_pool import BulletPool
+from game_state import PLAYING
+from asset_cache import AssetCache
+
+SCENARIOS = {}
+
+def scenario(name):
+    """
+    Registers a benchmark scenario under a name.
+
+    A scenario is called with the game and a seeded random generator, and returns a list
+    of (seconds, ops) samples, each sample being one timed run of `ops` operations.
+
+    Args:
+        name (str): The name of the scenario, used in the results and the baseline.
+    """
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+def new_game(backend='sprite'):
+    """
+    Creates a headless game with the requested fleet backend, ready to be stepped.
+
+    Args:
+        backend (str): The fleet implementation, 'sprite' or 'array'.
+
+    Returns:
+        AlienInvasion: The game instance.
+    """
+    game = AlienInvasion(headless=True)
+    if backend == 'array':
+        from array_fleet import ArrayAlienFleet
+        game.settings.fleet_backend = 'array'
+        game.aliens = ArrayAlienFleet(game)
+    game.state.enter(PLAYING)
+    return game
+
+def fill_fleet(game, count, rng):
+    """
+    Replaces the fleet with `count` aliens at random positions in the upper part of the screen.
+
+    Args:
+        game (AlienInvasion): The game instance.
+        count (int): The number of aliens.
+        rng (random.Random): The random generator placing the aliens.
+    """
+    settings = game.settings
+    max_x = settings.screen_w - 2 * settings.alien_w
+    max_y = int(settings.screen_h * 0.6)
+    positions = [(rng.randint(settings.alien_w, max_x), rng.randint(0, max_y)) for _ in range(count)]
+    game.aliens.clear()
+    game.aliens.add_formation(0, 0, positions)
+
+def fill_bullets(pool, count, rng, min_y, max_y):
+    """
+    Empties the bullet pool and fires `count` bullets at random positions.
+
+    Args:
+        pool (BulletPool): The bullet pool.
+        count (int): The number of bullets.
+        rng (random.Random): The random generator placing the bullets.
+        min_y (int): The highest y-coordinate a bullet may be fired from.
+        max_y (int): The lowest y-coordinate a bullet may be fired from.
+    """
+    pool.empty()
+    screen_w = pool.settings.screen_w
+    for _ in range(count):
+        pool.fire((rng.randint(0, screen_w), rng.randint(min_y, max_y)))
+
+@scenario('fleet_update')
+def bench_fleet_update(game, rng, aliens=1000, frames=100, repeat=5):
+    """
+    Moves a fleet of `aliens` aliens, including the edge, bottom and ship checks.
+    """
+    samples = []
+    for _ in range(repeat):
+        fill_fleet(game, aliens, rng)
+        fleet, ship = game.aliens, game.ship
+        start = time.perf_counter()
+        for _ in range(frames):
+            fleet.update_fleet()
+            fleet.check_ship_collision(ship)
+            fleet.check_fleet_bottom()
+        samples.append((time.perf_counter() - start, frames))
+    return samples
+
+@scenario('fleet_respawn')
+def bench_fleet_respawn(game, rng, waves=200, repeat=5):
+    """
+    Respawns `waves` waves of the configured pattern, like `_reset_level` does.
+    """
+    fleet = game.aliens
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(waves):
+            fleet.create_fleet()
+        samples.append((time.perf_counter() - start, waves))
+    return samples
+
+@scenario('bullets_update')
+def bench_bullets_update(game, rng, bullets=1000, frames=50, repeat=5):
+    """
+    Moves and culls `bullets` live bullets.
+    """
+    pool = BulletPool(game, bullets)
+    top = game.screen.get_rect().top
+    samples = []
+    for _ in range(repeat):
+        # Start low enough for most bullets to stay on screen for every frame
+        fill_bullets(pool, bullets, rng, game.settings.screen_h // 2, game.settings.screen_h)
+        start = time.perf_counter()
+        for _ in range(frames):
+            pool.update()
+            pool.cull(top)
+        samples.append((time.perf_counter() - start, frames))
+    return samples
+
+def bench_collisions(game, rng, bullets, aliens=500, calls=50, repeat=20):
+    """
+    Collides `bullets` bullets spread over the fleet area with a fleet of `aliens` aliens.
+
+    A first untimed check builds the formation's spatial index, which is built lazily, and
+    removes the bullets and aliens that overlap, so the timed checks only measure the query.
+    """
+    pool = BulletPool(game, bullets)
+    max_y = int(game.settings.screen_h * 0.6)
+    samples = []
+    for _ in range(repeat):
+        fill_fleet(game, aliens, rng)
+        fill_bullets(pool, bullets, rng, 0, max_y)
+        fleet = game.aliens
+        fleet.collide_bullets(pool)
+        start = time.perf_counter()
+        for _ in range(calls):
+            fleet.collide_bullets(pool)
+        samples.append((time.perf_counter() - start, calls))
+    return samples
+
+for _density in (1, 8, 32, 128):
+    scenario(f'collide_b{_density}')(
+        lambda game, rng, bullets=_density: bench_collisions(game, rng, bullets))
+
+@scenario('hud_update_scores')
+def bench_hud_update_scores(game, rng, updates=500, repeat=5):
+    """
+    Re-renders the HUD scores after every score change, like a run of kills does.
+    """
+    stats, hud = game.game_stats, game.HUD
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(updates):
+            stats.score += game.settings.alien_points
+            stats.max_score = max(stats.max_score, stats.score)
+            hud.update_scores()
+        samples.append((time.perf_counter() - start, updates))
+    return samples
+
+def bench_blits(game, pixel_format, frames=50, repeat=5):
+    """
+    Blits the background, ship, alien, bullet and life images loaded in `pixel_format`
+    onto the screen, like one full frame does.
+    """
+    settings = game.settings
+    assets = AssetCache(settings.asset_cache_size, pixel_format)
+    images = [
+        (assets.get_image(settings.bg_file, (settings.screen_w, settings.screen_h)), 1),
+        (assets.get_image(settings.ship_file, (settings.ship_w, settings.ship_h)), 1),
+        (assets.get_image(settings.alien_file, (settings.alien_w, settings.alien_h)), 31),
+        (assets.get_image(settings.bullet_file, (settings.bullet_w, settings.bullet_h)), 5),
+        (assets.get_image(settings.life_image, (40, 40)), 3),
+    ]
+    screen = game.screen
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(frames):
+            for image, count in images:
+                for i in range(count):
+                    screen.blit(image, (i * 20, i * 10))
+        samples.append((time.perf_counter() - start, frames))
+    return samples
+
+@scenario('blit_source')
+def bench_blit_source(game, rng):
+    """
+    Blits a frame's images in the format they were loaded in.
+    """
+    return bench_blits(game, 'source')
+
+@scenario('blit_converted')
+def bench_blit_converted(game, rng):
+    """
+    Blits a frame's images converted to the display pixel format.
+    """
+    return bench_blits(game, 'auto')
+
+@scenario('cold_init')
+def bench_cold_init(game, rng, repeat=5):
+    """
+    Creates a new headless game from scratch, with pygame shut down before every run.
+    """
+    samples = []
+    for _ in range(repeat):
+        pygame.quit()
+        start = time.perf_counter()
+        AlienInvasion(headless=True)
+        samples.append((time.perf_counter() - start, 1))
+    return samples
+
+def measure_memory(game, count=10000):
+    """
+    Measures the memory allocated per alien and per bullet, with tracemalloc.
+
+    Args:
+        game (AlienInvasion): The game instance.
+        count (int): The number of aliens in the fleet and of bullets in the pool.
+
+    Returns:
+        dict: The number of bytes per alien and per bullet.
+    """
+    rng = random.Random(0)
+    settings = game.settings
+    positions = [(rng.randint(0, settings.screen_w), rng.randint(0, settings.screen_h))
+        for _ in range(count)]
+    game.aliens.clear()
+
+    tracemalloc.start()
+    start = tracemalloc.take_snapshot()
+    game.aliens.add_formation(0, 0, positions)
+    fleet_bytes = _allocated_since(start)
+    start = tracemalloc.take_snapshot()
+    pool = BulletPool(game, count)
+    bullet_bytes = _allocated_since(start)
+    tracemalloc.stop()
+    del pool
+    return {
+        'count': count,
+        'bytes_per_alien': fleet_bytes / count,
+        'bytes_per_bullet': bullet_bytes / count,
+    }
+
+def _allocated_since(snapshot):
+    """
+    Returns the number of bytes still allocated since a tracemalloc snapshot.
+    """
+    return sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+
+def run(names=None, backend='sprite', seed=0):
+    """
+    Runs the benchmark scenarios, each one on a fresh headless game with the same seed.
+
+    Args:
+        names (list): The names of the scenarios to run, or None to run all of them.
+        backend (str): The fleet implementation, 'sprite' or 'array'.
+        seed (int): The seed of the random generator given to every scenario.
+
+    Returns:
+        dict: The machine information and the timings of each scenario, in seconds per operation.
+    """
+    results = {}
+    for name, function in SCENARIOS.items():
+        if names and name not in names:
+            continue
+        samples = function(new_game(backend), random.Random(seed))
+        per_op = [seconds / ops for seconds, ops in samples]
+        results[name] = {
+            'min': min(per_op),
+            'median': statistics.median(per_op),
+            'mean': statistics.fmean(per_op),
+            'runs': len(per_op),
+        }
+    return {
+        'meta': {
+            'time': time.time(),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'platform': platform.platform(),
+            'backend': backend,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+def compare(report, baseline, threshold):
+    """
+    Compares the median timings of a report with a baseline report.
+
+    Args:
+        report (dict): The results of `run()`.
+        baseline (dict): The stored results to compare with.
+        threshold (float): The allowed slowdown, 0.1 meaning 10% slower than the baseline.
+
+    Returns:
+        list: The (name, ratio) of every scenario slower than the threshold allows.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        reference = baseline['results'].get(name)
+        if not reference or not reference['median']:
+            continue
+        ratio = result['median'] / reference['median']
+        result['baseline_ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line, writes the results as JSON and compares them
+    with the baseline.
+
+    Returns:
+        int: 1 if a scenario regressed past the threshold, 0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Headless Alien Invasion benchmarks.')
+    parser.add_argument('scenarios', nargs='*', help=f'scenarios to run ({", ".join(SCENARIOS)})')
+    parser.add_argument('--backend', choices=('sprite', 'array'), default='sprite')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file to write the JSON results to, stdout if omitted')
+    parser.add_argument('--baseline', default='benchmark_baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown (default 0.10)')
+    parser.add_argument('--memory', type=int, metavar='COUNT', default=0,
+        help='also measure the bytes per alien and per bullet for COUNT entities')
+    args = parser.parse_args(argv)
+
+    # The game loads its assets relative to its own directory
+    paths = [os.path.abspath(path) if path else None for path in (args.output, args.baseline)]
+    output, baseline_path = paths
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    report = run(args.scenarios, args.backend, args.seed)
+    if args.memory:
+        report['memory'] = measure_memory(new_game(args.backend), args.memory)
+    regressions = []
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path) as file:
+            regressions = compare(report, json.load(file), args.threshold)
+
+    contents = json.dumps(report, indent=4)
+    if output:
+        with open(output, 'w') as file:
+            file.write(contents)
+    else:
+        print(contents)
+    if args.save_baseline:
+        with open(baseline_path, 'w') as file:
+            file.write(contents)
+
+    for name, ratio in regressions:
+        print(f'REGRESSION {name}: {ratio:.2f}x the baseline', file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,57 +1,40 @@
 import pygame
-from pygame.sprite import Sprite
 
-class Bullet(Sprite):
+class Bullet:
     """
-    A class to manage bullets fired by the ship.
+    A single slot of the bullet pool, representing one bullet fired by the ship.
 
-    Inherits from the Pygame Sprite class and handles the bullet's creation, movement, and rendering on the screen.
+    Bullets are preallocated by `BulletPool` and reused from shot to shot, so firing
+    never creates new objects. The position of the bullet is stored in the pool's flat
+    arrays and its image is shared by the pool; the bullet itself only keeps its rect
+    for collisions and drawing, in `__slots__`.
 
     Attributes:
-        game (object): The game instance, providing access to game settings and screen.
-        screen (Surface): The Pygame screen object where the bullet is displayed.
-        settings (Settings): The settings object that defines the bullet's properties.
-        image (Surface): The Pygame surface representing the bullet's visual appearance.
+        pool (BulletPool): The pool that owns the bullet.
+        index (int): The position of the bullet in the pool's arrays.
         rect (Rect): The Pygame rect representing the bullet's position and size.
-        y (float): The vertical position of the bullet, used for smooth movement.
+        active (bool): Whether the bullet is currently flying.
     """
-    
-    def __init__(self, game):
-        """
-        Initializes the bullet, setting its position and loading the appropriate image.
-
-        Args:
-            game (object): The game instance that provides access to game settings and the screen.
-        """
-        super().__init__()
-        self.game = game
-        self.screen = game.screen
-        self.settings = game.settings
+    __slots__ = ('pool', 'index', 'rect', 'active')
 
-        # Load and scale the bullet image
-        self.image = pygame.image.load(self.settings.bullet_file)
-        self.image = pygame.transform.scale(self.image, (
-            self.settings.bullet_w, self.settings.bullet_h))
-        self.rect = self.image.get_rect()
-
-        # Set initial position of the bullet (at the ship's position)
-        self.rect.midtop = game.ship.rect.midtop
-        self.y = float(self.rect.y)
-
-    def update(self) -> None:
+    def __init__(self, pool, index, width, height):
         """
-        Updates the position of the bullet as it moves upwards on the screen.
-        The bullet moves based on the speed defined in the game settings.
+        Initializes an inactive bullet slot.
 
-        This method is called during each frame of the game to update the bullet's position.
+        Args:
+            pool (BulletPool): The pool that owns the bullet.
+            index (int): The position of the bullet in the pool's arrays.
+            width (int): The width of the bullet.
+            height (int): The height of the bullet.
         """
-        self.y -= self.settings.bullet_speed
-        self.rect.y = self.y
+        self.pool = pool
+        self.index = index
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.active = False
 
-    def draw(self):
+    def kill(self):
         """
-        Draws the bullet on the screen at its current position.
-
-        This method is called during each frame to render the bullet.
+        Removes the bullet from play and returns its slot to the pool.
         """
-        self.screen.blit(self.image, self.rect)
+        if self.active:
+            self.pool.release(self)
@@ -0,0 +1,177 @@
+from array import array
+from bullet import Bullet
+
+class BulletPool:
+    """
+    A fixed-capacity pool of bullets fired by the ship.
+
+    All bullets are allocated once when the pool is created. The active bullets are kept
+    packed at the front of the pool, in the order they were fired, and their positions are
+    stored in flat arrays. Slots after the active bullets form the free list that new shots
+    are taken from. Removing bullets marks them and compacts the pool in place, so culling
+    and collisions never allocate.
+
+    Attributes:
+        game (AlienInvasion): The game instance, providing access to settings and the screen.
+        settings (Settings): The settings object that defines the bullet's properties.
+        screen (Surface): The Pygame screen object where the bullets are displayed.
+        image (Surface): The bullet image shared by every bullet.
+        capacity (int): The maximum number of bullets in flight.
+        bullets (list): Every bullet slot, active ones first.
+        x (array): The x-coordinate of each slot.
+        y (array): The float y-coordinate of each slot, used for smooth movement.
+        prev_y (array): The y-coordinate of each slot before the last simulation step, used for interpolation.
+        count (int): The number of slots in use, including bullets waiting to be compacted.
+    """
+
+    def __init__(self, game, capacity=None):
+        """
+        Initializes the pool and preallocates every bullet.
+
+        Args:
+            game (AlienInvasion): The game instance that provides access to settings and the screen.
+            capacity (int): The number of bullets in the pool, or None to use the settings.
+        """
+        self.game = game
+        self.settings = game.settings
+        self.screen = game.screen
+        self.image = game.assets.get_image(self.settings.bullet_file, (
+            self.settings.bullet_w, self.settings.bullet_h))
+
+        self.capacity = capacity or self.settings.bullet_pool_size
+        self.bullets = [Bullet(self, i, self.settings.bullet_w, self.settings.bullet_h)
+            for i in range(self.capacity)]
+        self.x = array('d', bytes(8 * self.capacity))
+        self.y = array('d', bytes(8 * self.capacity))
+        self.prev_y = array('d', bytes(8 * self.capacity))
+        self.count = 0
+        self._released = 0
+
+    def __len__(self):
+        """
+        Returns the number of active bullets.
+        """
+        return self.count - self._released
+
+    def __bool__(self):
+        """
+        Returns True if any bullet is active.
+        """
+        return len(self) > 0
+
+    def sprites(self):
+        """
+        Returns the active bullets, in the order they were fired.
+
+        Returns:
+            list: The active bullets.
+        """
+        self._compact()
+        return self.bullets[:self.count]
+
+    def fire(self, midtop):
+        """
+        Takes a bullet from the free list and places it at the given position.
+
+        Args:
+            midtop (tuple): The (x, y) position of the middle of the bullet's top edge.
+
+        Returns:
+            Bullet: The fired bullet, or None if the pool is full.
+        """
+        self._compact()
+        if self.count == self.capacity:
+            return None
+        bullet = self.bullets[self.count]
+        bullet.rect.midtop = midtop
+        bullet.active = True
+        self.x[self.count] = bullet.rect.x
+        self.y[self.count] = bullet.rect.y
+        self.prev_y[self.count] = bullet.rect.y
+        self.count += 1
+        return bullet
+
+    def release(self, bullet):
+        """
+        Marks a bullet as inactive. Its slot is reclaimed on the next compaction.
+
+        Args:
+            bullet (Bullet): The bullet to remove.
+        """
+        bullet.active = False
+        self._released += 1
+
+    def empty(self):
+        """
+        Removes every bullet from play.
+        """
+        for i in range(self.count):
+            self.bullets[i].active = False
+        self.count = 0
+        self._released = 0
+
+    def update(self):
+        """
+        Moves every active bullet upwards based on the speed defined in the game settings.
+        """
+        speed = self.settings.per_step(self.settings.bullet_speed)
+        y, prev_y = self.y, self.prev_y
+        bullets = self.bullets
+        for i in range(self.count):
+            prev_y[i] = y[i]
+            y[i] -= speed
+            bullets[i].rect.y = y[i]
+
+    def cull(self, top):
+        """
+        Removes every bullet that has moved past the top of the screen.
+
+        Args:
+            top (int): The y-coordinate of the top of the screen.
+        """
+        bullets = self.bullets
+        for i in range(self.count):
+            bullet = bullets[i]
+            if bullet.active and bullet.rect.bottom <= top:
+                self.release(bullet)
+        self._compact()
+
+    def _compact(self):
+        """
+        Moves the active bullets to the front of the pool, keeping their order, and
+        returns the released slots to the free list.
+        """
+        if not self._released:
+            return
+        bullets, x, y, prev_y = self.bullets, self.x, self.y, self.prev_y
+        kept = 0
+        for i in range(self.count):
+            bullet = bullets[i]
+            if not bullet.active:
+                continue
+            if kept != i:
+                freed = bullets[kept]
+                bullets[kept], bullets[i] = bullet, freed
+                bullet.index, freed.index = kept, i
+                x[kept] = x[i]
+                y[kept] = y[i]
+                prev_y[kept] = prev_y[i]
+            kept += 1
+        self.count = kept
+        self._released = 0
+
+    def draw(self, alpha=1.0):
+        """
+        Draws every active bullet on the screen, between its previous and current position.
+
+        Args:
+            alpha (float): The interpolation factor between the previous (0) and current (1) position.
+        """
+        self._compact()
+        image = self.image
+        if alpha >= 1.0:
+            self.screen.blits([(image, self.bullets[i].rect) for i in range(self.count)], False)
+            return
+        x, y, prev_y = self.x, self.y, self.prev_y
+        self.screen.blits([(image, (x[i], round(prev_y[i] + (y[i] - prev_y[i]) * alpha)))
+            for i in range(self.count)], False)
@@ -0,0 +1,347 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import numpy as np
+from alien_invasion import AlienInvasion
+
+# The action names passed to `AlienInvasion.step` for each discrete action
+ACTIONS = (
+    (),
+    ('left',),
+    ('right',),
+    ('fire',),
+    ('left', 'fire'),
+    ('right', 'fire'),
+)
+
+class AlienInvasionEnv:
+    """
+    A Gym-style environment over a headless game, for training and tuning bots.
+
+    The environment drives the game through `AlienInvasion.step`, without events, rendering
+    or frame limiting. Each step applies one of the discrete `ACTIONS` and simulates
+    `frame_skip` frames.
+
+    The observation is a flat float32 array:
+        - the ship's x-coordinate, the ships left and the fleet direction,
+        - the fleet's bounding box (left, top, right, bottom) and the number of aliens,
+        - the (x, y) position of up to `max_aliens` aliens, padded with -1,
+        - the (x, y) position of up to `max_bullets` bullets, padded with -1.
+    Coordinates are divided by the screen size, and counts by their maximum.
+
+    The reward is the score gained during the step, minus `life_penalty` for every ship
+    lost. An episode terminates at game over and is truncated after `max_steps` steps.
+
+    Attributes:
+        game (AlienInvasion): The headless game driven by the environment.
+        frame_skip (int): The number of frames simulated by each step.
+        max_aliens (int): The number of aliens included in the observation.
+        max_bullets (int): The number of bullets included in the observation.
+        max_steps (int): The number of steps after which an episode is truncated.
+        life_penalty (float): The reward subtracted for every ship lost.
+        observation_size (int): The length of the observation array.
+        steps (int): The number of steps taken in the current episode.
+    """
+
+    def __init__(self, seed=None, backend='sprite', frame_skip=1, max_aliens=32, max_bullets=8,
+            max_steps=10000, life_penalty=0.0) -> None:
+        """
+        Creates the headless game of the environment.
+
+        Args:
+            seed (int): The seed of the first episode, None for a random seed.
+            backend (str): The fleet implementation, 'sprite' or 'array'.
+            frame_skip (int): The number of frames simulated by each step.
+            max_aliens (int): The number of aliens included in the observation.
+            max_bullets (int): The number of bullets included in the observation.
+            max_steps (int): The number of steps after which an episode is truncated.
+            life_penalty (float): The reward subtracted for every ship lost.
+        """
+        self.game = AlienInvasion(headless=True, seed=seed)
+        if backend == 'array':
+            from array_fleet import ArrayAlienFleet
+            self.game.settings.fleet_backend = 'array'
+            self.game.aliens = ArrayAlienFleet(self.game)
+        self.frame_skip = frame_skip
+        self.max_aliens = max_aliens
+        self.max_bullets = max_bullets
+        self.max_steps = max_steps
+        self.life_penalty = life_penalty
+        self.observation_size = 8 + 2 * max_aliens + 2 * max_bullets
+        self.steps = 0
+
+    def reset(self, seed=None):
+        """
+        Starts a new episode.
+
+        Args:
+            seed (int): The seed of the episode, None to continue the previous generator.
+
+        Returns:
+            tuple: The first observation and an info dict.
+        """
+        game = self.game
+        if seed is not None:
+            game.seed = seed
+            game.rng.seed(seed)
+        # A new fleet keeps the direction of the previous one, so start from an empty fleet
+        game.aliens.clear()
+        game.restart_game()
+        game.frame = 0
+        self.steps = 0
+        return self.observation(), self._info()
+
+    def step(self, action):
+        """
+        Applies an action and simulates `frame_skip` frames.
+
+        Args:
+            action (int): The index of the action in `ACTIONS`.
+
+        Returns:
+            tuple: The observation, the reward, whether the episode terminated, whether it was
+                   truncated, and an info dict.
+        """
+        game = self.game
+        stats = game.game_stats
+        score, ships_lost = stats.score, stats.ships_lost
+        active = game.step(ACTIONS[action], self.frame_skip)
+        self.steps += 1
+        reward = stats.score - score - self.life_penalty * (stats.ships_lost - ships_lost)
+        terminated = not active
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation(), float(reward), terminated, truncated, self._info()
+
+    def observation(self, out=None):
+        """
+        Returns the observation of the current state.
+
+        Args:
+            out (numpy.ndarray): The float32 array to write the observation into, None to allocate one.
+
+        Returns:
+            numpy.ndarray: The observation.
+        """
+        if out is None:
+            out = np.empty(self.observation_size, dtype=np.float32)
+        game = self.game
+        settings = game.settings
+        screen_w, screen_h = settings.screen_w, settings.screen_h
+        fleet = game.aliens
+        bounds = fleet.bounds()
+
+        out[0] = game.ship.x / screen_w
+        out[1] = game.game_stats.ships_left / settings.ship_limit
+        out[2] = fleet.direction
+        if bounds is None:
+            out[3:7] = -1
+        else:
+            out[3:7] = (bounds.left / screen_w, bounds.top / screen_h,
+                bounds.right / screen_w, bounds.bottom / screen_h)
+        out[7] = len(fleet.fleet) / self.max_aliens
+        out[8:] = -1
+
+        aliens = out[8:8 + 2 * self.max_aliens]
+        i = 0
+        for formation in fleet.formations:
+            dx, dy = formation.offset
+            for alien in formation.aliens:
+                if i == self.max_aliens:
+                    break
+                aliens[2 * i] = (alien.local.x + dx) / screen_w
+                aliens[2 * i + 1] = (alien.local.y + dy) / screen_h
+                i += 1
+        bullets = out[8 + 2 * self.max_aliens:]
+        for i, bullet in enumerate(game.bullets.sprites()[:self.max_bullets]):
+            bullets[2 * i] = bullet.rect.x / screen_w
+            bullets[2 * i + 1] = bullet.rect.y / screen_h
+        return out
+
+    def _info(self):
+        """
+        Returns the score, level and frame of the game.
+        """
+        stats = self.game.game_stats
+        return {'score': stats.score, 'level': stats.level, 'frame': self.game.frame}
+
+def _worker(connection, seeds, kwargs):
+    """
+    Runs a slice of the vectorized environments in a worker process.
+
+    The worker answers 'reset' and 'step' commands with batched arrays, and resets every
+    environment whose episode ended, like Gym vector environments do.
+
+    Args:
+        connection (multiprocessing.connection.Connection): The pipe to the main process.
+        seeds (list): The seed of each environment of the slice.
+        kwargs (dict): The arguments of every `AlienInvasionEnv`.
+    """
+    # The game loads its assets relative to its own directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    envs = [AlienInvasionEnv(seed=seed, **kwargs) for seed in seeds]
+    count = len(envs)
+    observations = np.empty((count, envs[0].observation_size), dtype=np.float32)
+    rewards = np.empty(count, dtype=np.float32)
+    terminated = np.empty(count, dtype=bool)
+    truncated = np.empty(count, dtype=bool)
+    scores = np.empty(count, dtype=np.int64)
+    try:
+        while True:
+            command, data = connection.recv()
+            if command == 'reset':
+                for i, env in enumerate(envs):
+                    env.reset(seeds[i])
+                    env.observation(observations[i])
+                connection.send(observations)
+            elif command == 'step':
+                for i, env in enumerate(envs):
+                    _, rewards[i], terminated[i], truncated[i], info = env.step(data[i])
+                    scores[i] = info['score']
+                    if terminated[i] or truncated[i]:
+                        env.reset()
+                    env.observation(observations[i])
+                connection.send((observations, rewards, terminated, truncated, scores))
+            elif command == 'close':
+                break
+    finally:
+        connection.close()
+
+class VectorEnv:
+    """
+    Steps many independent environments across a pool of worker processes.
+
+    The environments are split evenly between the workers. Every call sends the actions of
+    each worker's slice in one message and receives its observations, rewards and flags as
+    arrays, which are concatenated into batches with one row per environment. Environments
+    whose episode ended are reset automatically; the returned flags and scores still belong
+    to the episode that ended.
+
+    Attributes:
+        num_envs (int): The number of environments.
+        observation_size (int): The length of the observation of one environment.
+        slices (list): The range of environment indexes of each worker.
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=0, **kwargs) -> None:
+        """
+        Starts the worker processes.
+
+        Args:
+            num_envs (int): The number of environments.
+            num_workers (int): The number of worker processes, None to use one per core.
+            seed (int): The seed of the first environment; the others use the following seeds.
+            kwargs: The arguments of every `AlienInvasionEnv`.
+        """
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        self.num_envs = num_envs
+        self.observation_size = 8 + 2 * kwargs.get('max_aliens', 32) + 2 * kwargs.get('max_bullets', 8)
+        bounds = [num_envs * i // num_workers for i in range(num_workers + 1)]
+        self.slices = [range(bounds[i], bounds[i + 1]) for i in range(num_workers)]
+        self.connections = []
+        self.processes = []
+        for indexes in self.slices:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_worker,
+                args=(child, [seed + i for i in indexes], kwargs), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def reset(self):
+        """
+        Resets every environment with its seed.
+
+        Returns:
+            numpy.ndarray: The (num_envs, observation_size) observations.
+        """
+        for connection in self.connections:
+            connection.send(('reset', None))
+        return np.concatenate([connection.recv() for connection in self.connections])
+
+    def step(self, actions):
+        """
+        Steps every environment with its action.
+
+        Args:
+            actions (numpy.ndarray): The action index of each environment.
+
+        Returns:
+            tuple: The observations, rewards, terminated and truncated flags, and scores, as
+                   arrays with one row per environment.
+        """
+        for connection, indexes in zip(self.connections, self.slices):
+            connection.send(('step', actions[indexes.start:indexes.stop]))
+        results = [connection.recv() for connection in self.connections]
+        return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+    def close(self):
+        """
+        Stops the worker processes.
+        """
+        for connection in self.connections:
+            connection.send(('close', None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+
+def measure(num_envs, num_workers, steps, seed=0, **kwargs):
+    """
+    Steps a vectorized environment with random actions and measures its throughput.
+
+    Args:
+        num_envs (int): The number of environments.
+        num_workers (int): The number of worker processes.
+        steps (int): The number of batched steps to take.
+        seed (int): The seed of the environments and of the actions.
+        kwargs: The arguments of every `AlienInvasionEnv`.
+
+    Returns:
+        dict: The number of environments and workers, and the environment steps per second.
+    """
+    envs = VectorEnv(num_envs, num_workers, seed, **kwargs)
+    try:
+        envs.reset()
+        rng = np.random.default_rng(seed)
+        actions = rng.integers(len(ACTIONS), size=(steps, num_envs))
+        start = time.perf_counter()
+        for batch in actions:
+            envs.step(batch)
+        elapsed = time.perf_counter() - start
+    finally:
+        envs.close()
+    return {
+        'envs': num_envs,
+        'workers': len(envs.slices),
+        'env_steps_per_second': num_envs * steps / elapsed,
+    }
+
+def main(argv=None):
+    """
+    Measures the env-steps per second of the vectorized environment for an increasing number
+    of workers, and prints the results as JSON lines.
+    """
+    parser = argparse.ArgumentParser(description='Measure the throughput of vectorized Alien Invasion environments.')
+    parser.add_argument('--envs', type=int, default=32, help='number of environments')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='maximum number of worker processes')
+    parser.add_argument('--steps', type=int, default=500, help='batched steps per measurement')
+    parser.add_argument('--frame-skip', type=int, default=1)
+    parser.add_argument('--backend', choices=('sprite', 'array'), default='sprite')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    workers = 1
+    while True:
+        result = measure(args.envs, workers, args.steps, args.seed,
+            backend=args.backend, frame_skip=args.frame_skip)
+        print(json.dumps(result))
+        if workers >= args.workers:
+            break
+        workers = min(workers * 2, args.workers)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+import pygame
+from alien import Alien, AlienGroup
+from spatial_hash import SpatialHash
+
+def round_coordinate(value):
+    """
+    Rounds a float coordinate the same way `pygame.Rect` does, half away from zero.
+
+    Args:
+    value (float): The coordinate to round.
+
+    Returns:
+    int: The rounded coordinate.
+    """
+    return int(value + 0.5) if value >= 0 else -int(0.5 - value)
+
+class Formation:
+    """
+    A group of aliens that moves as one unit.
+
+    The formation holds a single origin. Its aliens keep fixed local offsets from that
+    origin, and their world positions are only derived when they are drawn or collided.
+    Moving or dropping the formation is one update of the origin, whatever the number of
+    aliens.
+
+    The spatial index and the extreme aliens are kept in local coordinates, so they stay
+    valid while the formation moves and only change when aliens are destroyed. The spatial
+    index is only built on the first collision check after aliens are added, so spawning a
+    formation doesn't index aliens that a backend may never query.
+
+    Attributes:
+    fleet (AlienFleet): The fleet the formation is part of.
+    x (float): The x-coordinate of the origin, as a float for smooth movement.
+    y (int): The y-coordinate of the origin.
+    direction (int): The direction the formation moves in, 1 for right and -1 for left.
+    image (pygame.Surface): The image shared by every alien of the formation.
+    aliens (AlienGroup): The aliens of the formation.
+    grid (SpatialHash): The spatial index of the aliens' local rects.
+    step_dx (float): The horizontal distance moved in the last update, used for interpolation.
+    step_dy (int): The vertical distance dropped in the last update, used for interpolation.
+    """
+    def __init__(self, fleet, x, y, direction=1) -> None:
+        """
+        Initializes an empty formation.
+
+        Args:
+        fleet (AlienFleet): The fleet the formation is part of.
+        x (float): The x-coordinate of the origin.
+        y (int): The y-coordinate of the origin.
+        direction (int): The direction the formation starts moving in.
+        """
+        self.fleet = fleet
+        self.x = float(x)
+        self.y = y
+        self.direction = direction
+        settings = fleet.settings
+        self.image = fleet.game.assets.get_image(settings.alien_file,
+            (settings.alien_w, settings.alien_h))
+        self.aliens = AlienGroup()
+        self.grid = SpatialHash(fleet.settings.collision_cell_size, 'local')
+        self.step_dx = 0
+        self.step_dy = 0
+        self._extremes = None
+        self._grid_stale = False
+
+    def __len__(self):
+        """
+        Returns the number of aliens left in the formation.
+        """
+        return len(self.aliens)
+
+    @property
+    def offset(self):
+        """
+        The (x, y) world offset of the formation's local coordinates.
+        """
+        return (round_coordinate(self.x), self.y)
+
+    def add_alien(self, x, y):
+        """
+        Creates an alien at a local position and adds it to the formation and the fleet.
+
+        Args:
+        x (int): The x-coordinate of the alien, relative to the origin.
+        y (int): The y-coordinate of the alien, relative to the origin.
+
+        Returns:
+        Alien: The new alien.
+        """
+        return self.add_aliens(((x, y),))[0]
+
+    def add_aliens(self, positions):
+        """
+        Creates an alien at each local position and adds them to the formation and the fleet.
+
+        Args:
+        positions (iterable): The (x, y) position of each alien, relative to the origin.
+
+        Returns:
+        list: The new aliens.
+        """
+        w, h = self.image.get_size()
+        aliens = [Alien(self, pygame.Rect(x, y, w, h)) for x, y in positions]
+        self.aliens.add(*aliens)
+        self.fleet.fleet.add(*aliens)
+        self._extremes = None
+        self._grid_stale = True
+        return aliens
+
+    def update(self, speed, drop, screen_w):
+        """
+        Drops the formation and reverses it if it reached an edge of the screen, then moves it.
+
+        Args:
+        speed (float): The horizontal speed of the formation.
+        drop (int): The distance the formation drops when it reaches an edge.
+        screen_w (int): The width of the screen.
+        """
+        self.step_dy = 0
+        edges = self.edges()
+        if edges and (edges[0] <= 0 or edges[2] >= screen_w):
+            self.drop(drop)
+        self.step_dx = speed * self.direction
+        self.x += self.step_dx
+
+    def drop(self, distance):
+        """
+        Drops the formation and reverses its direction.
+
+        Args:
+        distance (int): The distance to drop.
+        """
+        self.y += distance
+        self.direction *= -1
+        self.step_dy = distance
+
+    def local_edges(self):
+        """
+        Returns the edges of the formation in local coordinates, searching the extreme aliens
+        again only if one of them was destroyed or aliens were added.
+
+        Returns:
+        tuple: The local (left, top, right, bottom) of the formation, or None if it is empty.
+        """
+        extremes = self._extremes
+        if extremes is None or not all(alien.alive() for alien in extremes):
+            aliens = self.aliens.sprites()
+            if not aliens:
+                self._extremes = None
+                return None
+            extremes = self._extremes = (
+                min(aliens, key=lambda alien: alien.local.left),
+                min(aliens, key=lambda alien: alien.local.top),
+                max(aliens, key=lambda alien: alien.local.right),
+                max(aliens, key=lambda alien: alien.local.bottom))
+        left, top, right, bottom = extremes
+        return (left.local.left, top.local.top, right.local.right, bottom.local.bottom)
+
+    def edges(self):
+        """
+        Returns the edges of the formation on the screen.
+
+        Returns:
+        tuple: The (left, top, right, bottom) of the formation, or None if it is empty.
+        """
+        edges = self.local_edges()
+        if edges is None:
+            return None
+        dx, dy = self.offset
+        left, top, right, bottom = edges
+        return (left + dx, top + dy, right + dx, bottom + dy)
+
+    def to_local(self, rect):
+        """
+        Converts a rect on the screen to the formation's local coordinates.
+
+        Args:
+        rect (pygame.Rect): The rect on the screen.
+
+        Returns:
+        pygame.Rect: The rect relative to the origin.
+        """
+        dx, dy = self.offset
+        return rect.move(-dx, -dy)
+
+    def collide(self, rect):
+        """
+        Returns the aliens that collide with a rect on the screen, in the order they were added.
+
+        Args:
+        rect (pygame.Rect): The rect on the screen.
+
+        Returns:
+        list: The colliding aliens.
+        """
+        local = self.to_local(rect)
+        if self._grid_stale or len(self.grid) != len(self.aliens):
+            # Aliens were added, or removed outside of the collision checks
+            self.grid.rebuild(self.aliens)
+            self._grid_stale = False
+        return [alien for alien in self.grid.query(local) if local.colliderect(alien.local)]
+
+    def remove(self, alien):
+        """
+        Destroys an alien of the formation.
+
+        Args:
+        alien (Alien): The alien to destroy.
+        """
+        self.grid.remove(alien)
+        alien.kill()
+
+    def interpolation_offset(self, alpha):
+        """
+        Returns the world offset to draw the aliens at, between their previous and current position.
+
+        Args:
+        alpha (float): The interpolation factor between the previous (0) and current (1) position.
+
+        Returns:
+        tuple: The (x, y) offset to draw the local rects at.
+        """
+        dx, dy = self.offset
+        back = 1.0 - alpha
+        if back <= 0:
+            return (dx, dy)
+        return (dx + round(-self.step_dx * back), dy + round(-self.step_dy * back))
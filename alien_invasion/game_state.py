@@ -0,0 +1,102 @@
+# The states of the game
+MENU = 'menu'
+PLAYING = 'playing'
+RESPAWN_DELAY = 'respawn_delay'
+LEVEL_TRANSITION = 'level_transition'
+GAME_OVER = 'game_over'
+
+# The states in which a game is in progress
+ACTIVE_STATES = (PLAYING, RESPAWN_DELAY, LEVEL_TRANSITION)
+
+class GameStateMachine:
+    """
+    A class to track the state of the game and the timers of its pauses.
+
+    The game starts in the menu. A started game is playing, pauses in the respawn delay after
+    the ship is hit and in the level transition after a wave is cleared, and ends in game over.
+    The pauses last a number of simulation frames instead of blocking the main thread, so the
+    game keeps rendering and handling input while they run. When a pause ends, the function
+    given to `enter` is called to finish the transition.
+
+    The `game_active` and `game_over` flags of the game are kept in sync with the state.
+
+    Attributes:
+        game (AlienInvasion): The game whose state is tracked.
+        state (str): The current state.
+        timer (int): The number of simulation frames left before the current pause ends.
+        on_expire (callable): The function called when the current pause ends, or None.
+        skip_pauses (bool): Whether the pauses end at once, which headless games do.
+    """
+
+    def __init__(self, game) -> None:
+        """
+        Initializes the state machine in the menu.
+
+        Args:
+            game (AlienInvasion): The game whose state is tracked.
+        """
+        self.game = game
+        self.timer = 0
+        self.on_expire = None
+        self.skip_pauses = game.headless
+        self.enter(MENU)
+
+    @property
+    def playing(self):
+        """
+        True if the game is playing, False in the menu, the pauses and game over.
+        """
+        return self.state == PLAYING
+
+    def enter(self, state, frames=0, on_expire=None):
+        """
+        Switches to a state.
+
+        A pause of 0 frames ends at once: `on_expire` is called before returning.
+
+        Args:
+            state (str): The state to switch to.
+            frames (int): The number of simulation frames the state lasts, for pauses.
+            on_expire (callable): The function called when the pause ends.
+        """
+        self.state = state
+        self.timer = frames
+        self.on_expire = on_expire
+        self.game.game_active = state in ACTIVE_STATES
+        self.game.game_over = state == GAME_OVER
+        if on_expire and frames <= 0:
+            self._expire()
+
+    def frames_for(self, seconds):
+        """
+        Converts a duration to a number of simulation frames.
+
+        Headless games skip the pauses, so they always last 0 frames there, unless `skip_pauses`
+        is cleared to replay a windowed game.
+
+        Args:
+            seconds (float): The duration of the pause.
+
+        Returns:
+            int: The number of simulation frames the pause lasts.
+        """
+        if self.skip_pauses:
+            return 0
+        return round(seconds * self.game.settings.sim_hz)
+
+    def tick(self):
+        """
+        Counts down one simulation frame of the current pause, ending it when its timer runs out.
+        """
+        if self.timer > 0:
+            self.timer -= 1
+            if self.timer == 0 and self.on_expire:
+                self._expire()
+
+    def _expire(self):
+        """
+        Ends the current pause by calling its expiry function.
+        """
+        on_expire = self.on_expire
+        self.on_expire = None
+        on_expire()
@@ -1,5 +1,6 @@
 from pathlib import Path
 import json
+from score_writer import ScoreWriter
 
 class GameStats:
     """
@@ -11,8 +12,12 @@ class GameStats:
         max_score (int): The highest score reached in the current game session.
         hi_score (int): The highest score across all sessions, saved to a file.
         ships_left (int): The number of ships remaining for the player.
+        ships_lost (int): The number of ships lost in the current game, including the last one,
+            which ends the game without being taken from `ships_left`.
         score (int): The current score of the player.
         level (int): The current level of the game.
+        persist (bool): Whether the high score is written to the scores file. Disabled in headless mode and when the game does not persist.
+        writer (ScoreWriter): The background writer that coalesces and atomically writes the scores file.
     """
 
     def __init__(self, game) -> None:
@@ -25,6 +30,7 @@ class GameStats:
         self.game = game
         self.settings = game.settings
         self.max_score = 0
+        self.persist = game.persist
         # Initialize saved scores
         self.init_saved_scores()
         self.reset_stats()
@@ -34,6 +40,7 @@ class GameStats:
         Initializes the saved scores by reading from a file. If no file exists, a new one is created with a hi_score of 0.
         """
         self.path = Path(self.settings.scores_file)
+        self.writer = ScoreWriter(self.path, self.settings.scores_write_delay)
         if self.path.exists():
             contents = self.path.read_text()
             scores: dict = json.loads(contents)
@@ -41,12 +48,14 @@ class GameStats:
         else:
             self.hi_score = 0
             self.save_scores()
+            self.flush_scores()
 
     def reset_stats(self):
         """
-        Resets the game statistics, including the number of ships left, score, and level.
+        Resets the game statistics, including the number of ships left and lost, score, and level.
         """
         self.ships_left = self.settings.ship_limit
+        self.ships_lost = 0
         self.score = 0
         self.level = 1
 
@@ -70,7 +79,8 @@ class GameStats:
 
     def _update_hi_score(self):
         """
-        Updates the high score if the current score exceeds the previously recorded high score, and saves it to a file.
+        Updates the high score if the current score exceeds the previously recorded high score, and schedules
+        it to be saved to a file.
         """
         if self.score > self.hi_score:
             self.hi_score = self.score
@@ -95,10 +105,37 @@ class GameStats:
 
     def save_scores(self):
         """
-        Saves the current high score to a file in JSON format.
+        Schedules the current high score to be saved to a file in JSON format.
+
+        The file is written by the background writer once the updates settle, or at the next
+        `flush_scores()`, so this is cheap enough to call from the collision path.
         """
+        if not self.persist:
+            return
         scores = {
             'hi_score': self.hi_score
         }
-        contents = json.dumps(scores, indent=4)
-        self.path.write_text(contents)
+        self.writer.save(scores)
+
+    def flush_scores(self):
+        """
+        Writes the scheduled high score to the file now. Called at safe points such as the end
+        of a level, game over and quit.
+
+        When the simulation runs on its own thread, the writer thread is woken to write it instead,
+        so the simulation step doesn't wait for the disk.
+        """
+        if not self.persist:
+            return
+        if self.game.sim_thread:
+            self.writer.request_flush()
+        else:
+            self.writer.flush()
+
+    def close(self):
+        """
+        Writes the scheduled high score and stops the background writer.
+        """
+        if not self.persist:
+            return
+        self.writer.close()
@@ -1,5 +1,115 @@
+import pygame
 import pygame.font
 
+class GlyphRun:
+    """
+    A line of text laid out as glyphs from a `GlyphAtlas`.
+
+    The run is drawn by blitting its glyphs side by side, so no surface is composed when
+    the text changes. Glyphs that stay the same keep the same image and position, so the
+    dirty-rect renderer only redraws the characters that changed.
+
+    Attributes:
+        glyphs (list): The (image, x offset) of each glyph.
+        width (int): The width of the text.
+        height (int): The height of the text.
+    """
+
+    def __init__(self, glyphs, width, height) -> None:
+        """
+        Initializes the run.
+
+        Args:
+            glyphs (list): The (image, x offset) of each glyph.
+            width (int): The width of the text.
+            height (int): The height of the text.
+        """
+        self.glyphs = glyphs
+        self.width = width
+        self.height = height
+
+    def get_rect(self):
+        """
+        Returns the rect of the text at the origin, like `pygame.Surface.get_rect`.
+        """
+        return pygame.Rect(0, 0, self.width, self.height)
+
+    def draw(self, screen, rect):
+        """
+        Draws the glyphs on the screen.
+
+        Args:
+            screen (pygame.Surface): The surface to draw on.
+            rect (pygame.Rect): The position of the text.
+        """
+        x, y = rect.topleft
+        screen.blits([(glyph, (x + offset, y)) for glyph, offset in self.glyphs], False)
+
+class GlyphAtlas:
+    """
+    A set of pre-rendered glyphs used to lay out numbers without rasterizing text.
+
+    Every character is rendered once with the HUD font and kept in the atlas, as is every
+    label. A value is laid out as its label followed by the glyphs of its characters,
+    which is much cheaper than rendering the whole string through the TrueType font each
+    time it changes.
+
+    Attributes:
+        font (pygame.font.Font): The font the glyphs are rendered with.
+        color (tuple): The RGB color of the glyphs.
+        glyphs (dict): The rendered image of each character.
+        labels (dict): The rendered image of each label.
+        height (int): The height of every glyph.
+    """
+
+    def __init__(self, font, color, chars='0123456789, -') -> None:
+        """
+        Initializes the atlas and renders the given characters.
+
+        Args:
+            font (pygame.font.Font): The font to render the glyphs with.
+            color (tuple): The RGB color of the glyphs.
+            chars (str): The characters rendered up front. Other characters are rendered on first use.
+        """
+        self.font = font
+        self.color = color
+        self.glyphs = {}
+        self.labels = {}
+        self.height = font.get_height()
+        for char in chars:
+            self._glyph(char)
+
+    def _glyph(self, char):
+        """
+        Returns the image of a character, rendering it the first time it is used.
+        """
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self.font.render(char, True, self.color, None)
+        return glyph
+
+    def render(self, label, text):
+        """
+        Lays out a label followed by a text from the atlas.
+
+        Args:
+            label (str): The label, rendered as a whole.
+            text (str): The text, laid out glyph by glyph.
+
+        Returns:
+            GlyphRun: The laid out text.
+        """
+        label_image = self.labels.get(label)
+        if label_image is None:
+            label_image = self.labels[label] = self.font.render(label, True, self.color, None)
+        glyphs = [(label_image, 0)]
+        x = label_image.get_width()
+        for char in text:
+            glyph = self._glyph(char)
+            glyphs.append((glyph, x))
+            x += glyph.get_width()
+        return GlyphRun(glyphs, x, self.height)
+
 class HUD:
     """
     The HUD (Heads-Up Display) class is responsible for rendering all on-screen text
@@ -24,6 +134,8 @@ class HUD:
         level_rect (pygame.Rect): The rectangle for positioning the level image.
         life_image (pygame.Surface): The image of a single life icon.
         life_rect (pygame.Rect): The rectangle for positioning each life icon.
+        atlas (GlyphAtlas): The glyph atlas the values are composed from, or None to render them with the font.
+        rendered (dict): The value each text field was last rendered with.
     """
     
     def __init__(self, game) -> None:
@@ -41,6 +153,10 @@ class HUD:
         self.game_stats = game.game_stats
         self.font = pygame.font.Font(self.settings.dialog_font, self.settings.HUD_font_size)
         self.padding = 20
+        self.atlas = None
+        if self.settings.HUD_text_mode == 'atlas':
+            self.atlas = GlyphAtlas(self.font, self.settings.text_color)
+        self.rendered = {}
         self.update_scores()
         self.setup_life_image()
         self._update_level()
@@ -49,11 +165,51 @@ class HUD:
         """
         Updates all score-related information on the HUD, including the high score,
         max score, and the current score.
+
+        Each field is only rendered again if its value changed since it was last rendered.
         """
         self._update_hi_score()
         self._update_max_score()
         self._update_score()
 
+    def invalidate(self):
+        """
+        Forgets the rendered values, so every field is rendered again on its next update.
+        """
+        self.rendered.clear()
+
+    def _changed(self, field, value):
+        """
+        Checks whether a field must be rendered again and records its new value.
+
+        Args:
+            field (str): The name of the field.
+            value (int): The value to display.
+
+        Returns:
+            bool: True if the field was never rendered or shows another value.
+        """
+        if field in self.rendered and self.rendered[field] == value:
+            return False
+        self.rendered[field] = value
+        return True
+
+    def _render_value(self, label, value):
+        """
+        Renders a label followed by a formatted value, from the glyph atlas if one is used.
+
+        Args:
+            label (str): The label of the value.
+            value (int): The value to display.
+
+        Returns:
+            pygame.Surface: The rendered text, or a GlyphRun when the glyph atlas is used.
+        """
+        text = f'{value: ,.0f}'
+        if self.atlas:
+            return self.atlas.render(label, text)
+        return self.font.render(label + text, True, self.settings.text_color, None)
+
     def _update_score(self):
         """
         Updates and renders the current score to display on the HUD.
@@ -61,8 +217,9 @@ class HUD:
         This method creates an image of the current score and positions it on the screen
         based on the screen's dimensions and padding.
         """
-        score_str = f'Score: {self.game_stats.score: ,.0f}'
-        self.score_image = self.font.render(score_str, True, self.settings.text_color, None)
+        if not self._changed('score', self.game_stats.score):
+            return
+        self.score_image = self._render_value('Score:', self.game_stats.score)
         self.score_rect = self.score_image.get_rect()
         self.score_rect.right = self.screen_rect.right - self.padding
         self.score_rect.top = self.max_score_rect.bottom + self.padding
@@ -73,8 +230,9 @@ class HUD:
 
         This method creates an image of the high score and centers it at the top of the screen.
         """
-        hi_score_str = f'Hi-score: {self.game_stats.hi_score: ,.0f}'
-        self.hi_score_image = self.font.render(hi_score_str, True, self.settings.text_color, None)
+        if not self._changed('hi_score', self.game_stats.hi_score):
+            return
+        self.hi_score_image = self._render_value('Hi-score:', self.game_stats.hi_score)
         self.hi_score_rect = self.hi_score_image.get_rect()
         self.hi_score_rect.centerx = self.screen_rect.centerx
         self.hi_score_rect.top = self.padding
@@ -86,8 +244,9 @@ class HUD:
         This method creates an image of the maximum score and positions it near the top-right
         corner of the screen.
         """
-        max_score_str = f'Max-Score: {self.game_stats.max_score: ,.0f}'
-        self.max_score_image = self.font.render(max_score_str, True, self.settings.text_color, None)
+        if not self._changed('max_score', self.game_stats.max_score):
+            return
+        self.max_score_image = self._render_value('Max-Score:', self.game_stats.max_score)
         self.max_score_rect = self.max_score_image.get_rect()
         self.max_score_rect.right = self.screen_rect.right - self.padding
         self.max_score_rect.top = self.padding
@@ -98,44 +257,87 @@ class HUD:
 
         This method creates an image of the current level and positions it below the life icons.
         """
-        level_str = f'Level: {self.game_stats.level: ,.0f}'
-        self.level_image = self.font.render(level_str, True, self.settings.text_color, None)
+        if not self._changed('level', self.game_stats.level):
+            return
+        self.level_image = self._render_value('Level:', self.game_stats.level)
         self.level_rect = self.level_image.get_rect()
         self.level_rect.left = self.screen_rect.left + self.padding
         self.level_rect.top = self.life_rect.bottom + self.padding
 
     def setup_life_image(self):
         """
-        Loads and scales the image that represents a single life icon for the player.
+        Gets the scaled image that represents a single life icon for the player from the asset cache.
 
         This image will be used to display the number of remaining lives on the HUD.
         """
-        self.life_image = pygame.image.load(self.game.settings.life_image)
-        self.life_image = pygame.transform.scale(self.life_image, (40, 40))
+        self.life_image = self.game.assets.get_image(self.settings.life_image, (40, 40))
         self.life_rect = self.life_image.get_rect()
 
-    def draw(self):
+    def state(self):
+        """
+        Returns a copy of what the HUD shows, which stays valid while the fields are rendered again.
+
+        The rendered images are never modified once rendered, so they are shared, while the
+        rects are copied.
+
+        Returns:
+            tuple: The (image, rect) of each text field and the number of lives.
+        """
+        fields = (
+            (self.hi_score_image, self.hi_score_rect.copy()),
+            (self.max_score_image, self.max_score_rect.copy()),
+            (self.score_image, self.score_rect.copy()),
+            (self.level_image, self.level_rect.copy()),
+        )
+        return fields, self.game_stats.ships_left
+
+    def draw(self, state=None):
         """
         Draws the HUD elements on the screen, including the high score, max score, 
         current score, level, and remaining lives.
 
         This method is called each frame to update the display of game statistics.
+
+        Args:
+            state (tuple): A copy of the HUD taken with `state()`, or None to draw the live HUD.
+        """
+        if state is None:
+            self._draw_text(self.hi_score_image, self.hi_score_rect)
+            self._draw_text(self.max_score_image, self.max_score_rect)
+            self._draw_text(self.score_image, self.score_rect)
+            self._draw_text(self.level_image, self.level_rect)
+            self._draw_lives(self.game_stats.ships_left)
+            return
+        fields, ships_left = state
+        for image, rect in fields:
+            self._draw_text(image, rect)
+        self._draw_lives(ships_left)
+
+    def _draw_text(self, image, rect):
+        """
+        Draws a rendered text field on the screen.
+
+        Args:
+            image (pygame.Surface): The rendered text, or a GlyphRun when the glyph atlas is used.
+            rect (pygame.Rect): The position of the text.
         """
-        self.screen.blit(self.hi_score_image, self.hi_score_rect)
-        self.screen.blit(self.max_score_image, self.max_score_rect)
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self._draw_lives()
+        if self.atlas:
+            image.draw(self.screen, rect)
+        else:
+            self.screen.blit(image, rect)
 
-    def _draw_lives(self):
+    def _draw_lives(self, ships_left):
         """
         Draws the player's remaining lives on the screen as a series of life icons.
 
         The life icons are positioned horizontally with padding between them, and 
         are drawn based on the number of ships left.
+
+        Args:
+            ships_left (int): The number of lives to draw.
         """
         current_x = self.padding
         current_y = self.padding
-        for life in range(self.game_stats.ships_left):
+        for life in range(ships_left):
             self.screen.blit(self.life_image, (current_x, current_y))
             current_x += self.life_rect.width + self.padding
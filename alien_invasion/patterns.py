@@ -1,93 +1,197 @@
+import math
 import random
-from alien import Alien
+from functools import lru_cache
 
-def create_grid_pattern(fleet, alien_w, alien_h, screen_w, screen_h):
+def grid_positions(alien_w, alien_h, screen_w, screen_h, rng=None):
     """
-    Creates a grid pattern of aliens in the fleet.
+    Computes a grid pattern of aliens.
 
     Args:
-    fleet (AlienFleet): The fleet object to which aliens will be added.
     alien_w (int): The width of each alien.
     alien_h (int): The height of each alien.
     screen_w (int): The width of the screen.
     screen_h (int): The height of the screen.
+    rng (random.Random): Unused, the grid isn't random.
+
+    Returns:
+    list: The (x, y) position of each alien on the screen.
     """
     fleet_w, fleet_h = calculate_fleet_size(alien_w, alien_h, screen_w, screen_h)
     x_offset, y_offset = calculate_offset_position(screen_w, screen_h, fleet_w, fleet_h)
+    return [(alien_w * col + x_offset, alien_h * row + y_offset)
+        for row in range(fleet_h) for col in range(fleet_w)]
 
-    for row in range(fleet_h):
-        for col in range(fleet_w):
-            current_x = alien_w * col + x_offset
-            current_y = alien_h * row + y_offset
-            create_alien(fleet, current_x, current_y)
-
-def create_zigzag_pattern(fleet, alien_w, alien_h, screen_w, screen_h):
+def zigzag_positions(alien_w, alien_h, screen_w, screen_h, rng=None):
     """
-    Creates a zigzag pattern of aliens in the fleet.
+    Computes a zigzag pattern of aliens.
 
     The aliens are arranged in rows, and every other row is shifted horizontally
     to create a zigzag pattern.
 
     Args:
-    fleet (AlienFleet): The fleet object to which aliens will be added.
     alien_w (int): The width of each alien.
     alien_h (int): The height of each alien.
     screen_w (int): The width of the screen.
     screen_h (int): The height of the screen.
+    rng (random.Random): Unused, the zigzag isn't random.
+
+    Returns:
+    list: The (x, y) position of each alien on the screen.
     """
     fleet_w, fleet_h = calculate_fleet_size(alien_w, alien_h, screen_w, screen_h)
     x_offset, y_offset = calculate_offset_position(screen_w, screen_h, fleet_w, fleet_h)
-
+    positions = []
     for row in range(fleet_h):
+        shift = 100 if row % 2 == 0 else 0  # Shift odd rows for zigzag effect
         for col in range(fleet_w):
-            current_x = alien_w * col + x_offset
-            current_y = alien_h * row + y_offset
-            if row % 2 == 0:
-                current_x += 100  # Shift odd rows for zigzag effect
-            create_alien(fleet, current_x, current_y)
+            positions.append((alien_w * col + x_offset + shift, alien_h * row + y_offset))
+    return positions
 
-def create_triangle_pattern(fleet, alien_w, alien_h, screen_w, screen_h):
+def triangle_positions(alien_w, alien_h, screen_w, screen_h, rng=None):
     """
-    Creates a triangular pattern of aliens in the fleet.
+    Computes a triangular pattern of aliens.
 
     The number of aliens per row decreases as the rows move upward, forming a triangle shape.
 
     Args:
-    fleet (AlienFleet): The fleet object to which aliens will be added.
     alien_w (int): The width of each alien.
     alien_h (int): The height of each alien.
     screen_w (int): The width of the screen.
     screen_h (int): The height of the screen.
+    rng (random.Random): Unused, the triangle isn't random.
+
+    Returns:
+    list: The (x, y) position of each alien on the screen.
     """
     fleet_w, fleet_h = calculate_fleet_size(alien_w, alien_h, screen_w, screen_h)
     x_offset, y_offset = calculate_offset_position(screen_w, screen_h, fleet_w, fleet_h)
+    # Make fewer aliens in higher rows to create a triangle
+    return [(alien_w * col + x_offset, alien_h * row + y_offset)
+        for row in range(fleet_h) for col in range(min(row + 1, fleet_w))]
 
-    for row in range(fleet_h):
-        for col in range(fleet_w):
-            if col > row:  # Make fewer aliens in higher rows to create a triangle
-                continue
-            current_x = alien_w * col + x_offset
-            current_y = alien_h * row + y_offset
-            create_alien(fleet, current_x, current_y)
-
-def create_random_pattern(fleet, alien_w, alien_h, screen_w, screen_h):
+def random_positions(alien_w, alien_h, screen_w, screen_h, rng):
     """
-    Creates a random pattern of aliens in the fleet.
+    Computes a random pattern of aliens.
 
     The aliens are placed at random positions on the screen, up to half the screen height.
 
     Args:
-    fleet (AlienFleet): The fleet object to which aliens will be added.
     alien_w (int): The width of each alien.
     alien_h (int): The height of each alien.
     screen_w (int): The width of the screen.
     screen_h (int): The height of the screen.
+    rng (random.Random): The generator the positions are drawn from.
+
+    Returns:
+    list: The (x, y) position of each alien on the screen.
     """
     fleet_w, fleet_h = calculate_fleet_size(alien_w, alien_h, screen_w, screen_h)
-    for _ in range(fleet_w * fleet_h):
-        random_x = random.randint(0, screen_w - alien_w)
-        random_y = random.randint(0, screen_h // 2 - alien_h)
-        create_alien(fleet, random_x, random_y)
+    return [(rng.randint(0, screen_w - alien_w), rng.randint(0, screen_h // 2 - alien_h))
+        for _ in range(fleet_w * fleet_h)]
+
+def snowflake_positions(alien_w, alien_h, screen_w, screen_h, rng=None):
+    """
+    Computes a snowflake pattern of aliens around the center of the screen.
+
+    The snowflake pattern consists of multiple arms, each containing a set number
+    of aliens, with aliens spaced out along the arms. Additionally, an alien is placed
+    in the center of the snowflake.
+
+    Args:
+    alien_w (int): The width of each alien.
+    alien_h (int): The height of each alien.
+    screen_w (int): The width of the screen.
+    screen_h (int): The height of the screen.
+    rng (random.Random): Unused, the snowflake isn't random.
+
+    Returns:
+    list: The (x, y) position of each alien, relative to the center of the screen.
+    """
+    num_arms = 6  # Number of arms for the snowflake
+    num_aliens_per_arm = 5  # Number of aliens per arm
+
+    alien_spacing = alien_w * 1.5  # Add some space between aliens to minimize overlap
+
+    positions = []
+    # Create aliens along the arms
+    for arm in range(num_arms):
+        arm_angle = math.radians((360 / num_arms) * arm)  # 60-degree separation between arms
+        cos_angle = math.cos(arm_angle)
+        sin_angle = math.sin(arm_angle)
+
+        # Distribute aliens along the arm (from center to outer radius)
+        for i in range(num_aliens_per_arm):
+            alien_distance = (i + 1) * alien_spacing
+            x_offset = int(cos_angle * alien_distance)
+            y_offset = int(sin_angle * alien_distance)
+
+            # Adjust the alien's position relative to the center
+            positions.append((x_offset - alien_w // 2, y_offset - alien_h // 2))
+
+    positions.append((0, 0))  # Center of the snowflake
+    return positions
+
+# The generator of each pattern by name, and whether its formation is centered on the screen
+PATTERNS = {
+    'grid': (grid_positions, False),
+    'zigzag': (zigzag_positions, False),
+    'triangle': (triangle_positions, False),
+    'random': (random_positions, False),
+    'snowflake': (snowflake_positions, True),
+}
+
+# The patterns whose positions depend on the seed
+RANDOM_PATTERNS = {'random'}
+
+@lru_cache(maxsize=32)
+def compile_pattern(name, screen_w, screen_h, alien_w, alien_h, seed=None):
+    """
+    Compiles a pattern into the origin and local alien positions of a formation, and memoizes it.
+
+    The result only depends on the arguments, so a wave is only computed once for a screen and
+    alien size, and respawning it is a copy of the cached positions. The seed is only used by
+    random patterns; it should be None for the others so they share one cache entry.
+
+    Args:
+    name (str): The name of the pattern in `PATTERNS`.
+    screen_w (int): The width of the screen.
+    screen_h (int): The height of the screen.
+    alien_w (int): The width of each alien.
+    alien_h (int): The height of each alien.
+    seed (int): The seed of random patterns.
+
+    Returns:
+    tuple: The (x, y) origin of the formation and a tuple of the (x, y) position of each alien
+           relative to it. The tuples are shared by every caller and must not be changed.
+    """
+    if name not in PATTERNS:
+        raise ValueError(f"Unknown fleet pattern {name!r}, expected one of {sorted(PATTERNS)}")
+    generator, centered = PATTERNS[name]
+    rng = random.Random(seed) if name in RANDOM_PATTERNS else None
+    positions = tuple(generator(alien_w, alien_h, screen_w, screen_h, rng))
+    origin = (screen_w // 2, screen_h // 2) if centered else (0, 0)
+    return origin, positions
+
+def create_pattern(fleet, name, direction=1):
+    """
+    Adds a formation of aliens in a compiled pattern to the fleet.
+
+    The seed of random patterns is drawn from the game's generator, so a replay creates the
+    same waves.
+
+    Args:
+    fleet (AlienFleet): The fleet object to which the formation will be added.
+    name (str): The name of the pattern in `PATTERNS`.
+    direction (int): The direction the formation starts moving in.
+
+    Returns:
+    Formation: The new formation.
+    """
+    settings = fleet.settings
+    seed = fleet.game.rng.getrandbits(32) if name in RANDOM_PATTERNS else None
+    (x, y), positions = compile_pattern(name, settings.screen_w, settings.screen_h,
+        settings.alien_w, settings.alien_h, seed)
+    return fleet.add_formation(x, y, positions, direction)
 
 # Utility functions that are common to the patterns
 def calculate_fleet_size(alien_w, alien_h, screen_w, screen_h):
@@ -123,15 +227,3 @@ def calculate_offset_position(screen_w, screen_h, fleet_w, fleet_h):
     x_offset = int(screen_w // fleet_w // 2)
     y_offset = int(screen_h // fleet_h // 2)
     return x_offset, y_offset
-
-def create_alien(fleet, current_x, current_y):
-    """
-    Creates a new alien at the specified position and adds it to the fleet.
-
-    Args:
-    fleet (AlienFleet): The fleet object to which the alien will be added.
-    current_x (int): The x-coordinate for the new alien.
-    current_y (int): The y-coordinate for the new alien.
-    """
-    new_alien = Alien(fleet.game, current_x, current_y)
-    fleet.add(new_alien)
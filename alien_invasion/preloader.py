@@ -0,0 +1,131 @@
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+
+class AssetPreloader:
+    """
+    A class to decode images and sounds on a thread pool while the main thread keeps drawing.
+
+    Decoding a PNG or an MP3 mostly runs in SDL with the GIL released, so the files are
+    decoded in parallel while the main thread shows the loading screen. The decoded images
+    are handed to the asset cache, which still scales and converts them on the main thread
+    once the display exists.
+
+    Attributes:
+        workers (int): The number of decoding threads.
+        images (dict): The future of each image, keyed by file path.
+        sounds (dict): The future of each sound, keyed by file path.
+    """
+
+    def __init__(self, workers=4) -> None:
+        """
+        Initializes the preloader.
+
+        Args:
+            workers (int): The number of decoding threads.
+        """
+        self.workers = workers
+        self.images = {}
+        self.sounds = {}
+        self._executor = None
+
+    def start(self, images=(), sounds=()):
+        """
+        Starts decoding the given files in the background.
+
+        The mixer must be initialized before any sound is preloaded.
+
+        Args:
+            images (iterable): The file paths of the images.
+            sounds (iterable): The file paths of the sounds.
+        """
+        self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='AssetPreloader')
+        for path in dict.fromkeys(images):
+            self.images[path] = self._executor.submit(pygame.image.load, path)
+        for path in dict.fromkeys(sounds):
+            self.sounds[path] = self._executor.submit(pygame.mixer.Sound, path)
+        self._executor.shutdown(wait=False)
+
+    def progress(self):
+        """
+        Returns how many files are decoded.
+
+        Returns:
+            tuple: The number of decoded files and the total number of files.
+        """
+        futures = list(self.images.values()) + list(self.sounds.values())
+        return sum(future.done() for future in futures), len(futures)
+
+    def done(self):
+        """
+        Returns True once every file is decoded.
+        """
+        done, total = self.progress()
+        return done == total
+
+    def image(self, path):
+        """
+        Returns a decoded image, waiting for it if needed.
+
+        Args:
+            path (str): The file path of the image.
+
+        Returns:
+            pygame.Surface: The decoded image.
+        """
+        return self.images[path].result()
+
+    def sound(self, path):
+        """
+        Returns a decoded sound, waiting for it if needed.
+
+        Args:
+            path (str): The file path of the sound.
+
+        Returns:
+            pygame.mixer.Sound: The decoded sound.
+        """
+        return self.sounds[path].result()
+
+class LoadingScreen:
+    """
+    A lightweight screen showing the loading progress, drawn directly on the display.
+
+    Attributes:
+        screen (pygame.Surface): The display surface.
+        settings (Settings): The settings providing the font and colors.
+        font (pygame.font.Font): The font of the progress message.
+        bar (pygame.Rect): The outline of the progress bar.
+    """
+
+    def __init__(self, screen, settings) -> None:
+        """
+        Initializes the loading screen.
+
+        Args:
+            screen (pygame.Surface): The display surface.
+            settings (Settings): The settings providing the font and colors.
+        """
+        self.screen = screen
+        self.settings = settings
+        self.font = pygame.font.Font(settings.dialog_font, settings.HUD_font_size)
+        self.bar = pygame.Rect(0, 0, settings.button_w * 2, settings.button_h // 3)
+        self.bar.center = screen.get_rect().center
+
+    def draw(self, done, total):
+        """
+        Draws the progress and presents it.
+
+        Args:
+            done (int): The number of loaded files.
+            total (int): The total number of files.
+        """
+        fraction = done / total if total else 1.0
+        self.screen.fill((0, 0, 0))
+        message = self.font.render(f'Loading... {fraction:.0%}', True, self.settings.text_color, None)
+        message_rect = message.get_rect(midbottom=(self.bar.centerx, self.bar.top - 10))
+        self.screen.blit(message, message_rect)
+        filled = self.bar.copy()
+        filled.width = round(self.bar.width * fraction)
+        self.screen.fill(self.settings.button_color, filled)
+        pygame.draw.rect(self.screen, self.settings.text_color, self.bar, 1)
+        pygame.display.flip()
@@ -0,0 +1,330 @@
+from collections import deque
+import json
+import threading
+import time
+import pygame.font
+
+class _Phase:
+    """
+    A context manager that measures one phase of a frame.
+    """
+
+    def __init__(self, profiler, name) -> None:
+        """
+        Initializes the phase.
+
+        Args:
+            profiler (FrameProfiler): The profiler that records the timing.
+            name (str): The name of the phase.
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullPhase:
+    """
+    A context manager that does nothing, used while the profiler is disabled.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_PHASE = _NullPhase()
+
+def _summarize(timings):
+    """
+    Returns the min, mean and p99 of every phase's timings, in milliseconds.
+
+    Args:
+        timings (dict): The timings of each phase, in seconds.
+
+    Returns:
+        dict: The statistics of each phase, keyed by phase name.
+    """
+    results = {}
+    for name, samples in timings.items():
+        ordered = sorted(samples)
+        if not ordered:
+            continue
+        results[name] = {
+            'min': ordered[0] * 1000,
+            'mean': sum(ordered) / len(ordered) * 1000,
+            'p99': ordered[int(0.99 * (len(ordered) - 1))] * 1000,
+        }
+    return results
+
+class DumpWriter:
+    """
+    A class to append the profiler dumps to the JSONL file in the background.
+
+    `FrameProfiler.dump()` hands a copy of the timings to `save()`, which only queues it and
+    wakes the writer thread. The thread computes the statistics and appends every queued
+    record, so neither the sorting nor the file write happens on the frame path.
+
+    Attributes:
+        path (str): The path of the JSONL file.
+        pending (list): The records waiting to be written.
+        writes (int): The number of records written.
+        thread (threading.Thread): The background writer thread, started on the first save.
+    """
+
+    def __init__(self, path) -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            path (str): The path of the JSONL file.
+        """
+        self.path = path
+        self.pending = []
+        self.writes = 0
+        self.thread = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+    def save(self, record):
+        """
+        Queues a record to be written.
+
+        Args:
+            record (dict): The record, with the raw timings of each phase under 'phases'.
+        """
+        with self._lock:
+            self.pending.append(record)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='DumpWriter', daemon=True)
+            self.thread.start()
+        self._wake.set()
+
+    def flush(self):
+        """
+        Writes the queued records now, if there are any.
+        """
+        with self._write_lock:
+            with self._lock:
+                records, self.pending = self.pending, []
+            if records:
+                self._write(records)
+
+    def close(self):
+        """
+        Writes the queued records and stops the writer thread.
+        """
+        self._closed = True
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def _run(self):
+        """
+        Waits for records and writes them.
+        """
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, records):
+        """
+        Summarizes the timings of each record and appends the records to the JSONL file.
+
+        Args:
+            records (list): The records to write.
+        """
+        lines = []
+        for record in records:
+            record = dict(record, phases=_summarize(record['phases']))
+            lines.append(json.dumps(record) + '\n')
+        with open(self.path, 'a') as file:
+            file.writelines(lines)
+        self.writes += len(records)
+
+class FrameProfiler:
+    """
+    A class to measure how long each phase of a frame takes.
+
+    The game loop wraps its phases (events, ship, bullets, aliens, drawing, HUD, present)
+    in `phase()`. The profiler keeps a rolling window of timings per phase, reports their
+    min, mean and p99, tracks the number of entities, draws an overlay with the results and
+    periodically appends them to a JSONL file from a background thread. While disabled `phase()` returns a shared
+    no-op context manager, so the cost is a single method call per phase.
+
+    Attributes:
+        game (AlienInvasion): The game instance, providing settings and entity counts.
+        settings (Settings): The settings object that configures the profiler.
+        enabled (bool): Whether timings are recorded.
+        show_overlay (bool): Whether the overlay is drawn on the screen.
+        window (int): The number of frames kept per phase.
+        timings (dict): The rolling timings of each phase, in seconds.
+        frames (int): The number of frames recorded.
+        font (pygame.font.Font): The font used for the overlay.
+        overlay_images (list): The rendered lines of the overlay.
+        writer (DumpWriter): The background writer of the JSONL file, created on the first dump.
+    """
+
+    def __init__(self, game) -> None:
+        """
+        Initializes the profiler.
+
+        Args:
+            game (AlienInvasion): The game instance, providing settings and entity counts.
+        """
+        self.game = game
+        self.settings = game.settings
+        self.enabled = self.settings.profiler_enabled
+        self.show_overlay = False
+        self.window = self.settings.profiler_window
+        self.timings = {}
+        self._phases = {}
+        self.frames = 0
+        self.font = None
+        self.overlay_images = []
+        self.writer = None
+
+    def phase(self, name):
+        """
+        Returns a context manager measuring the named phase.
+
+        Args:
+            name (str): The name of the phase.
+
+        Returns:
+            A context manager that records the time spent inside it.
+        """
+        if not self.enabled:
+            return _NULL_PHASE
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def record(self, name, seconds):
+        """
+        Adds a timing to the rolling window of a phase.
+
+        Args:
+            name (str): The name of the phase.
+            seconds (float): The time spent in the phase.
+        """
+        samples = self.timings.get(name)
+        if samples is None:
+            samples = self.timings[name] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def end_frame(self):
+        """
+        Closes the current frame, refreshing the overlay and dumping the results when due.
+        """
+        if not self.enabled:
+            return
+        self.frames += 1
+        if self.show_overlay and self.frames % self.settings.profiler_overlay_interval == 0:
+            self._prep_overlay()
+        if self.settings.profiler_dump_interval and self.frames % self.settings.profiler_dump_interval == 0:
+            self.dump()
+
+    def toggle_overlay(self):
+        """
+        Shows or hides the overlay. Showing it enables the profiler, hiding it restores the
+        `profiler_enabled` setting.
+        """
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enabled = True
+            self._prep_overlay()
+        else:
+            self.enabled = self.settings.profiler_enabled
+
+    def counts(self):
+        """
+        Returns the number of entities in the game.
+
+        Returns:
+            dict: The number of aliens and bullets.
+        """
+        return {
+            'aliens': len(self.game.aliens.fleet),
+            'bullets': len(self.game.bullets),
+        }
+
+    def summary(self):
+        """
+        Returns the min, mean and p99 timings of every phase, in milliseconds.
+
+        Returns:
+            dict: The statistics of each phase, keyed by phase name.
+        """
+        return _summarize(self._copy_timings())
+
+    def _copy_timings(self):
+        """
+        Returns a copy of the timings of every phase.
+
+        The simulation thread may add phases and timings meanwhile, so the dict and the
+        windows are copied before they are iterated over.
+
+        Returns:
+            dict: The timings of each phase, as lists.
+        """
+        return {name: list(samples) for name, samples in list(self.timings.items())}
+
+    def dump(self):
+        """
+        Queues the current timings and entity counts to be appended as one line to the JSONL file.
+
+        The statistics are computed and written by the writer thread.
+        """
+        if self.writer is None:
+            self.writer = DumpWriter(self.settings.profiler_file)
+        self.writer.save({
+            'time': time.time(),
+            'frame': self.frames,
+            'phases': self._copy_timings(),
+            'counts': self.counts(),
+        })
+
+    def close(self):
+        """
+        Writes the queued dumps and stops the writer thread.
+        """
+        if self.writer:
+            self.writer.close()
+
+    def _prep_overlay(self):
+        """
+        Renders the lines of the overlay from the current statistics.
+        """
+        if self.font is None:
+            self.font = pygame.font.Font(self.settings.dialog_font, self.settings.profiler_font_size)
+        lines = ['phase        min   mean    p99 (ms)']
+        for name, stats in self.summary().items():
+            lines.append(f"{name:<10}{stats['min']:6.2f} {stats['mean']:6.2f} {stats['p99']:6.2f}")
+        lines.append(' '.join(f'{name}: {count}' for name, count in self.counts().items()))
+        self.overlay_images = [self.font.render(line, True, self.settings.text_color, (0, 0, 0))
+            for line in lines]
+
+    def draw(self):
+        """
+        Draws the overlay in the bottom-left corner of the screen when it is shown.
+        """
+        if not self.show_overlay:
+            return
+        screen = self.game.screen
+        y = screen.get_height() - 10
+        for image in reversed(self.overlay_images):
+            y -= image.get_height()
+            screen.blit(image, (10, y))
@@ -0,0 +1,210 @@
+from collections import Counter
+import pygame
+
+class RecordingSurface:
+    """
+    A stand-in for the display surface that records the draw calls made on it.
+
+    Game objects draw on it exactly like on the real screen. The recorded calls are
+    replayed by `DirtyRenderer` on the regions of the display that changed. Every other
+    attribute is read from the display surface.
+
+    Attributes:
+        display (pygame.Surface): The real display surface.
+        commands (list): The draw calls recorded for the current frame.
+    """
+
+    def __init__(self, display) -> None:
+        """
+        Initializes the recording surface.
+
+        Args:
+            display (pygame.Surface): The real display surface.
+        """
+        self.display = display
+        self.commands = []
+
+    def __getattr__(self, name):
+        """
+        Reads any attribute that isn't recorded from the display surface.
+        """
+        return getattr(self.display, name)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """
+        Records a blit of `source` at `dest`.
+
+        Returns:
+            pygame.Rect: The area covered by the blit.
+        """
+        rect = pygame.Rect(dest if len(dest) == 2 else dest[:2],
+            area.size if area else source.get_size())
+        area = tuple(area) if area else None
+        self.commands.append(((source, rect.x, rect.y, area, special_flags), rect))
+        return rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        """
+        Records a sequence of blits.
+
+        Returns:
+            list: The areas covered by the blits, if `doreturn` is true.
+        """
+        rects = [self.blit(*item) for item in blit_sequence]
+        return rects if doreturn else None
+
+    def fill(self, color, rect=None, special_flags=0):
+        """
+        Records a fill of `rect` with `color`.
+
+        Returns:
+            pygame.Rect: The filled area.
+        """
+        rect = pygame.Rect(rect) if rect else self.display.get_rect()
+        self.commands.append((('fill', tuple(color), special_flags), rect))
+        return rect
+
+class DirtyRenderer:
+    """
+    A renderer that only redraws and presents the regions of the screen that changed.
+
+    Each frame the draw calls of the ship, bullets, aliens, HUD and buttons are recorded
+    instead of drawn. They are compared with the previous frame's calls: the areas of calls
+    that disappeared, moved or changed image are dirty. Only those areas get the background
+    restored and the recorded calls replayed, and only they are sent to the display with
+    `pygame.display.update`. When nothing changed the frame is not presented at all.
+
+    Attributes:
+        game (AlienInvasion): The game instance, providing the background image.
+        display (pygame.Surface): The real display surface.
+        canvas (RecordingSurface): The surface the game draws on.
+        screen_area (int): The number of pixels of the display.
+        last_dirty_area (int): The number of pixels updated in the last frame.
+        frames (int): The number of frames rendered.
+        presented (int): The number of frames that updated the display.
+        dirty_area (int): The total number of pixels updated since the start.
+    """
+
+    def __init__(self, game, display) -> None:
+        """
+        Initializes the dirty-rect renderer.
+
+        Args:
+            game (AlienInvasion): The game instance, providing the background image.
+            display (pygame.Surface): The real display surface.
+        """
+        self.game = game
+        self.display = display
+        self.canvas = RecordingSurface(display)
+        self.screen_area = display.get_width() * display.get_height()
+        self._previous = []
+        self._full_redraw = True
+        self.last_dirty_area = 0
+        self.frames = 0
+        self.presented = 0
+        self.dirty_area = 0
+
+    def invalidate(self):
+        """
+        Forces the next frame to redraw and present the whole screen.
+        """
+        self._full_redraw = True
+
+    def begin_frame(self):
+        """
+        Starts recording the draw calls of a new frame.
+        """
+        self.canvas.commands = []
+
+    def present(self):
+        """
+        Redraws the changed regions of the screen and sends them to the display.
+
+        Returns:
+            int: The number of pixels updated, 0 if the frame was skipped.
+        """
+        commands = self.canvas.commands
+        self.frames += 1
+        dirty = self._dirty_rects(commands)
+        self._previous = commands
+        self.last_dirty_area = sum(rect.w * rect.h for rect in dirty)
+        if not dirty:
+            return 0
+
+        rects = [rect for _, rect in commands]
+        background = self.game.bg
+        for area in dirty:
+            self.display.set_clip(area)
+            self.display.blit(background, area, area)
+            for index in area.collidelistall(rects):
+                self._replay(*commands[index])
+        self.display.set_clip(None)
+
+        pygame.display.update(dirty)
+        self.presented += 1
+        self.dirty_area += self.last_dirty_area
+        return self.last_dirty_area
+
+    def _dirty_rects(self, commands):
+        """
+        Returns the merged regions covered by draw calls that differ from the previous frame.
+
+        Args:
+            commands (list): The draw calls recorded for the current frame.
+
+        Returns:
+            list: The dirty rects, clipped to the screen.
+        """
+        screen_rect = self.display.get_rect()
+        if self._full_redraw:
+            self._full_redraw = False
+            return [screen_rect]
+
+        # Identical calls can be stacked on top of each other, so they are counted
+        current = Counter((key, tuple(rect)) for key, rect in commands)
+        previous = Counter((key, tuple(rect)) for key, rect in self._previous)
+        changed = [pygame.Rect(rect) for _, rect in (current - previous) + (previous - current)]
+
+        merged = []
+        for rect in changed:
+            rect = rect.clip(screen_rect)
+            if not rect.w or not rect.h:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def _replay(self, command, rect):
+        """
+        Draws a recorded call on the display.
+
+        Args:
+            command (tuple): The recorded call.
+            rect (pygame.Rect): The area covered by the call.
+        """
+        if command[0] == 'fill':
+            _, color, special_flags = command
+            self.display.fill(color, rect, special_flags)
+            return
+        source, x, y, area, special_flags = command
+        self.display.blit(source, (x, y), area, special_flags)
+
+    def stats(self):
+        """
+        Returns the rendering counters.
+
+        Returns:
+            dict: The number of frames rendered and presented, the pixels updated in the last
+                  frame, and the share of full-screen updates saved since the start.
+        """
+        full_area = self.frames * self.screen_area
+        return {
+            'frames': self.frames,
+            'presented': self.presented,
+            'last_dirty_area': self.last_dirty_area,
+            'dirty_area': self.dirty_area,
+            'saved': 1 - self.dirty_area / full_area if full_area else 0.0,
+        }
@@ -0,0 +1,602 @@
+import argparse
+import atexit
+import bisect
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+import pygame
+from savestate import pack_state, unpack_frame, unpack_rng, unpack_state
+
+# The magic bytes and version of the binary replay format
+MAGIC = b'AIRB'
+INDEX_MAGIC = b'AIRX'
+FORMAT_VERSION = 1
+
+# magic, version, seed, keyframe interval, whether the pauses are skipped
+_FILE_HEADER = struct.Struct('<4sBQI?')
+# keyframe frame, chunk offset, chunk length, index of the chunk holding the generator state
+_INDEX_ENTRY = struct.Struct('<IQII')
+# index offset, number of chunks, magic
+_FOOTER = struct.Struct('<QI4s')
+_LENGTH = struct.Struct('<I')
+
+# The tag of each record of a chunk
+_EVENT_TAGS = {pygame.KEYDOWN: 0, pygame.KEYUP: 1, pygame.MOUSEBUTTONDOWN: 2}
+_EVENT_TYPES = {tag: event_type for event_type, tag in _EVENT_TAGS.items()}
+_END_TAG = 3
+
+class InputRecorder:
+    """
+    A class to record the input events handled by the game, for a bit-exact replay.
+
+    Every key and mouse event handled in `_check_events` is stored with the simulation
+    frame it was handled on, together with the seed of the game's random generator. After
+    every simulation step the hash of the game state is stored too, so a replay can tell
+    on which frame it diverged.
+
+    Attributes:
+        seed (int): The seed of the recorded game.
+        hi_score (int): The high score when the recording started.
+        skip_pauses (bool): Whether the recorded game skipped the pauses, like headless games do.
+        events (list): The recorded events, as [frame, type, key or mouse position].
+        hashes (dict): The state hash after each simulation frame, keyed by frame.
+    """
+
+    def __init__(self, seed, hi_score=0, skip_pauses=True) -> None:
+        """
+        Initializes an empty recording.
+
+        Args:
+            seed (int): The seed of the recorded game.
+            hi_score (int): The high score when the recording starts.
+            skip_pauses (bool): Whether the recorded game skips the pauses.
+        """
+        self.seed = seed
+        self.hi_score = hi_score
+        self.skip_pauses = skip_pauses
+        self.events = []
+        self.hashes = {}
+
+    def record_event(self, frame, event):
+        """
+        Records an input event if it affects the game.
+
+        Args:
+            frame (int): The simulation frame the event is handled on.
+            event (pygame.event.Event): The event.
+        """
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+            self.events.append([frame, event.type, event.key])
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            self.events.append([frame, event.type, list(event.pos)])
+
+    def record_hash(self, frame, state_hash):
+        """
+        Records the state hash after a simulation frame.
+
+        Args:
+            frame (int): The simulation frame.
+            state_hash (str): The hash of the game state.
+        """
+        self.hashes[frame] = state_hash
+
+    def save(self, path):
+        """
+        Writes the recording to a JSON file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        contents = {
+            'seed': self.seed,
+            'hi_score': self.hi_score,
+            'skip_pauses': self.skip_pauses,
+            'events': self.events,
+            'hashes': self.hashes,
+        }
+        with open(path, 'w') as file:
+            json.dump(contents, file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a recording from a JSON file.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            InputRecorder: The recording.
+        """
+        with open(path) as file:
+            contents = json.load(file)
+        recorder = cls(contents['seed'], contents['hi_score'], contents.get('skip_pauses', True))
+        recorder.events = contents['events']
+        recorder.hashes = {int(frame): state_hash for frame, state_hash in contents['hashes'].items()}
+        return recorder
+
+def to_event(event_type, value):
+    """
+    Rebuilds a pygame event from a recorded event.
+
+    Args:
+        event_type (int): The type of the event.
+        value: The key of a key event, or the position of a mouse event.
+
+    Returns:
+        pygame.event.Event: The event.
+    """
+    if event_type == pygame.MOUSEBUTTONDOWN:
+        return pygame.event.Event(event_type, pos=tuple(value), button=1)
+    return pygame.event.Event(event_type, key=value)
+
+def _write_varint(out, value):
+    """
+    Appends an unsigned integer to a bytearray, 7 bits per byte with the high bit set on all
+    but the last byte.
+    """
+    while value >= 0x80:
+        out.append(value & 0x7f | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data, pos):
+    """
+    Reads an unsigned integer written by `_write_varint`.
+
+    Returns:
+        tuple: The integer and the position after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+class ReplayWriter:
+    """
+    A class to record a whole match into a compact binary replay file, while it is played.
+
+    The game is deterministic for a seed and its inputs, so the frames between two keyframes
+    are stored as the input events handled in between, each one delta-encoded against the
+    frame of the previous one. Every `keyframe_interval` frames a keyframe of the full state
+    (`pack_state`) starts a new chunk. The state of the random generator is only stored in a
+    keyframe when it changed since the last one that has it.
+
+    Every chunk is compressed on its own with zlib as its records are written, so the file is
+    written as the game goes and a chunk can be decompressed without the ones before it. Each
+    chunk ends with the hash of the state on its last frame. When the writer is closed, an
+    index of the chunks is appended, so a player can seek to any frame by restoring the
+    nearest keyframe before it and simulating the rest of its chunk.
+
+    The writer closes itself at interpreter exit, so a game ending with an unhandled exception
+    still leaves a complete file. If the process dies before that, the finished chunks are
+    already on disk and `ReplayReader` rebuilds their index.
+
+    File layout:
+        - the header: magic, version, seed, keyframe interval and whether the pauses are skipped,
+        - the compressed chunks, each one a length-prefixed keyframe, then the event records
+          and an end record with the last frame and its state hash,
+        - the index: one (frame, offset, length, generator chunk) entry per chunk,
+        - the footer: the index offset, the number of chunks and the index magic.
+
+    Attributes:
+        game (AlienInvasion): The recorded game.
+        file (file): The replay file being written.
+        keyframe_interval (int): The number of simulation frames between two keyframes.
+        index (list): The (frame, offset, length, generator chunk) entry of every chunk.
+    """
+
+    def __init__(self, game, path, keyframe_interval=600) -> None:
+        """
+        Opens the replay file and writes its header.
+
+        Args:
+            game (AlienInvasion): The game to record.
+            path (str): The path of the replay file.
+            keyframe_interval (int): The number of simulation frames between two keyframes.
+        """
+        self.game = game
+        self.file = open(path, 'wb')
+        self.keyframe_interval = keyframe_interval
+        self.file.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, game.seed, keyframe_interval,
+            game.state.skip_pauses))
+        self.index = []
+        self._compressor = None
+        self._last_frame = 0
+        self._rng_state = None
+        self._rng_chunk = 0
+        atexit.register(self.close)
+
+    def record_event(self, event):
+        """
+        Records an input event if it affects the game, on the current frame.
+
+        Args:
+            event (pygame.event.Event): The event.
+        """
+        tag = _EVENT_TAGS.get(event.type)
+        if tag is None:
+            return
+        if not self._compressor:
+            self._start_chunk()
+        frame = self.game.frame
+        record = bytearray((tag,))
+        _write_varint(record, frame - self._last_frame)
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            _write_varint(record, event.pos[0])
+            _write_varint(record, event.pos[1])
+        else:
+            _write_varint(record, event.key)
+        self._last_frame = frame
+        self._write(record)
+
+    def record_frame(self):
+        """
+        Called after every simulation step; starts a new chunk once the keyframe interval elapsed.
+        """
+        if not self._compressor:
+            self._start_chunk()
+        elif self.game.frame - self.index[-1][0] >= self.keyframe_interval:
+            self._end_chunk()
+            self._start_chunk()
+
+    def close(self):
+        """
+        Ends the last chunk, appends the index and closes the file. Does nothing once closed.
+        """
+        if self.file.closed:
+            return
+        atexit.unregister(self.close)
+        if self._compressor:
+            self._end_chunk()
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(_INDEX_ENTRY.pack(*entry))
+        self.file.write(_FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        self.file.close()
+
+    def _start_chunk(self):
+        """
+        Starts a chunk with a keyframe of the current state.
+        """
+        rng_state = self.game.rng.getstate()
+        include_rng = rng_state != self._rng_state
+        if include_rng:
+            self._rng_state = rng_state
+            self._rng_chunk = len(self.index)
+        keyframe = pack_state(self.game, include_rng)
+        self.index.append([self.game.frame, self.file.tell(), 0, self._rng_chunk])
+        self._last_frame = self.game.frame
+        self._compressor = zlib.compressobj(9)
+        self._write(_LENGTH.pack(len(keyframe)) + keyframe)
+
+    def _end_chunk(self):
+        """
+        Ends the current chunk with the hash of the current state, and flushes its compressed bytes.
+        """
+        record = bytearray((_END_TAG,))
+        _write_varint(record, self.game.frame - self._last_frame)
+        record += bytes.fromhex(self.game.state_hash())
+        self._write(record)
+        self.file.write(self._compressor.flush())
+        # Hand the finished chunk to the OS, so it survives the process dying
+        self.file.flush()
+        self._compressor = None
+        entry = self.index[-1]
+        entry[2] = self.file.tell() - entry[1]
+
+    def _write(self, data):
+        """
+        Compresses bytes into the current chunk, writing out whatever the compressor emits.
+        """
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self.file.write(compressed)
+
+class ReplayReader:
+    """
+    A class to read the binary replay files written by `ReplayWriter`.
+
+    Attributes:
+        seed (int): The seed of the recorded game.
+        keyframe_interval (int): The number of simulation frames between two keyframes.
+        skip_pauses (bool): Whether the recorded game skipped the pauses.
+        index (list): The (frame, offset, length, generator chunk) entry of every chunk.
+        size (int): The size of the file in bytes.
+        recovered (bool): Whether the file had no index, which was rebuilt from its chunks.
+    """
+
+    def __init__(self, path) -> None:
+        """
+        Reads the header and the index of a replay file.
+
+        A file without index, left by a process that died while recording, is scanned for its
+        finished chunks instead; the unfinished last chunk is dropped.
+
+        Args:
+            path (str): The path of the replay file.
+
+        Raises:
+            ValueError: If the file isn't a replay of a supported version, or holds no finished chunk.
+        """
+        with open(path, 'rb') as file:
+            self._data = file.read()
+        self.size = len(self._data)
+        if self.size < _FILE_HEADER.size:
+            raise ValueError(f'{path} is too short to be a replay')
+        magic, version, self.seed, self.keyframe_interval, self.skip_pauses = _FILE_HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{path} is not a version {FORMAT_VERSION} replay')
+        self.recovered = False
+        if self.size >= _FILE_HEADER.size + _FOOTER.size:
+            index_offset, count, index_magic = _FOOTER.unpack_from(self._data, self.size - _FOOTER.size)
+        else:
+            index_magic = None
+        if index_magic == INDEX_MAGIC:
+            self.index = [_INDEX_ENTRY.unpack_from(self._data, index_offset + i * _INDEX_ENTRY.size)
+                for i in range(count)]
+        else:
+            self.index = self._scan()
+            self.recovered = True
+            if not self.index:
+                raise ValueError(f'{path} has no index and no finished chunk')
+        self._frames = [entry[0] for entry in self.index]
+
+    def _scan(self):
+        """
+        Rebuilds the index by decompressing the chunks one after the other, up to the first
+        one that is cut off.
+
+        Returns:
+            list: The (frame, offset, length, generator chunk) entry of every finished chunk.
+        """
+        data = memoryview(self._data)
+        index = []
+        offset = _FILE_HEADER.size
+        rng_chunk = 0
+        while offset < self.size:
+            decompressor = zlib.decompressobj()
+            try:
+                chunk = decompressor.decompress(data[offset:])
+            except zlib.error:
+                break
+            if not decompressor.eof:
+                break
+            size, = _LENGTH.unpack_from(chunk)
+            keyframe = chunk[_LENGTH.size:_LENGTH.size + size]
+            if unpack_rng(keyframe) is not None:
+                rng_chunk = len(index)
+            length = self.size - offset - len(decompressor.unused_data)
+            index.append((unpack_frame(keyframe), offset, length, rng_chunk))
+            offset += length
+        return index
+
+    def chunk(self, i):
+        """
+        Decompresses and decodes a chunk.
+
+        Args:
+            i (int): The index of the chunk.
+
+        Returns:
+            tuple: The keyframe bytes, the events as (frame, type, key or position) tuples, the
+                   last frame of the chunk and the state hash on it.
+        """
+        _, offset, length, _ = self.index[i]
+        data = zlib.decompress(self._data[offset:offset + length])
+        size, = _LENGTH.unpack_from(data)
+        pos = _LENGTH.size + size
+        keyframe = data[_LENGTH.size:pos]
+        frame = self.index[i][0]
+        events = []
+        while True:
+            tag = data[pos]
+            delta, pos = _read_varint(data, pos + 1)
+            frame += delta
+            if tag == _END_TAG:
+                return keyframe, events, frame, data[pos:pos + 8].hex()
+            if _EVENT_TYPES[tag] == pygame.MOUSEBUTTONDOWN:
+                x, pos = _read_varint(data, pos)
+                y, pos = _read_varint(data, pos)
+                events.append((frame, pygame.MOUSEBUTTONDOWN, (x, y)))
+            else:
+                key, pos = _read_varint(data, pos)
+                events.append((frame, _EVENT_TYPES[tag], key))
+
+    def restore(self, game, i):
+        """
+        Restores the keyframe of a chunk, with the generator state from the chunk holding it.
+
+        Args:
+            game (AlienInvasion): The game to restore.
+            i (int): The index of the chunk.
+
+        Returns:
+            tuple: The events, the last frame and the state hash of the chunk, like `chunk`.
+        """
+        keyframe, events, last_frame, state_hash = self.chunk(i)
+        rng_chunk = self.index[i][3]
+        if rng_chunk != i:
+            game.rng.setstate(unpack_rng(self.chunk(rng_chunk)[0]))
+        unpack_state(game, keyframe)
+        game.state.skip_pauses = self.skip_pauses
+        return events, last_frame, state_hash
+
+    def seek(self, game, frame):
+        """
+        Brings a game to the state of a recorded frame, by restoring the nearest keyframe before
+        it and simulating the recorded input from there.
+
+        Args:
+            game (AlienInvasion): The game to bring to the frame.
+            frame (int): The frame to seek to.
+
+        Returns:
+            int: The frame reached, earlier than requested if the recording ends before it.
+        """
+        i = max(bisect.bisect_right(self._frames, frame) - 1, 0)
+        events, last_frame, _ = self.restore(game, i)
+        simulate(game, events, min(frame, last_frame))
+        return game.frame
+
+def simulate(game, events, last_frame):
+    """
+    Steps a game up to a frame, handling each recorded event before the step that followed it.
+
+    The quit key is not replayed, so the game always runs to the last frame.
+
+    Args:
+        game (AlienInvasion): The game to step.
+        events (list): The recorded events, as (frame, type, key or mouse position), from the
+            current frame on.
+        last_frame (int): The frame to stop at.
+
+    Returns:
+        bool: True if the frame was reached, False if the game stayed paused with no input left
+              to resume it.
+    """
+    index = 0
+    while game.frame < last_frame:
+        while index < len(events) and events[index][0] <= game.frame:
+            frame, event_type, value = events[index]
+            if not (event_type == pygame.KEYDOWN and value == pygame.K_q):
+                game._handle_event(to_event(event_type, value))
+            index += 1
+        frame = game.frame
+        game._update_game()
+        if game.frame == frame:
+            return False
+    return True
+
+def run_replay(recording):
+    """
+    Replays a recording headlessly and checks the state hash after every frame.
+
+    The quit key is not replayed, so the replay always runs to the last recorded frame.
+
+    Args:
+        recording (InputRecorder): The recording to replay.
+
+    Returns:
+        dict: The number of frames replayed, the first frame whose hash differs (None if
+              every frame matches), and the replay speed in frames per second.
+    """
+    from alien_invasion import AlienInvasion
+    game = AlienInvasion(headless=True, seed=recording.seed)
+    game.game_stats.hi_score = recording.hi_score
+    game.state.skip_pauses = recording.skip_pauses
+
+    events = [(frame, to_event(event_type, value)) for frame, event_type, value in recording.events
+        if not (event_type == pygame.KEYDOWN and value == pygame.K_q)]
+    last_frame = max(recording.hashes, default=0)
+    index = 0
+    mismatch = None
+    start = time.perf_counter()
+    while game.frame < last_frame:
+        while index < len(events) and events[index][0] <= game.frame:
+            game._handle_event(events[index][1])
+            index += 1
+        frame = game.frame
+        game._update_game()
+        if game.frame == frame:
+            # The game is paused and no recorded input resumes it
+            mismatch = frame + 1
+            break
+        if recording.hashes.get(game.frame) != game.state_hash():
+            mismatch = game.frame
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        'frames': game.frame,
+        'mismatch': mismatch,
+        'fps': game.frame / elapsed if elapsed else 0.0,
+    }
+
+def run_binary_replay(reader):
+    """
+    Replays a binary replay headlessly from its first keyframe, and checks the state hash at
+    the end of every chunk.
+
+    Args:
+        reader (ReplayReader): The replay to play.
+
+    Returns:
+        dict: The number of frames replayed, the first chunk end frame whose hash differs (None
+              if every chunk matches), the replay speed in frames per second, and the file size
+              in bytes, in total and per minute of play, and whether the index was rebuilt.
+    """
+    from alien_invasion import AlienInvasion
+    game = AlienInvasion(headless=True, seed=reader.seed)
+    mismatch = None
+    start = time.perf_counter()
+    for i in range(len(reader.index)):
+        if i == 0:
+            events, last_frame, state_hash = reader.restore(game, 0)
+        else:
+            _, events, last_frame, state_hash = reader.chunk(i)
+        if not simulate(game, events, last_frame) or game.state_hash() != state_hash:
+            mismatch = last_frame
+            break
+    elapsed = time.perf_counter() - start
+    minutes = game.frame / game.settings.sim_hz / 60
+    return {
+        'frames': game.frame,
+        'mismatch': mismatch,
+        'fps': game.frame / elapsed if elapsed else 0.0,
+        'bytes': reader.size,
+        'recovered': reader.recovered,
+        'bytes_per_minute': reader.size / minutes if minutes else None,
+    }
+
+def is_binary_replay(path):
+    """
+    Returns True if a file starts with the magic bytes of the binary replay format.
+    """
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def main(argv=None):
+    """
+    Replays a recording from the command line and reports whether it matched.
+
+    JSON recordings are checked frame by frame and binary replays chunk by chunk. With `--seek`,
+    a binary replay is only brought to the requested frame, and the time it took is reported.
+
+    Returns:
+        int: 0 if every frame matched the recording, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description='Replay an Alien Invasion input recording headlessly.')
+    parser.add_argument('recording', help='the JSON recording or binary replay written by the game')
+    parser.add_argument('--seek', type=int, metavar='FRAME', help='seek a binary replay to FRAME')
+    args = parser.parse_args(argv)
+
+    path = os.path.abspath(args.recording)
+    # The game loads its assets relative to its own directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    if not is_binary_replay(path):
+        result = run_replay(InputRecorder.load(path))
+    elif args.seek is None:
+        result = run_binary_replay(ReplayReader(path))
+    else:
+        from alien_invasion import AlienInvasion
+        reader = ReplayReader(path)
+        game = AlienInvasion(headless=True, seed=reader.seed)
+        start = time.perf_counter()
+        frame = reader.seek(game, args.seek)
+        result = {
+            'frame': frame,
+            'seek_ms': (time.perf_counter() - start) * 1000,
+            'state_hash': game.state_hash(),
+        }
+    print(json.dumps(result))
+    return 0 if result.get('mismatch') is None else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
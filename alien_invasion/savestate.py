@@ -0,0 +1,391 @@
+from pathlib import Path
+import os
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from game_state import MENU, PLAYING, RESPAWN_DELAY, LEVEL_TRANSITION, GAME_OVER
+
+# The states of the game machine, by their index in the encoded state
+STATES = (MENU, PLAYING, RESPAWN_DELAY, LEVEL_TRANSITION, GAME_OVER)
+
+# The settings `init_dynamic_settings` resets and `increase_difficulty` scales
+DYNAMIC_SETTINGS = ('ship_speed', 'ship_limit', 'bullet_speed', 'bullet_amount', 'fleet_speed', 'alien_points')
+
+# frame, state, timer, ship x, ship previous x, ship movement flags,
+# score, max score, high score, ships left, level
+_HEADER = struct.Struct('<IBIddBQQQHH')
+# A mask of the settings holding ints, then every setting as a double
+_SETTINGS = struct.Struct(f'<H{len(DYNAMIC_SETTINGS)}d')
+# The presence of the generator state, then its 625 words and gauss_next
+_RNG_FLAG = struct.Struct('<B')
+_RNG = struct.Struct('<625I?d')
+_COUNT = struct.Struct('<H')
+# x, y, direction, step_dx, step_dy and number of aliens of a formation
+_FORMATION = struct.Struct('<dibdiH')
+
+# The magic bytes and version of the save file format, bumped whenever the encoded state changes
+SAVE_MAGIC = b'AISV'
+SAVE_VERSION = 1
+# magic, version, CRC-32 of the compressed state
+_SAVE_HEADER = struct.Struct('<4sBI')
+
+def pack_state(game, include_rng=True):
+    """
+    Encodes the simulation state of a game into compact bytes.
+
+    The state covers the frame, the game state and its timer, the ship, the active bullets,
+    the formations and the local positions of their aliens, the dynamic settings, the stats
+    and, optionally, the state of the game's random generator. Images, sounds and the HUD are
+    left out, as they are rebuilt from the settings. The game isn't changed.
+
+    Args:
+        game (AlienInvasion): The game to encode.
+        include_rng (bool): Whether to include the random generator state, which takes 2.5 KB.
+
+    Returns:
+        bytes: The encoded state.
+    """
+    ship = game.ship
+    stats = game.game_stats
+    settings = game.settings
+    parts = [_HEADER.pack(game.frame, STATES.index(game.state.state), game.state.timer, ship.x,
+        ship.prev_x, ship.moving_left | ship.moving_right << 1, stats.score, stats.max_score,
+        stats.hi_score, stats.ships_left, stats.level)]
+
+    values = [getattr(settings, name) for name in DYNAMIC_SETTINGS]
+    int_mask = sum(1 << i for i, value in enumerate(values) if isinstance(value, int))
+    parts.append(_SETTINGS.pack(int_mask, *values))
+
+    if include_rng:
+        _, words, gauss_next = game.rng.getstate()
+        parts.append(_RNG_FLAG.pack(1))
+        parts.append(_RNG.pack(*words, gauss_next is not None, gauss_next or 0.0))
+    else:
+        parts.append(_RNG_FLAG.pack(0))
+
+    # Released bullets wait in the pool until the next compaction, so only keep the active ones
+    pool = game.bullets
+    active = [i for i in range(pool.count) if pool.bullets[i].active]
+    parts.append(_COUNT.pack(len(active)))
+    for values in (pool.x, pool.y, pool.prev_y):
+        parts.append(array('d', (values[i] for i in active)).tobytes())
+
+    formations = game.aliens.formations
+    parts.append(_COUNT.pack(len(formations)))
+    for formation in formations:
+        parts.append(_FORMATION.pack(formation.x, formation.y, formation.direction,
+            formation.step_dx, formation.step_dy, len(formation.aliens)))
+        parts.append(array('h', [coordinate for alien in formation.aliens
+            for coordinate in alien.local.topleft]).tobytes())
+    return b''.join(parts)
+
+def unpack_frame(data):
+    """
+    Reads the frame of an encoded state, without decoding the rest.
+
+    Args:
+        data (bytes): The encoded state.
+
+    Returns:
+        int: The simulation frame the state was encoded on.
+    """
+    return _HEADER.unpack_from(data)[0]
+
+def unpack_rng(data):
+    """
+    Reads the random generator state of an encoded state, without decoding the rest.
+
+    Args:
+        data (bytes): The encoded state.
+
+    Returns:
+        tuple: The state for `random.Random.setstate`, or None if it wasn't included.
+    """
+    offset = _HEADER.size + _SETTINGS.size
+    if not _RNG_FLAG.unpack_from(data, offset)[0]:
+        return None
+    *words, has_gauss, gauss_next = _RNG.unpack_from(data, offset + _RNG_FLAG.size)
+    return (3, tuple(words), gauss_next if has_gauss else None)
+
+def unpack_state(game, data):
+    """
+    Restores the simulation state of a game from the bytes of `pack_state`.
+
+    The whole state is decoded and checked before anything is applied, so invalid data leaves
+    the game as it was. The game must use the same screen and alien sizes as the encoded one.
+    When the encoded state has no random generator state, the game's generator is left as it is.
+
+    Args:
+        game (AlienInvasion): The game to restore.
+        data (bytes): The encoded state.
+
+    Raises:
+        ValueError: If the data is truncated, has trailing bytes, or holds an unknown game state
+                    or more bullets than the pool.
+    """
+    try:
+        state = _decode_state(data)
+    except struct.error as error:
+        raise ValueError(f'Invalid encoded game state: {error}') from error
+    if state['state'] >= len(STATES):
+        raise ValueError(f"Invalid encoded game state: unknown state {state['state']}")
+    if len(state['bullets']) > game.bullets.capacity:
+        raise ValueError(f"Invalid encoded game state: {len(state['bullets'])} bullets for a pool "
+            f'of {game.bullets.capacity}')
+    _apply_state(game, state)
+
+def _decode_state(data):
+    """
+    Decodes the bytes of `pack_state` into a dict, raising struct.error on truncated data.
+    """
+    (frame, state, timer, ship_x, ship_prev_x, moving, score, max_score, hi_score, ships_left,
+        level) = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    int_mask, *values = _SETTINGS.unpack_from(data, offset)
+    offset += _SETTINGS.size
+    rng_state = unpack_rng(data)
+    offset += _RNG_FLAG.size + (_RNG.size if rng_state else 0)
+    settings = {name: int(value) if int_mask & 1 << i else value
+        for i, (name, value) in enumerate(zip(DYNAMIC_SETTINGS, values))}
+
+    count, = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    columns = []
+    for _ in range(3):
+        column = array('d')
+        column.frombytes(_take(data, offset, 8 * count))
+        offset += 8 * count
+        columns.append(column)
+
+    formations = []
+    count, = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    for _ in range(count):
+        x, y, direction, step_dx, step_dy, aliens = _FORMATION.unpack_from(data, offset)
+        offset += _FORMATION.size
+        local = array('h')
+        local.frombytes(_take(data, offset, 4 * aliens))
+        offset += 4 * aliens
+        formations.append((x, y, direction, step_dx, step_dy, list(zip(local[::2], local[1::2]))))
+    if offset != len(data):
+        raise struct.error(f'{len(data) - offset} trailing bytes')
+
+    return {
+        'frame': frame, 'state': state, 'timer': timer,
+        'ship': (ship_x, ship_prev_x, bool(moving & 1), bool(moving & 2)),
+        'stats': (score, max_score, hi_score, ships_left, level),
+        'settings': settings, 'rng': rng_state,
+        'bullets': list(zip(*columns)), 'formations': formations,
+    }
+
+def _take(data, offset, size):
+    """
+    Returns `size` bytes of data from an offset, raising struct.error if there are fewer.
+    """
+    chunk = data[offset:offset + size]
+    if len(chunk) != size:
+        raise struct.error(f'expected {size} bytes at offset {offset}, got {len(chunk)}')
+    return chunk
+
+def _apply_state(game, state):
+    """
+    Applies a state decoded and checked by `unpack_state` to a game.
+    """
+    for name, value in state['settings'].items():
+        setattr(game.settings, name, value)
+    if state['rng']:
+        game.rng.setstate(state['rng'])
+
+    stats = game.game_stats
+    score, max_score, hi_score, ships_left, level = state['stats']
+    stats.score, stats.max_score, stats.ships_left, stats.level = score, max_score, ships_left, level
+    # Not encoded: every ship lost was taken from `ship_limit`, except the last one at game over
+    stats.ships_lost = game.settings.ship_limit - ships_left + (STATES[state['state']] == GAME_OVER)
+    # The high score on disk may have been beaten since the state was saved
+    stats.hi_score = max(stats.hi_score, hi_score)
+
+    ship = game.ship
+    ship.x, ship.prev_x, ship.moving_left, ship.moving_right = state['ship']
+    ship.rect.x = ship.x
+
+    pool = game.bullets
+    pool.empty()
+    for i, (x, y, prev_y) in enumerate(state['bullets']):
+        bullet = pool.bullets[i]
+        bullet.active = True
+        bullet.rect.x = x
+        bullet.rect.y = y
+        pool.x[i], pool.y[i], pool.prev_y[i] = x, y, prev_y
+    pool.count = len(state['bullets'])
+
+    fleet = game.aliens
+    fleet.clear()
+    for x, y, direction, step_dx, step_dy, positions in state['formations']:
+        formation = fleet.add_formation(x, y, positions, direction)
+        formation.step_dx, formation.step_dy = step_dx, step_dy
+
+    game.frame = state['frame']
+    machine = game.state
+    machine.enter(STATES[state['state']])
+    machine.timer = state['timer']
+    # Pauses finish through the game's transition methods, which can't be encoded
+    machine.on_expire = {RESPAWN_DELAY: game._respawn, LEVEL_TRANSITION: game._next_level}.get(
+        machine.state) if machine.timer > 0 else None
+
+    game.HUD.update_scores()
+    game.HUD._update_level()
+    if game.renderer:
+        game.renderer.invalidate()
+
+def encode_save(game):
+    """
+    Encodes the full state of a game into the bytes of a save file.
+
+    A save file is a header with the magic bytes, the format version and a CRC-32, followed by
+    the zlib-compressed `pack_state` bytes, random generator included.
+
+    Args:
+        game (AlienInvasion): The game to save.
+
+    Returns:
+        bytes: The contents of the save file.
+    """
+    payload = zlib.compress(pack_state(game))
+    return _SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION, zlib.crc32(payload)) + payload
+
+def load_save(game, path):
+    """
+    Restores a game from a save file, if there is one.
+
+    Args:
+        game (AlienInvasion): The game to restore.
+        path (str): The path of the save file.
+
+    Returns:
+        bool: True if the game was restored, False if there is no save file.
+
+    Raises:
+        ValueError: If the file isn't a valid save of the supported version.
+    """
+    try:
+        data = Path(path).read_bytes()
+    except FileNotFoundError:
+        return False
+    if len(data) < _SAVE_HEADER.size:
+        raise ValueError(f'{path} is too short to be a save file')
+    magic, version, checksum = _SAVE_HEADER.unpack_from(data)
+    if magic != SAVE_MAGIC:
+        raise ValueError(f'{path} is not a save file')
+    if version != SAVE_VERSION:
+        raise ValueError(f'{path} is a version {version} save, expected version {SAVE_VERSION}')
+    payload = data[_SAVE_HEADER.size:]
+    if zlib.crc32(payload) != checksum:
+        raise ValueError(f'{path} is corrupted')
+    unpack_state(game, zlib.decompress(payload))
+    return True
+
+class SaveWriter:
+    """
+    A class to write the save file in the background.
+
+    The game encodes its state on the main thread, which takes a fraction of a millisecond, and
+    hands the bytes to `save()`. The writer thread then writes the latest bytes, so the disk
+    write never stalls a frame. Like `ScoreWriter`, every write goes to a temporary file in the
+    same directory which is then renamed over the save file, so a crash can't leave a truncated
+    save.
+
+    Attributes:
+        path (Path): The path of the save file.
+        pending (bytes): The save waiting to be written, or None when everything is written.
+        writes (int): The number of times the save file was written.
+        thread (threading.Thread): The background writer thread, started on the first save.
+    """
+
+    def __init__(self, path) -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            path (str): The path of the save file.
+        """
+        self.path = Path(path)
+        self.pending = None
+        self.writes = 0
+        self.thread = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+    def save(self, data):
+        """
+        Schedules a save to be written, replacing any save not written yet.
+
+        Args:
+            data (bytes): The contents of the save file, from `encode_save`.
+        """
+        with self._lock:
+            self.pending = data
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='SaveWriter', daemon=True)
+            self.thread.start()
+        self._wake.set()
+
+    def discard(self):
+        """
+        Drops the pending save and deletes the save file, once the game it holds has ended.
+        """
+        with self._write_lock:
+            with self._lock:
+                self.pending = None
+            self.path.unlink(missing_ok=True)
+
+    def flush(self):
+        """
+        Writes the pending save now, if there is one.
+        """
+        with self._write_lock:
+            with self._lock:
+                data, self.pending = self.pending, None
+            if data is not None:
+                self._write(data)
+
+    def close(self):
+        """
+        Writes the pending save and stops the writer thread.
+        """
+        self._closed = True
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def _run(self):
+        """
+        Waits for saves and writes the latest one.
+        """
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            self.flush()
+
+    def _write(self, data):
+        """
+        Writes a save atomically through a temporary file renamed over the save file.
+
+        Args:
+            data (bytes): The contents of the save file.
+        """
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.writes += 1
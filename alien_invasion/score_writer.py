@@ -0,0 +1,123 @@
+from pathlib import Path
+import json
+import os
+import tempfile
+import threading
+
+class ScoreWriter:
+    """
+    A class to write the scores file in the background, coalescing frequent updates.
+
+    `GameStats` hands every new set of scores to `save()`, which only stores them and wakes the
+    writer thread. The thread waits `delay` seconds for the updates to settle, then writes the
+    latest scores once, so a run of new records costs a single write. `flush()` writes the
+    pending scores immediately and is called at safe points (level end, game over, quit).
+    `request_flush()` has the writer thread write them without waiting for the settling delay,
+    for callers that must not block on the disk.
+
+    Every write goes to a temporary file in the same directory which is then renamed over the
+    scores file, so a crash in the middle of a write can't leave a truncated `scores.json`.
+
+    Attributes:
+        path (Path): The path of the scores file.
+        delay (float): The number of seconds the thread waits for more updates before writing.
+        pending (dict): The scores waiting to be written, or None when everything is written.
+        writes (int): The number of times the scores file was written.
+        thread (threading.Thread): The background writer thread, started on the first save.
+    """
+
+    def __init__(self, path, delay=2.0) -> None:
+        """
+        Initializes the writer.
+
+        Args:
+            path (str): The path of the scores file.
+            delay (float): The number of seconds to wait for more updates before writing.
+        """
+        self.path = Path(path)
+        self.delay = delay
+        self.pending = None
+        self.writes = 0
+        self.thread = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._urgent = False
+        self._closed = False
+
+    def save(self, scores):
+        """
+        Schedules the scores to be written, replacing any scores not written yet.
+
+        Args:
+            scores (dict): The scores to write.
+        """
+        with self._lock:
+            self.pending = dict(scores)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='ScoreWriter', daemon=True)
+            self.thread.start()
+        self._wake.set()
+
+    def flush(self):
+        """
+        Writes the pending scores now, if there are any.
+        """
+        with self._write_lock:
+            with self._lock:
+                scores, self.pending = self.pending, None
+            if scores is not None:
+                self._write(scores)
+
+    def request_flush(self):
+        """
+        Has the writer thread write the pending scores now, without waiting for the write.
+        """
+        if self.thread is None:
+            # Nothing was ever saved
+            return
+        self._urgent = True
+        self._wake.set()
+
+    def close(self):
+        """
+        Writes the pending scores and stops the writer thread.
+        """
+        self._closed = True
+        self._wake.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.flush()
+
+    def _run(self):
+        """
+        Waits for updates, lets them settle for `delay` seconds and writes the latest scores.
+        """
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            # Keep waiting while new updates come in, unless a flush was requested
+            while not self._closed and not self._urgent and self._wake.wait(self.delay):
+                self._wake.clear()
+            self._urgent = False
+            self.flush()
+
+    def _write(self, scores):
+        """
+        Writes the scores atomically through a temporary file renamed over the scores file.
+
+        Args:
+            scores (dict): The scores to write.
+        """
+        contents = json.dumps(scores, indent=4)
+        fd, temp_path = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(contents)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.writes += 1
@@ -11,12 +11,35 @@ class Settings:
         screen_h (int): The height of the game screen.
         title (str): The title of the game.
         FPS (int): Frames per second for the game.
+        sim_hz (int): Simulation steps per second, independent of the rendered frames per second.
+        speed_hz (int): The step rate the speeds are given for; at other `sim_hz` rates they are scaled
+            by `per_step` so the game plays the same.
+        max_sim_steps (int): The maximum number of simulation steps run to catch up in one frame.
+        threaded_sim (bool): Whether the simulation runs on its own thread, apart from rendering.
+        respawn_delay (float): The seconds the game pauses after the ship is hit, before the fleet respawns.
+        level_transition_delay (float): The seconds the game pauses after a wave is cleared, before the next one.
+        render_mode (str): 'full' to redraw the whole screen every frame, or 'dirty' to only redraw changed regions.
+        profiler_enabled (bool): Whether the frame profiler records timings from the start.
+        profiler_window (int): The number of frames kept by the profiler for its statistics.
+        profiler_dump_interval (int): The number of frames between two dumps of the profiler, 0 to never dump.
+        profiler_overlay_interval (int): The number of frames between two refreshes of the profiler overlay.
+        profiler_file (str): The file path of the JSONL file the profiler dumps to.
+        profiler_font_size (int): The font size of the profiler overlay.
+        seed (int): The seed of the game's random generator, None to pick a random seed.
+        record_file (str): The file path the input recording is written to on quit, None to not record.
+        replay_file (str): The file path the binary replay is streamed to, None to not record one.
+        replay_keyframe_interval (int): The number of simulation frames between two keyframes of the binary replay.
         bg_file (str): The file path to the background image (from opengameart.com).
         background_sound (str): The file path to the background music (from opengameart.com).
         icon (str): The file path to the game icon (from opengameart.com).
         difficulty_scale (float): The factor by which game difficulty increases over time.
         scores_file (str): The file path to the scores file (in JSON format).
+        scores_write_delay (float): The number of seconds the scores writer waits for updates to settle before writing.
+        save_file (str): The file path the game in progress is saved to on quit and resumed from on launch, None to not save.
         life_image (str): The file path to the image used for displaying remaining lives (from opengameart.com).
+        asset_cache_size (int): The maximum number of image surfaces kept in the asset cache.
+        preload_workers (int): The number of threads decoding images and sounds at startup.
+        asset_pixel_format (str): How loaded images are converted to the display format: 'auto', 'opaque', 'alpha', 'colorkey' or 'source'.
         
         # Ship settings
         ship_file (str): The file path to the ship image (from opengameart.com).
@@ -25,14 +48,20 @@ class Settings:
 
         # Bullet settings
         bullet_file (str): The file path to the bullet image (from opengameart.com).
+        bullet_pool_size (int): The number of bullets preallocated in the bullet pool.
         laser_sound (str): The file path to the laser sound effect (from opengameart.com).
         impact_sound (str): The file path to the impact sound effect (from opengameart.com).
+        sound_channels (dict): The number of mixer channels reserved for each sound category. The sounds of
+            a category share its channels and compete for them by priority.
 
         # Alien settings
         alien_file (str): The file path to the alien image (from opengameart.com).
 
         # Fleet settings
         fleet_drop_amount (int): The amount the alien fleet drops each time.
+        fleet_backend (str): The fleet implementation, 'sprite' or the NumPy based 'array'.
+        fleet_pattern (str): The pattern of each wave: 'snowflake', 'grid', 'zigzag', 'triangle' or 'random'.
+        collision_cell_size (int): The cell size of the fleet's collision grid.
 
         # Button settings
         button_w (int): The width of the buttons.
@@ -43,6 +72,7 @@ class Settings:
         text_color (tuple): The RGB color for text in the HUD.
         button_font_size (int): The font size for button text.
         HUD_font_size (int): The font size for the HUD.
+        HUD_text_mode (str): 'font' to render the HUD values with the font, or 'atlas' to lay them out from pre-rendered glyphs.
         font_file (str): The file path to the main game font.
         title_font (str): The file path to the title screen font.
         dialog_font (str): The file path to the dialog font.
@@ -70,26 +100,54 @@ class Settings:
             screen_h (int): Screen height (800).
             title (str): Game title ('Alien Invasion').
             FPS (int): Frames per second (60).
+            sim_hz (int): Simulation steps per second (60).
+            speed_hz (int): Step rate the speeds are given for (60).
+            max_sim_steps (int): Maximum catch-up simulation steps per frame (5).
+            threaded_sim (bool): Simulation on its own thread (False).
+            respawn_delay (float): Pause after the ship is hit, in seconds (0.5).
+            level_transition_delay (float): Pause between waves, in seconds (0.5).
+            render_mode (str): Screen rendering mode ('full').
+            profiler_enabled (bool): Profiler enabled at startup (False).
+            profiler_window (int): Frames kept for profiler statistics (300).
+            profiler_dump_interval (int): Frames between profiler dumps (600).
+            profiler_overlay_interval (int): Frames between overlay refreshes (30).
+            profiler_file (str): Path to the profiler JSONL file.
+            profiler_font_size (int): Profiler overlay font size (18).
+            seed (int): Random generator seed (None, random).
+            record_file (str): Input recording path (None, not recording).
+            replay_file (str): Binary replay path (None, not recording).
+            replay_keyframe_interval (int): Frames between replay keyframes (600).
             bg_file (str): Path to the background image from opengameart.com.
             background_sound (str): Path to background music from opengameart.com.
             icon (str): Game icon path from opengameart.com.
             difficulty_scale (float): Difficulty scaling factor (1.4).
             scores_file (str): Path to scores file.
+            scores_write_delay (float): Seconds before pending scores are written (2.0).
+            save_file (str): Path to the save file.
             life_image (str): Path to life image from opengameart.com.
+            asset_cache_size (int): Maximum number of cached image surfaces (64).
+            preload_workers (int): Startup decoding threads (4).
+            asset_pixel_format (str): Image pixel format conversion ('auto').
             ship_file (str): Path to ship image from opengameart.com.
             ship_w (int): Ship width (40).
             ship_h (int): Ship height (60).
             bullet_file (str): Bullet image path from opengameart.com.
+            bullet_pool_size (int): Number of preallocated bullets (64).
             laser_sound (str): Laser sound effect path from opengameart.com.
             impact_sound (str): Impact sound effect path from opengameart.com.
+            sound_channels (dict): Reserved channels per sound category (sfx 6, shared by the laser and impact).
             alien_file (str): Alien image path from opengameart.com.
             fleet_drop_amount (int): Amount the alien fleet drops (10).
+            fleet_backend (str): Fleet implementation ('sprite').
+            fleet_pattern (str): Wave pattern ('snowflake').
+            collision_cell_size (int): Collision grid cell size (80).
             button_w (int): Button width (200).
             button_h (int): Button height (50).
             button_color (tuple): Button color (0,135,50).
             text_color (tuple): Text color (255,255,255).
             button_font_size (int): Button font size (35).
             HUD_font_size (int): HUD font size (20).
+            HUD_text_mode (str): HUD value rendering mode ('font').
             font_file (str): Path to main font.
             title_font (str): Title screen font.
             dialog_font (str): Dialog font.
@@ -100,28 +158,55 @@ class Settings:
         self.screen_h = 800
         self.title = 'Alien Invasion'
         self.FPS = 60
-        self.bg_file = 'Assets\images\Starset.png'  
-        self.background_sound = 'Assets\sound\ObservingTheStar.ogg'  
-        self.icon = 'Assets\images\shuttle.png'  
+        self.sim_hz = 60
+        self.speed_hz = 60
+        self.max_sim_steps = 5
+        self.threaded_sim = False
+        self.respawn_delay = 0.5
+        self.level_transition_delay = 0.5
+        self.render_mode = 'full'
+        self.profiler_enabled = False
+        self.profiler_window = 300
+        self.profiler_dump_interval = 600
+        self.profiler_overlay_interval = 30
+        self.profiler_file = 'profile.jsonl'
+        self.profiler_font_size = 18
+        self.seed = None
+        self.record_file = None
+        self.replay_file = None
+        self.replay_keyframe_interval = 600
+        self.bg_file = 'Assets/images/Starset.png'  
+        self.background_sound = 'Assets/sound/ObservingTheStar.ogg'  
+        self.icon = 'Assets/images/shuttle.png'  
         self.difficulty_scale = 1.4
-        self.scores_file = r'Assets\file\scores.json'
-        self.life_image = "Assets\images\heart.png"  
+        self.scores_file = r'Assets/file/scores.json'
+        self.scores_write_delay = 2.0
+        self.save_file = r'Assets/file/savestate.bin'
+        self.life_image = "Assets/images/heart.png"  
+        self.asset_cache_size = 64
+        self.asset_pixel_format = 'auto'
+        self.preload_workers = 4
 
         # Ship settings
-        self.ship_file = 'Assets\images\shuttle.png'  
+        self.ship_file = 'Assets/images/shuttle.png'  
         self.ship_w = 40
         self.ship_h = 60
 
         # Bullet settings
-        self.bullet_file = 'Assets\images\laserBlast.png'  
-        self.laser_sound = "Assets\sound\laser.mp3"  
-        self.impact_sound = "Assets\sound\impactSound.mp3"  
+        self.bullet_file = 'Assets/images/laserBlast.png'  
+        self.bullet_pool_size = 64
+        self.laser_sound = "Assets/sound/laser.mp3"  
+        self.impact_sound = "Assets/sound/impactSound.mp3"  
+        self.sound_channels = {'sfx': 6}
 
         # Alien settings
-        self.alien_file = r"Assets\images\tomatohead1cut.png"  
+        self.alien_file = r"Assets/images/tomatohead1cut.png"  
 
         # Fleet settings
         self.fleet_drop_amount = 10
+        self.fleet_backend = 'sprite'
+        self.fleet_pattern = 'snowflake'
+        self.collision_cell_size = 80
 
         # Button settings
         self.button_w = 200
@@ -132,10 +217,11 @@ class Settings:
         self.text_color = (255, 255, 255)
         self.button_font_size = 35
         self.HUD_font_size = 20
-        self.font_file = r"Assets\fonts\Silkscreen-Bold.ttf"
+        self.HUD_text_mode = 'font'
+        self.font_file = r"Assets/fonts/Silkscreen-Bold.ttf"
         self.init_dynamic_settings()
-        self.title_font = r"Assets\fonts\Press_Start_2P\PressStart2P-Regular.ttf"
-        self.dialog_font = r"Assets\fonts\VT323\VT323-Regular.ttf"
+        self.title_font = r"Assets/fonts/Press_Start_2P/PressStart2P-Regular.ttf"
+        self.dialog_font = r"Assets/fonts/VT323/VT323-Regular.ttf"
 
     def init_dynamic_settings(self):
         """
@@ -145,15 +231,15 @@ class Settings:
         bullets that can be fired and the points for each alien. These values are the starting values for the game.
 
         Attributes initialized:
-            ship_speed (float): Speed of the ship (4).
+            ship_speed (float): Speed of the ship, in pixels per step at `speed_hz` (4).
             ship_limit (int): Number of ships the player can have (3).
-            bullet_speed (float): Speed of the bullets (7).
+            bullet_speed (float): Speed of the bullets, in pixels per step at `speed_hz` (7).
             bullet_w (int): Bullet width (25).
             bullet_h (int): Bullet height (45).
             bullet_amount (int): Number of bullets the player can fire (5).
             alien_w (int): Alien width (40).
             alien_h (int): Alien height (40).
-            fleet_speed (float): Speed of the alien fleet (1).
+            fleet_speed (float): Speed of the alien fleet, in pixels per step at `speed_hz` (1).
             alien_points (int): Points earned for destroying an alien (10).
         """
         self.ship_speed = 4
@@ -186,3 +272,16 @@ class Settings:
         self.bullet_speed *= self.difficulty_scale
         self.fleet_speed *= self.difficulty_scale
         self.alien_points = int(self.alien_points * self.difficulty_scale)
+
+    def per_step(self, speed):
+        """
+        Converts a speed given for `speed_hz` steps per second to the distance moved in one
+        simulation step, so the game plays at the same pace whatever `sim_hz` is.
+
+        Args:
+            speed (float): The speed, in pixels per step at `speed_hz`.
+
+        Returns:
+            float: The distance moved in one step at `sim_hz`.
+        """
+        return speed * self.speed_hz / self.sim_hz
@@ -1,5 +1,3 @@
-import pygame
-
 class Ship:
     """
     A class to manage the player's ship.
@@ -14,6 +12,7 @@ class Ship:
         image (Surface): The Pygame surface representing the ship's visual appearance.
         rect (Rect): The Pygame rect representing the ship's position and size.
         x (float): The horizontal position of the ship, used for smooth movement.
+        prev_x (float): The horizontal position of the ship before the last simulation step, used for interpolation.
         moving_left (bool): Flag indicating if the ship is moving left.
         moving_right (bool): Flag indicating if the ship is moving right.
     """
@@ -30,9 +29,8 @@ class Ship:
         self.screen = game.screen
         self.boundaries = game.screen.get_rect()
         
-        # Load and scale the ship image
-        self.image = pygame.image.load(self.game.settings.ship_file)
-        self.image = pygame.transform.scale(self.image, 
+        # Get the scaled ship image from the asset cache
+        self.image = game.assets.get_image(self.settings.ship_file,
             (self.settings.ship_w, self.settings.ship_h))
         self.rect = self.image.get_rect()
         
@@ -51,7 +49,8 @@ class Ship:
         The ship moves left or right depending on the state of the movement flags
         and the boundaries of the screen. The position is updated every frame.
         """
-        temp_speed = self.game.settings.ship_speed
+        temp_speed = self.game.settings.per_step(self.game.settings.ship_speed)
+        self.prev_x = self.x
         
         # Check if the ship is moving right and within screen bounds
         if self.moving_right and self.rect.right < self.boundaries.right:
@@ -64,13 +63,21 @@ class Ship:
         # Update the rect with the new position
         self.rect.x = self.x
 
-    def draw(self):
+    def draw(self, alpha=1.0):
         """
         Draws the ship on the screen.
 
-        This method is called each frame to render the ship at its current position.
+        This method is called each frame to render the ship between its previous and
+        current position.
+
+        Args:
+            alpha (float): The interpolation factor between the previous (0) and current (1) position.
         """
-        self.screen.blit(self.image, self.rect)
+        if alpha >= 1.0 or self.prev_x == self.x:
+            self.screen.blit(self.image, self.rect)
+            return
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.screen.blit(self.image, (round(x), self.rect.y))
 
     def ship_hit(self):
         """
@@ -88,3 +95,4 @@ class Ship:
         """
         self.rect.midbottom = self.boundaries.midbottom
         self.x = float(self.rect.x)
+        self.prev_x = self.x
@@ -0,0 +1,343 @@
+import argparse
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+class GameSnapshot:
+    """
+    An immutable copy of everything the renderer needs from one simulation step.
+
+    Snapshots hold plain values and tuples, plus references to the shared images and to the
+    aliens' local rects, which never change once an alien is created. The renderer can draw
+    a snapshot while the simulation thread keeps mutating the game.
+
+    Attributes:
+        frame (int): The simulation frame the snapshot was taken after.
+        time (float): The `time.perf_counter()` value when the snapshot was taken.
+        ship (tuple): The ship's float x, previous x and rect position.
+        bullets (tuple): The rect position, previous y and float y of every active bullet.
+        formations (tuple): The (image, offset, step_dx, step_dy, local rects) of every formation.
+        hud (tuple): The text fields and number of lives shown by the HUD, from `HUD.state()`.
+        game_active (bool): Whether the game was active.
+        game_over (bool): Whether the game was over.
+    """
+    __slots__ = ('frame', 'time', 'ship', 'bullets', 'formations', 'hud', 'game_active', 'game_over')
+
+    def __init__(self, game) -> None:
+        """
+        Copies the drawable state of a game.
+
+        Args:
+            game (AlienInvasion): The game to copy, which must not be updated meanwhile.
+        """
+        ship = game.ship
+        pool = game.bullets
+        active = pool.sprites()
+        self.frame = game.frame
+        self.time = time.perf_counter()
+        self.ship = (ship.x, ship.prev_x, ship.rect.topleft)
+        self.bullets = tuple((bullet.rect.topleft, pool.prev_y[i], pool.y[i])
+            for i, bullet in enumerate(active))
+        self.formations = tuple((formation.image, formation.offset, formation.step_dx,
+            formation.step_dy, tuple(alien.local for alien in formation.aliens))
+            for formation in game.aliens.formations)
+        self.hud = game.HUD.state()
+        self.game_active = game.game_active
+        self.game_over = game.game_over
+
+    def draw(self, game, alpha=1.0):
+        """
+        Draws the bullets, the ship and the fleet of the snapshot, between their previous and
+        current position, like the entities' own draw methods do.
+
+        Args:
+            game (AlienInvasion): The game providing the screen and the images.
+            alpha (float): The interpolation factor between the previous (0) and current (1) position.
+        """
+        screen = game.screen
+        image = game.bullets.image
+        if alpha >= 1.0:
+            screen.blits([(image, topleft) for topleft, _, _ in self.bullets], False)
+        else:
+            screen.blits([(image, (topleft[0], round(prev_y + (y - prev_y) * alpha)))
+                for topleft, prev_y, y in self.bullets], False)
+
+        x, prev_x, topleft = self.ship
+        if alpha < 1.0 and prev_x != x:
+            topleft = (round(prev_x + (x - prev_x) * alpha), topleft[1])
+        screen.blit(game.ship.image, topleft)
+
+        back = 1.0 - alpha
+        blits = []
+        for image, (dx, dy), step_dx, step_dy, rects in self.formations:
+            if back > 0:
+                dx += round(-step_dx * back)
+                dy += round(-step_dy * back)
+            blits.extend((image, rect.move(dx, dy)) for rect in rects)
+        screen.blits(blits, False)
+
+class DoubleBuffer:
+    """
+    A pair of slots the simulation thread publishes snapshots into and the renderer reads from.
+
+    The writer fills the back slot and then flips which slot is the front, so a reader always
+    gets a complete snapshot and never waits for a step to finish.
+
+    Attributes:
+        slots (list): The two snapshot slots.
+        front (int): The index of the slot holding the latest snapshot.
+    """
+
+    def __init__(self, snapshot) -> None:
+        """
+        Initializes both slots with a first snapshot.
+
+        Args:
+            snapshot (GameSnapshot): The snapshot of the initial state.
+        """
+        self.slots = [snapshot, snapshot]
+        self.front = 0
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot):
+        """
+        Writes a snapshot into the back slot and makes it the front one.
+
+        Args:
+            snapshot (GameSnapshot): The new snapshot.
+        """
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self._lock:
+            self.front = back
+
+    def latest(self):
+        """
+        Returns the latest published snapshot.
+        """
+        with self._lock:
+            return self.slots[self.front]
+
+class SimulationThread(threading.Thread):
+    """
+    A thread running the game simulation at a fixed `sim_hz` rate, apart from rendering.
+
+    Each step handles the input events posted by the main thread, then updates the ship, bullets,
+    fleet, collisions and stats while holding the game's `sim_lock`, and publishes a snapshot.
+    The sounds requested during the step are passed back through a queue. The main thread never
+    takes the lock: it posts the events, plays the sounds and renders from the latest snapshot,
+    so a slow present no longer delays the simulation and a slow step, such as one writing to
+    disk, no longer delays a frame. Like the single threaded loop, at most `max_sim_steps` steps
+    are run to catch up after a stall.
+
+    Attributes:
+        game (AlienInvasion): The game to simulate.
+        buffer (DoubleBuffer): The buffer the snapshots are published into.
+        events (queue.SimpleQueue): The input events waiting to be handled by the next step.
+        sounds (queue.SimpleQueue): The sound requests of each step, waiting to be played.
+        running (bool): Whether the thread keeps stepping the simulation.
+    """
+
+    def __init__(self, game) -> None:
+        """
+        Initializes the thread and publishes a snapshot of the current state.
+
+        Args:
+            game (AlienInvasion): The game to simulate.
+        """
+        super().__init__(name='simulation', daemon=True)
+        self.game = game
+        with game.sim_lock:
+            self.buffer = DoubleBuffer(GameSnapshot(game))
+        self.events = queue.SimpleQueue()
+        self.sounds = queue.SimpleQueue()
+        self.running = True
+
+    def run(self):
+        """
+        Steps the simulation on a fixed timestep until stopped.
+        """
+        game = self.game
+        sim_step = 1 / game.settings.sim_hz
+        max_lag = game.settings.max_sim_steps * sim_step
+        next_step = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < next_step:
+                time.sleep(next_step - now)
+                continue
+            if now - next_step > max_lag:
+                # Drop the time that could not be caught up
+                next_step = now
+            with game.profiler.phase('sim'), game.sim_lock:
+                if not self.running:
+                    # Stopped while waiting for the lock
+                    break
+                self.handle_events()
+                game._update_game()
+                snapshot = GameSnapshot(game)
+                sounds = game.audio.take_requests()
+            if sounds:
+                self.sounds.put(sounds)
+            self.buffer.publish(snapshot)
+            next_step += sim_step
+
+    def post(self, event):
+        """
+        Queues an input event to be handled at the start of the next step.
+
+        Args:
+            event (pygame.event.Event): The event.
+        """
+        self.events.put(event)
+
+    def handle_events(self):
+        """
+        Handles the queued input events, in the order they were posted. Called by the thread
+        before each step, and by the main thread once the thread is stopped.
+        """
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            self.game._handle_event(event)
+
+    def play_sounds(self):
+        """
+        Plays the sounds requested by the steps run since the last call, once each.
+        """
+        requests = {}
+        while True:
+            try:
+                step_requests = self.sounds.get_nowait()
+            except queue.Empty:
+                break
+            for name, count in step_requests.items():
+                requests[name] = requests.get(name, 0) + count
+        self.game.audio.flush(requests)
+
+    def latest(self):
+        """
+        Returns the latest snapshot and how far the render time is into the next step.
+
+        Returns:
+            tuple: The snapshot and the interpolation factor, between 0 and 1.
+        """
+        snapshot = self.buffer.latest()
+        alpha = (time.perf_counter() - snapshot.time) * self.game.settings.sim_hz
+        return snapshot, min(alpha, 1.0)
+
+    def stop(self):
+        """
+        Stops the thread and waits for its current step to finish.
+        """
+        self.running = False
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+def _stats(intervals):
+    """
+    Returns the mean, standard deviation and maximum of a list of intervals, in milliseconds.
+    """
+    ms = [interval * 1000 for interval in intervals]
+    return {
+        'mean_ms': statistics.fmean(ms),
+        'stdev_ms': statistics.pstdev(ms),
+        'max_ms': max(ms),
+    }
+
+def measure(threaded, frames, stall_ms, stall_every, stall='both'):
+    """
+    Runs the windowed game on the SDL dummy drivers and measures the regularity of the rendered
+    frames and of the simulation steps.
+
+    Every `stall_every` frames the present stalls for `stall_ms`, like a slow `display.flip`, and
+    every `stall_every` simulation steps the step stalls as long, like a slow disk write. `stall`
+    limits the stalls to the frames or to the steps, to see how each affects the other.
+
+    Args:
+        threaded (bool): Whether to run the simulation on its own thread.
+        frames (int): The number of frames to render.
+        stall_ms (float): The duration of each injected stall.
+        stall_every (int): The number of frames or steps between two stalls.
+        stall (str): Where the stalls are injected: 'frame', 'sim' or 'both'.
+
+    Returns:
+        dict: The statistics of the frame times and of the intervals between simulation steps.
+    """
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    from alien_invasion import AlienInvasion
+    # The benchmark must not touch the player's save file and high score
+    game = AlienInvasion(seed=0, persist=False)
+    game.settings.threaded_sim = threaded
+    game.restart_game()
+
+    frame_times = []
+    step_times = []
+    update_screen = game._update_screen
+    update_game = game._update_game
+    check_events = game._check_events
+
+    def timed_update_screen(*args):
+        update_screen(*args)
+        if stall != 'sim' and len(frame_times) % stall_every == 0:
+            time.sleep(stall_ms / 1000)
+        frame_times.append(time.perf_counter())
+
+    def timed_update_game():
+        # Keep the game playing for the whole measurement
+        if not game.game_active:
+            game.restart_game()
+        update_game()
+        if stall != 'frame' and len(step_times) % stall_every == 0:
+            time.sleep(stall_ms / 1000)
+        step_times.append(time.perf_counter())
+
+    def limited_check_events():
+        check_events()
+        if len(frame_times) >= frames:
+            game.running = False
+
+    game._update_screen = timed_update_screen
+    game._update_game = timed_update_game
+    game._check_events = limited_check_events
+    game.run_game()
+    if game.sim_thread:
+        game.sim_thread.stop()
+
+    # Skip the first frames, which include the startup
+    frame_intervals = [b - a for a, b in zip(frame_times[10:], frame_times[11:])]
+    step_intervals = [b - a for a, b in zip(step_times[10:], step_times[11:])]
+    return {
+        'threaded': threaded,
+        'frames': _stats(frame_intervals),
+        'sim_steps': _stats(step_intervals),
+    }
+
+def main(argv=None):
+    """
+    Measures the frame time and simulation step variance with and without the simulation
+    thread, and prints the results as JSON lines.
+    """
+    parser = argparse.ArgumentParser(description='Compare the single threaded and threaded game loops.')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--stall-ms', type=float, default=25.0, help='duration of the injected stalls')
+    parser.add_argument('--stall-every', type=int, default=20, help='frames or steps between two stalls')
+    parser.add_argument('--stall', choices=('both', 'frame', 'sim'), default='both',
+        help='stall the frames, the simulation steps or both')
+    args = parser.parse_args(argv)
+
+    # The game loads its assets relative to its own directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    for threaded in (False, True):
+        print(json.dumps(measure(threaded, args.frames, args.stall_ms, args.stall_every, args.stall)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+class SpatialHash:
+    """
+    A uniform grid that indexes sprites by the cells their rects overlap.
+
+    Collision checks query the grid with a rect and only test the sprites stored in the
+    cells that rect covers, instead of every sprite in a group.
+
+    Attributes:
+        cell_size (int): The width and height of a grid cell in pixels.
+        cells (dict): The sprites stored in each cell, keyed by (column, row).
+        items (dict): The cells and insertion order of each indexed sprite.
+        rect_attr (str): The name of the sprite attribute holding the rect that is indexed.
+    """
+
+    def __init__(self, cell_size, rect_attr='rect') -> None:
+        """
+        Initializes an empty spatial hash.
+
+        Args:
+            cell_size (int): The width and height of a grid cell in pixels.
+            rect_attr (str): The name of the sprite attribute holding the rect to index.
+        """
+        self.cell_size = cell_size
+        self.rect_attr = rect_attr
+        self.cells = {}
+        self.items = {}
+        self._order = 0
+
+    def __len__(self):
+        """
+        Returns the number of indexed sprites.
+        """
+        return len(self.items)
+
+    def _cells_for(self, rect):
+        """
+        Returns the keys of every cell overlapped by a rect.
+
+        Args:
+            rect (pygame.Rect): The rect to look up.
+
+        Returns:
+            list: The (column, row) keys of the overlapped cells.
+        """
+        size = self.cell_size
+        columns = range(rect.left // size, (rect.right - 1) // size + 1)
+        rows = range(rect.top // size, (rect.bottom - 1) // size + 1)
+        return [(column, row) for column in columns for row in rows]
+
+    def clear(self):
+        """
+        Removes every sprite from the grid.
+        """
+        self.cells.clear()
+        self.items.clear()
+        self._order = 0
+
+    def insert(self, sprite):
+        """
+        Adds a sprite to every cell overlapped by its rect.
+
+        Args:
+            sprite (pygame.sprite.Sprite): The sprite to index.
+        """
+        keys = self._cells_for(getattr(sprite, self.rect_attr))
+        for key in keys:
+            self.cells.setdefault(key, []).append(sprite)
+        self.items[sprite] = (keys, self._order)
+        self._order += 1
+
+    def remove(self, sprite):
+        """
+        Removes a sprite from the grid.
+
+        Args:
+            sprite (pygame.sprite.Sprite): The sprite to remove.
+        """
+        keys, _ = self.items.pop(sprite)
+        for key in keys:
+            self.cells[key].remove(sprite)
+
+    def rebuild(self, sprites):
+        """
+        Clears the grid and indexes every sprite again, keeping their iteration order.
+
+        Args:
+            sprites (iterable): The sprites to index.
+        """
+        self.clear()
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def query(self, rect):
+        """
+        Returns the sprites stored in the cells overlapped by a rect.
+
+        The sprites are returned in the order they were inserted, so the result
+        matches the order of the group the grid was built from.
+
+        Args:
+            rect (pygame.Rect): The rect to look up.
+
+        Returns:
+            list: The candidate sprites that may collide with the rect.
+        """
+        found = set()
+        for key in self._cells_for(rect):
+            cell = self.cells.get(key)
+            if cell:
+                found.update(cell)
+        if len(found) > 1:
+            items = self.items
+            return sorted(found, key=lambda sprite: items[sprite][1])
+        return list(found)
@@ -0,0 +1,18 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+GAME_DIR = Path(__file__).resolve().parent.parent
+# The game modules import each other as top-level modules and load the assets relative to the game directory
+sys.path.insert(0, str(GAME_DIR))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    """
+    Runs every test from the game directory, where the assets are found.
+    """
+    monkeypatch.chdir(GAME_DIR)
@@ -0,0 +1,42 @@
+import random
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from replay import ReplayReader, ReplayWriter
+
+def record_replay(path, frames, keyframe_interval):
+    """
+    Records a game driven by random input events into a binary replay.
+
+    Returns:
+        dict: The state hash of the recorded game after every frame.
+    """
+    game = AlienInvasion(headless=True, seed=123)
+    writer = game.replay_writer = ReplayWriter(game, path, keyframe_interval)
+    play_button = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=game.play_button.rect.center, button=1)
+    game._handle_event(play_button)
+    rng = random.Random(5)
+    keys = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SPACE]
+    hashes = {}
+    while game.frame < frames:
+        if rng.random() < 0.2:
+            game._handle_event(pygame.event.Event(rng.choice((pygame.KEYDOWN, pygame.KEYUP)),
+                key=rng.choice(keys)))
+        if not game.game_active:
+            game._handle_event(play_button)
+        game._update_game()
+        hashes[game.frame] = game.state_hash()
+    writer.close()
+    return hashes
+
+def test_replay_seek_across_chunks(tmp_path):
+    path = tmp_path / 'replay.airb'
+    hashes = record_replay(path, 400, keyframe_interval=50)
+    reader = ReplayReader(path)
+    assert len(reader.index) > 4
+    assert not reader.recovered
+    for frame in (1, 49, 50, 51, 99, 100, 101, 175, 250, 399, 400):
+        game = AlienInvasion(headless=True, seed=reader.seed)
+        assert reader.seek(game, frame) == frame
+        assert game.state_hash() == hashes[frame], frame
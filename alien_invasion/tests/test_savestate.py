@@ -0,0 +1,105 @@
+import random
+import struct
+import zlib
+
+import pytest
+
+from alien_invasion import AlienInvasion
+from game_state import PLAYING, RESPAWN_DELAY, LEVEL_TRANSITION
+import savestate
+
+ACTIONS = [('left',), ('right',), ('fire',), ('left', 'fire'), ('right', 'fire'), ()]
+
+def new_game(seed):
+    """
+    Returns a started headless game that keeps its pauses, like a windowed game.
+    """
+    game = AlienInvasion(headless=True, seed=seed)
+    game.state.skip_pauses = False
+    game.restart_game()
+    return game
+
+def play(game, frames, seed=0):
+    """
+    Steps a game with random actions and returns the state hash after every frame.
+    """
+    rng = random.Random(seed)
+    hashes = []
+    for _ in range(frames):
+        game.step(rng.choice(ACTIONS))
+        hashes.append(game.state_hash())
+    return hashes
+
+def enter_respawn_delay(game):
+    game._check_game_status()
+
+def enter_level_transition(game):
+    game.aliens.clear()
+    game.step()
+
+@pytest.mark.parametrize('enter, state', [
+    (None, PLAYING),
+    (enter_respawn_delay, RESPAWN_DELAY),
+    (enter_level_transition, LEVEL_TRANSITION),
+])
+def test_round_trip(enter, state):
+    game = new_game(7)
+    play(game, 200)
+    if enter:
+        enter(game)
+    assert game.state.state == state
+    data = savestate.pack_state(game)
+
+    restored = new_game(99)
+    savestate.unpack_state(restored, data)
+    assert restored.state.state == state
+    assert restored.state.timer == game.state.timer
+    assert restored.state_hash() == game.state_hash()
+    assert savestate.pack_state(restored) == data
+    # The pause ends the same way and the games stay in step after it
+    assert play(restored, 300, seed=1) == play(game, 300, seed=1)
+    assert restored.state.playing
+
+def test_unpack_rejects_corrupt_state_without_changing_the_game():
+    data = savestate.pack_state(new_game(7))
+    game = new_game(3)
+    before = game.state_hash()
+    for corrupt in (data[:-3], data + b'\0'):
+        with pytest.raises(ValueError):
+            savestate.unpack_state(game, corrupt)
+        assert game.state_hash() == before
+
+def write_save(tmp_path, data):
+    path = tmp_path / 'savestate.bin'
+    path.write_bytes(data)
+    return path
+
+def test_load_save(tmp_path):
+    game = new_game(7)
+    play(game, 100)
+    path = write_save(tmp_path, savestate.encode_save(game))
+    restored = new_game(99)
+    assert savestate.load_save(restored, path)
+    assert restored.state_hash() == game.state_hash()
+    assert not savestate.load_save(restored, tmp_path / 'missing.bin')
+
+@pytest.mark.parametrize('corrupt, message', [
+    (lambda data: b'XXXX' + data[4:], 'not a save file'),
+    (lambda data: data[:4] + bytes((savestate.SAVE_VERSION + 1,)) + data[5:], 'version'),
+    (lambda data: data[:-1] + bytes((data[-1] ^ 1,)), 'corrupted'),
+    (lambda data: data[:5], 'too short'),
+])
+def test_load_save_rejects(tmp_path, corrupt, message):
+    path = write_save(tmp_path, corrupt(savestate.encode_save(new_game(7))))
+    game = new_game(3)
+    before = game.state_hash()
+    with pytest.raises(ValueError, match=message):
+        savestate.load_save(game, path)
+    assert game.state_hash() == before
+
+def test_load_save_rejects_bad_payload(tmp_path):
+    payload = zlib.compress(b'\0' * 16)
+    header = struct.pack('<4sBI', savestate.SAVE_MAGIC, savestate.SAVE_VERSION, zlib.crc32(payload))
+    path = write_save(tmp_path, header + payload)
+    with pytest.raises(ValueError):
+        savestate.load_save(new_game(3), path)